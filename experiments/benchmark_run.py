@@ -0,0 +1,255 @@
+"""
+基准算例批量运行 (对应论文 Table IV)
+(算例, 种子) 作业分发到进程池并行运行，每个作业完成后把档案、hv_trajectory 与耗时追加为
+experiments/results/benchmark.jsonl 中的一行 (只追加，由主进程单独写入)
+重启时跳过结果文件中已有的组合；未完成的作业定期写检查点，中断后从检查点逐位一致地继续
+全部作业结束后逐行流式汇总各算例的 HV 均值/标准差，不把所有前沿同时读入内存
+
+    python -m experiments.benchmark_run --workers 8 --time-limit 600 --seeds 0 1 2
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import config
+from src.data_loader import DataLoader
+from src.solver.alnsmo import ALNSMO
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+RESULTS_FILE = os.path.join(RESULTS_DIR, 'benchmark.jsonl')
+CHECKPOINT_DIR = os.path.join(RESULTS_DIR, 'checkpoints', 'benchmark')
+
+# DATA_DIR 下没有算例文件时使用的算例名 (DataLoader 会按名称生成模拟数据)
+DEFAULT_INSTANCES = ['n20m2d2', 'n40m2d2', 'n60m3d3', 'n80m4d4', 'n100m5d5']
+DEFAULT_SEEDS = [0, 1, 2]
+
+
+def list_instances(data_dir=None):
+    """DATA_DIR 中的全部算例名 (按名称排序)；目录为空或不存在时返回 DEFAULT_INSTANCES"""
+    data_dir = data_dir or config.DATA_DIR
+    if os.path.isdir(data_dir):
+        names = sorted(os.path.splitext(f)[0] for f in os.listdir(data_dir) if f.lower().endswith('.txt'))
+        if names:
+            return names
+    return list(DEFAULT_INSTANCES)
+
+
+def job_name(instance, seed):
+    return f"{instance}_s{seed}"
+
+
+def checkpoint_path(instance, seed, checkpoint_dir=None):
+    return os.path.join(checkpoint_dir or CHECKPOINT_DIR, job_name(instance, seed) + '.npz')
+
+
+class ResultStore:
+    """
+    只追加的 JSONL 结果文件，每行一个作业记录
+    每条记录写完即 flush + fsync；进程在写入中途被杀时只会留下不完整的末行，
+    打开时将其截掉，因此文件中的每一行总是完整的记录
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._drop_partial_line()
+
+    def _drop_partial_line(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # 向前找到最后一个换行符，截掉其后的残缺记录
+            pos = size - 1
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                idx = chunk.rfind(b'\n')
+                if idx >= 0:
+                    pos = pos - step + idx + 1
+                    break
+                pos -= step
+            f.truncate(pos)
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __iter__(self):
+        """逐行产出记录，任意时刻只有一条记录在内存中"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def completed(self):
+        """已有结果的 (算例, 种子) 集合"""
+        return {(rec['instance'], rec['seed']) for rec in self}
+
+
+class RunningStats:
+    """Welford 在线均值/方差"""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self):
+        """样本标准差 (少于两次运行时为 0)"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+def aggregate(store):
+    """
+    流式汇总结果文件：各算例最终 HV 的均值/标准差、平均耗时与平均前沿规模
+    同一 (算例, 种子) 重复出现时只计第一条
+    """
+    hv, seconds, front_size, seen = {}, {}, {}, set()
+    for rec in store:
+        key = (rec['instance'], rec['seed'])
+        if key in seen:
+            continue
+        seen.add(key)
+        inst = rec['instance']
+        hv.setdefault(inst, RunningStats()).add(rec['final_hv'])
+        seconds.setdefault(inst, RunningStats()).add(rec['timings']['total'])
+        front_size.setdefault(inst, RunningStats()).add(len(rec['archive']))
+    return {
+        inst: {
+            'runs': hv[inst].count,
+            'hv_mean': hv[inst].mean,
+            'hv_std': hv[inst].std,
+            'seconds_mean': seconds[inst].mean,
+            'front_size_mean': front_size[inst].mean,
+        }
+        for inst in sorted(hv)
+    }
+
+
+def run_job(instance, seed, time_limit=None, checkpoint_dir=None):
+    """
+    在工作进程中运行一个 (算例, 种子) 作业，返回结果记录
+    随机种子在作业内固定，结果与作业被分配到哪个进程、与其他作业的先后无关；
+    time_limit 为本作业的墙钟预算，到时返回当前档案
+    """
+    t0 = time.perf_counter()
+    random.seed(seed)
+    np.random.seed(seed)
+    problem = DataLoader().load_or_generate(instance, seed=seed)
+    # 作业之间已经并行，单个求解器内不再开进程池；复用已加载 (或命中缓存) 的 ProblemInstance
+    solver = ALNSMO(problem.customers, problem.depots, n_workers=1, problem=problem)
+    t1 = time.perf_counter()
+    archive, hv_trajectory = solver.solve(time_limit=time_limit,
+                                          checkpoint=checkpoint_path(instance, seed, checkpoint_dir),
+                                          resume=True)
+    t2 = time.perf_counter()
+    return {
+        'instance': instance,
+        'seed': seed,
+        'iterations': solver.iteration,
+        'stop_reason': solver.stop_reason,
+        'final_hv': hv_trajectory[-1] if hv_trajectory else 0.0,
+        'hv_trajectory': hv_trajectory,
+        'archive': [
+            {'obj': list(ind.obj), 'routes': [r.tolist() for r in ind.routes],
+             'depots': ind.route_depots.tolist()}
+            for ind in archive
+        ],
+        'timings': {'load': t1 - t0, 'solve': t2 - t1, 'total': t2 - t0},
+    }
+
+
+def run_benchmarks(instances=None, seeds=None, workers=None, time_limit=None,
+                   results_file=None, checkpoint_dir=None):
+    """
+    运行全部未完成的 (算例, 种子) 作业并返回按算例汇总的统计 (见 aggregate)
+    workers: 同时运行的作业数 (默认 config.EXPERIMENT_WORKERS，再默认 CPU 核数)，1 为串行
+    time_limit: 每个作业的墙钟预算 (默认 config.JOB_TIME_LIMIT)
+    失败的作业不写入结果文件，下次运行时自动重试
+    """
+    instances = instances or list_instances()
+    seeds = seeds if seeds is not None else DEFAULT_SEEDS
+    workers = workers or config.EXPERIMENT_WORKERS or os.cpu_count() or 1
+    time_limit = time_limit if time_limit is not None else config.JOB_TIME_LIMIT
+    store = ResultStore(results_file or RESULTS_FILE)
+
+    done = store.completed()
+    jobs = [(inst, seed) for inst in instances for seed in seeds if (inst, seed) not in done]
+    print(f"共 {len(instances) * len(seeds)} 个作业，{len(instances) * len(seeds) - len(jobs)} 个已完成，"
+          f"待运行 {len(jobs)} 个 (并行 {min(workers, max(len(jobs), 1))} 个)")
+
+    def finish(inst, seed, record):
+        store.append(record)
+        ckpt = checkpoint_path(inst, seed, checkpoint_dir)
+        if os.path.exists(ckpt):
+            os.remove(ckpt)
+        print(f"[完成] {job_name(inst, seed)}  HV={record['final_hv']:.4f}  "
+              f"{record['timings']['total']:.1f}s  {len(record['archive'])} 个非支配解")
+
+    if workers == 1 or len(jobs) <= 1:
+        for inst, seed in jobs:
+            try:
+                record = run_job(inst, seed, time_limit, checkpoint_dir)
+            except Exception as exc:
+                print(f"[失败] {job_name(inst, seed)}: {exc!r}")
+                continue
+            finish(inst, seed, record)
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {pool.submit(run_job, inst, seed, time_limit, checkpoint_dir): (inst, seed)
+                       for inst, seed in jobs}
+            for future in as_completed(futures):
+                inst, seed = futures[future]
+                try:
+                    record = future.result()
+                except Exception as exc:
+                    print(f"[失败] {job_name(inst, seed)}: {exc!r}")
+                    continue
+                finish(inst, seed, record)
+
+    summary = aggregate(store)
+    print(f"\n{'算例':<14}{'运行数':>6}{'HV 均值':>12}{'HV 标准差':>12}{'平均耗时(s)':>14}")
+    for inst, row in summary.items():
+        print(f"{inst:<14}{row['runs']:>6}{row['hv_mean']:>12.4f}{row['hv_std']:>12.4f}{row['seconds_mean']:>14.1f}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="基准算例批量运行")
+    parser.add_argument('--instances', nargs='+', default=None)
+    parser.add_argument('--seeds', type=int, nargs='+', default=None)
+    parser.add_argument('--workers', type=int, default=None, help='同时运行的作业数')
+    parser.add_argument('--time-limit', type=float, default=None, help='每个作业的墙钟时间预算 (秒)')
+    parser.add_argument('--results', type=str, default=None, help=f'结果文件 (默认 {RESULTS_FILE})')
+    args = parser.parse_args(argv)
+    run_benchmarks(args.instances, args.seeds, args.workers, args.time_limit, args.results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+结果集的前沿质量指标报告
+流式读取一个或多个 JSONL 结果文件 (benchmark_run 的结果或求解服务返回的作业结果，每行一个运行)，
+计算每个运行的 HV / IGD / IGD+ / Spread / C-metric (见 src/metrics.py)，按 (文件, 算例) 汇总均值与标准差
+多个文件 (如不同参数配置的结果) 中同一 (算例, 种子) 的运行合并为共同的参考前沿，指标因此可以跨文件比较
+
+    python -m experiments.metrics_report results/a.jsonl results/b.jsonl --out metrics.jsonl
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.metrics import evaluate_results
+from experiments.benchmark_run import RESULTS_FILE, RunningStats
+
+METRICS = ('hv', 'igd', 'igd_plus', 'spread', 'c_ref')
+
+
+def report(paths, out=None):
+    """逐个运行计算指标 (out 给定时逐行写出)，返回 {(文件, 算例): {指标: RunningStats}}"""
+    summary = {}
+    sink = open(out, 'w', encoding='utf-8') if out else None
+    try:
+        for row in evaluate_results(paths):
+            if sink is not None:
+                sink.write(json.dumps(row, ensure_ascii=False) + '\n')
+            stats = summary.setdefault((row['file'], row['instance']), {m: RunningStats() for m in METRICS})
+            for m in METRICS:
+                if row[m] == row[m]:    # 空前沿的指标为 NaN，不计入
+                    stats[m].add(row[m])
+    finally:
+        if sink is not None:
+            sink.close()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="结果集的前沿质量指标")
+    parser.add_argument('files', nargs='*', default=None, help=f'结果文件 (默认 {RESULTS_FILE})')
+    parser.add_argument('--out', type=str, default=None, help='逐个运行的指标写入该 JSONL 文件')
+    args = parser.parse_args(argv)
+    paths = args.files or [RESULTS_FILE]
+
+    summary = report(paths, args.out)
+    print(f"{'文件':<24}{'算例':<14}{'运行数':>6}" + ''.join(f"{m:>18}" for m in METRICS))
+    for (path, inst), stats in sorted(summary.items()):
+        cells = ''.join(f"{s.mean:>10.4f} ±{s.std:<6.4f}" for s in stats.values())
+        print(f"{os.path.basename(path):<24}{inst:<14}{stats['hv'].count:>6}{cells}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+求解器性能基准：核心内核与算子的微基准 + 固定种子的端到端 ALNSMO 运行
+结果写为 JSON，可与基线文件比较以发现性能回退
+
+    python -m experiments.perf_benchmark --sizes 20 100 500 2000 --out perf.json
+    python -m experiments.perf_benchmark --baseline perf_base.json --tolerance 0.25
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import config
+from src.models import Depot
+from src.problem import ProblemInstance
+from src.data_loader import DataLoader
+from src.utils import calculate_total_costs, calculate_total_satisfaction, calculate_hv
+from src.solver.alnsmo import ALNSMO
+from src.solver.evaluation import evaluate_population
+from src.solver.offspring import mutate
+from src.solver.multi_objective import fast_non_dominated_sort, calculate_crowding_distance
+
+try:
+    import resource
+except ImportError:     # Windows 无 resource 模块，峰值内存记为 None
+    resource = None
+
+DEFAULT_SIZES = (20, 100, 500, 2000)
+
+
+def build_problem(n, seed):
+    """固定种子的合成实例：n 个客户、两个配送站"""
+    customers, depot = DataLoader().generate_instance(f"n{n}m2d2", seed)
+    rng = random.Random(seed)
+    depots = [depot, Depot(1, rng.uniform(0, config.COORD_SCALE), rng.uniform(0, config.COORD_SCALE))]
+    return ProblemInstance(customers, depots)
+
+
+def seed_all(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def measure(fn, min_time=0.2, repeat=5):
+    """
+    timeit 风格计时：先确定单轮调用次数使一轮耗时约 min_time / repeat，再重复 repeat 轮
+    返回单次调用耗时的最小值与中位数 (秒)
+    """
+    number, elapsed = 1, 0.0
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / repeat / elapsed) + 1)
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {'best': min(samples), 'median': statistics.median(samples), 'number': number}
+
+
+def micro_benchmarks(n, seed, min_time):
+    """单个规模下的内核与算子微基准"""
+    seed_all(seed)
+    problem = build_problem(n, seed)
+    solver = ALNSMO(problem.customers, problem.depots, problem=problem, n_workers=1)
+    population = solver.initialize_population()
+    ind = population[0]
+    routes, route_depots = ind.routes, ind.route_depots
+    # 非支配排序与拥挤度在合并种群 (2 * POP_SIZE) 上计时，与精英选择时的规模一致
+    combined = population + [mutate(problem, solver.operators, p, 0) for p in population]
+    evaluate_population(problem, combined)
+    fronts = fast_non_dominated_sort(combined)
+    front = max(fronts, key=len)
+
+    results = {
+        'calculate_total_costs': measure(
+            lambda: calculate_total_costs(routes, problem.dist, route_depots, config.SIGMA, config.RHO), min_time),
+        'calculate_total_satisfaction': measure(
+            lambda: calculate_total_satisfaction(routes, problem, route_depots), min_time),
+        'evaluate_population': measure(
+            lambda: evaluate_population(problem, [p.replace_routes({0: p.route(0)}) for p in population]), min_time),
+        'fast_non_dominated_sort': measure(lambda: fast_non_dominated_sort(combined), min_time),
+        'calculate_crowding_distance': measure(lambda: calculate_crowding_distance(front), min_time),
+        'calculate_hv': measure(lambda: calculate_hv(fronts[0]), min_time),
+    }
+    for op_idx, op in enumerate(solver.operators):
+        results[op.__name__] = measure(lambda: mutate(problem, solver.operators, ind, op_idx), min_time)
+    return results
+
+
+def end_to_end(n, seed, iterations, pop_size):
+    """固定种子的完整求解；在独立进程中运行，使峰值 RSS 只反映本次运行"""
+    config.ITER_MAX = iterations
+    config.POP_SIZE = pop_size
+    seed_all(seed)
+    problem = build_problem(n, seed)
+    seed_all(seed)
+    solver = ALNSMO(problem.customers, problem.depots, problem=problem, n_workers=1)
+    t0 = time.perf_counter()
+    archive, hv_trajectory = solver.solve()
+    elapsed = time.perf_counter() - t0
+    return {
+        'iterations': solver.iteration,
+        'seconds': elapsed,
+        'iterations_per_sec': solver.iteration / elapsed if elapsed > 0 else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'final_hv': hv_trajectory[-1] if hv_trajectory else 0.0,
+        'archive_size': len(archive),
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 计，macOS 以字节计
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_suite(sizes=DEFAULT_SIZES, seed=0, iterations=20, pop_size=None, min_time=0.2, skip_e2e=False):
+    pop_size = pop_size or config.POP_SIZE
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': seed,
+            'iterations': iterations,
+            'pop_size': pop_size,
+        },
+        'micro': {},
+        'end_to_end': {},
+    }
+    saved = config.POP_SIZE
+    config.POP_SIZE = pop_size
+    try:
+        for n in sizes:
+            print(f"[micro] n={n}")
+            for name, res in micro_benchmarks(n, seed, min_time).items():
+                report['micro'].setdefault(name, {})[str(n)] = res
+    finally:
+        config.POP_SIZE = saved
+
+    if not skip_e2e:
+        for n in sizes:
+            print(f"[end-to-end] n={n}")
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                report['end_to_end'][str(n)] = pool.submit(end_to_end, n, seed, iterations, pop_size).result()
+    return report
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    与基线比较，返回回退列表 (字符串)：
+    微基准最优耗时变慢超过 tolerance、端到端迭代速度下降超过 tolerance、
+    峰值内存增加超过 tolerance，或同种子下最终 HV 变差
+    """
+    regressions = []
+    for name, by_size in current.get('micro', {}).items():
+        for n, res in by_size.items():
+            base = baseline.get('micro', {}).get(name, {}).get(n)
+            if base and res['best'] > base['best'] * (1 + tolerance):
+                regressions.append(f"{name} n={n}: {base['best']:.3e}s -> {res['best']:.3e}s")
+    for n, res in current.get('end_to_end', {}).items():
+        base = baseline.get('end_to_end', {}).get(n)
+        if not base:
+            continue
+        if res['iterations_per_sec'] < base['iterations_per_sec'] * (1 - tolerance):
+            regressions.append(f"end_to_end n={n}: {base['iterations_per_sec']:.2f} -> "
+                               f"{res['iterations_per_sec']:.2f} it/s")
+        if res['peak_rss_mb'] and base.get('peak_rss_mb') and res['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"end_to_end n={n}: peak RSS {base['peak_rss_mb']:.1f} -> {res['peak_rss_mb']:.1f} MB")
+        if res['final_hv'] < base['final_hv'] - 1e-4:
+            regressions.append(f"end_to_end n={n}: final HV {base['final_hv']:.4f} -> {res['final_hv']:.4f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ALNSMO 性能基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=20, help='端到端运行的迭代次数')
+    parser.add_argument('--pop-size', type=int, default=None)
+    parser.add_argument('--min-time', type=float, default=0.2, help='每项微基准的最短计时 (秒)')
+    parser.add_argument('--skip-e2e', action='store_true', help='只运行微基准')
+    parser.add_argument('--out', type=str, default=os.path.join('experiments', 'results', 'perf.json'))
+    parser.add_argument('--baseline', type=str, default=None, help='基线 JSON，给定时输出回退项')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.seed, args.iterations, args.pop_size, args.min_time, args.skip_e2e)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"结果已写入 {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print("[回退]", line)
+        if regressions:
+            return 1
+        print("与基线相比无性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
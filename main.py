@@ -5,15 +5,29 @@ import argparse
 # 确保项目根目录在系统路径中，以便正确导入 src 模块
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.data_loader import DataLoader
-from src.solver.alnsmo import ALNSMO
-from experiments.benchmark_run import run_benchmarks
-from experiments.real_world_run import run_real_world
+# 求解器与实验模块在各模式分支内按需导入，只加载所选模式用到的模块
 
 def main():
     parser = argparse.ArgumentParser(description="MDRP-DPOD 多无人机协作路径规划复现工程")
-    parser.add_argument('--mode', type=str, default='real', choices=['benchmark', 'real', 'single'],
-                        help='运行模式: benchmark(基准测试), real(长沙实景), single(单次运行演示)')
+    parser.add_argument('--mode', type=str, default='real', choices=['benchmark', 'real', 'single', 'serve'],
+                        help='运行模式: benchmark(基准测试), real(长沙实景), single(单次运行演示), '
+                             'serve(常驻求解服务，HTTP JSON 接口)')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='单次运行 (benchmark 模式为每个作业) 的墙钟时间预算 (秒)，到时返回当前最优前沿')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='benchmark 模式：同时运行的 (算例, 种子) 作业数；serve 模式：常驻工作进程数；默认 CPU 核数')
+    parser.add_argument('--host', type=str, default=None, help='serve 模式：监听地址 (默认 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=None, help='serve 模式：监听端口 (默认 8765)')
+    parser.add_argument('--stats', type=str, default=None, metavar='PREFIX',
+                        help='single 模式：开启运行统计并导出到 PREFIX.json 与 PREFIX.csv')
+    parser.add_argument('--checkpoint', type=str, default=None, metavar='PATH',
+                        help='single 模式：定期把运行状态写入检查点文件 (.npz)')
+    parser.add_argument('--resume', action='store_true',
+                        help='single 模式：检查点存在时从中继续运行 (与未中断的运行逐位一致)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='随机种子 (恢复运行时须与首次运行一致)')
+    parser.add_argument('--profile', type=str, nargs='?', const='single.prof', default=None,
+                        help='single 模式：用 cProfile 分析求解过程并保存统计文件 (默认 single.prof)')
     
     args = parser.parse_args()
 
@@ -24,25 +38,58 @@ def main():
 
     if args.mode == 'benchmark':
         print("\n[状态] 启动 29 个基准实例测试 (对应论文 Table IV)...")
-        run_benchmarks()
+        from experiments.benchmark_run import run_benchmarks
+        run_benchmarks(workers=args.workers, time_limit=args.time_limit)
 
     elif args.mode == 'real':
         print("\n[状态] 启动长沙市 40 任务点实景模拟 (对应论文 Fig. 7)...")
+        from experiments.real_world_run import run_real_world
         run_real_world()
 
     elif args.mode == 'single':
         print("\n[状态] 执行单次演示运行 (n20m2d2 实例)...")
+        import random
+        import numpy as np
+        from src.data_loader import DataLoader
+        from src.solver.alnsmo import ALNSMO
+        if args.seed is not None:
+            random.seed(args.seed)
+            np.random.seed(args.seed)
         loader = DataLoader()
         # 加载基础数据 [cite: 581-583]
-        customers, depot = loader.load_instance("n20m2d2")
-        solver = ALNSMO(customers, depot)
+        problem = loader.load_or_generate("n20m2d2", seed=args.seed)
+        solver = ALNSMO(problem.customers, problem.depots, problem=problem,
+                        instrument=True if args.stats else None)
         # 运行 ALNSMO 算法 [cite: 333, 404]
-        pareto_front = solver.solve()
+        if args.profile:
+            import cProfile
+            import pstats
+            profiler = cProfile.Profile()
+            pareto_front, hv_trajectory = profiler.runcall(
+                solver.solve, time_limit=args.time_limit, checkpoint=args.checkpoint, resume=args.resume)
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+            print(f"cProfile 统计已保存到 {args.profile}")
+        else:
+            pareto_front, hv_trajectory = solver.solve(
+                time_limit=args.time_limit, checkpoint=args.checkpoint, resume=args.resume)
+        if args.stats:
+            solver.instrumentation.to_json(args.stats + '.json', hv_trajectory=hv_trajectory,
+                                          cache=solver.cache_stats())
+            solver.instrumentation.to_csv(args.stats + '.csv')
+            print(f"运行统计已导出到 {args.stats}.json / {args.stats}.csv")
         
-        print(f"演示运行完成！找到 {len(pareto_front)} 个帕累托最优解。")
+        print(f"演示运行完成 ({solver.iteration} 代，停止原因: {solver.stop_reason})！"
+              f"找到 {len(pareto_front)} 个帕累托最优解。")
         for i, sol in enumerate(pareto_front[:3]): # 展示前3个解
             print(f"方案 {i+1}: 成本 f1={sol.obj[0]:.2f}, 满意度 f2={sol.obj[1]:.2f}")
 
+    elif args.mode == 'serve':
+        print("\n[状态] 启动常驻求解服务...")
+        from src.service import serve
+        serve(args.host, args.port, args.workers)
+        return
+
     print("\n" + "="*50)
     print("实验已结束，结果存放在 experiments/results/ 目录下。")
 
@@ -1,7 +1,10 @@
 # src/__init__.py
 
 # 1. 从 models 导入核心类
-from .models import Drone, Customer, Depot
+from .models import Drone, Customer, Depot, Individual
+from .distance import DistanceMatrix
+from .problem import ProblemInstance
+from .neighbors import NeighborLists
 
 # 2. 从 utils 导入计算函数
 from .utils import (
@@ -10,14 +13,26 @@ from .utils import (
     calculate_total_satisfaction,
     normalize_objective
 )
+from .schedule import calculate_satisfaction, simulate_batch, simulate_route, pad_routes
+from .metrics import instance_bounds, evaluate_results
 
 # 定义导出的公开接口
 __all__ = [
     'Drone',
     'Customer',
     'Depot',
+    'Individual',
+    'DistanceMatrix',
+    'ProblemInstance',
+    'NeighborLists',
     'calculate_distance',
     'calculate_total_costs',
     'calculate_total_satisfaction',
-    'normalize_objective'
+    'calculate_satisfaction',
+    'normalize_objective',
+    'simulate_batch',
+    'simulate_route',
+    'pad_routes',
+    'instance_bounds',
+    'evaluate_results'
 ]
\ No newline at end of file
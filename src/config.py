@@ -1,5 +1,9 @@
 # src/config.py
 
+import os
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class GlobalConfig:
     """
     统一管理论文中的所有超参数 [cite: 148, 590, 963]
@@ -33,11 +37,96 @@ class GlobalConfig:
     
     # 6. 时间窗参数 [cite: 583, 1277]
     ETA = 0.2                     # 柔性时间窗系数，用于计算 w_e 和 w_l
+    TIME_HORIZON = 20.0           # 算例时间缩放后的总时长 (h)
+    COORD_SCALE = 20.0            # 算例坐标缩放后的边长 (km)
+    MAX_PAYLOAD = 3.0             # 无人机最大载重 (kg)，算例需求量按此缩放
     
     # 7. 路径规则
     PD_TYPE_CODE = 'PD'           # 市内即时配送代码
     D_TYPE_CODE = 'D'             # 仅送货代码
     P_TYPE_CODE = 'P'             # 仅取件代码
 
+    # 8. 距离矩阵参数
+    DISTANCE_METRIC = 'euclidean' # 'euclidean' (Homberger 平面坐标) 或 'haversine' (经纬度)
+    DIST_BLOCK_SIZE = 512         # 分块构建距离矩阵时每块的行数
+    DIST_MMAP_THRESHOLD = 1000    # 节点数达到该值时，缓存的距离矩阵以内存映射方式打开
+    NEIGHBOR_K = 10               # 粒度邻居表中每个节点保留的邻居数
+
+    # 算例文件与解析缓存目录
+    DATA_DIR = os.path.join(_PROJECT_ROOT, 'data', 'homberger')
+    CACHE_DIR = os.path.join(_PROJECT_ROOT, 'data', 'cache')
+
+    # 9. Pareto 档案与超体积参数
+    ARCHIVE_CAPACITY = 500        # 档案容量，超出时删除 HV 贡献最小的成员
+    HV_COST_BOUND = 500.0         # HV 归一化的成本上界 (论文算例估计值)
+    HV_SAT_BOUND = 40.0           # HV 归一化的满意度上界 (40 个点最大满意度)
+    ARCHIVE_MODE = 'hv'           # 'hv': 按 HV 贡献截断；'epsilon': epsilon-box 档案 (紧凑存储，规模有界)
+    ARCHIVE_EPSILON = (0.01, 0.1) # epsilon-box 在 (f1, f2) 上的边长 (f1 为成本 / 100，f2 为负满意度)
+
+    # 10. 并行参数
+    N_WORKERS = 1                 # 并行生成子代的进程数，1 表示串行
+    N_ISLANDS = 4                 # 岛屿模型的岛 (进程) 数
+    MIGRATION_INTERVAL = 50       # 每隔多少代迁移一次
+    N_MIGRANTS = 5                # 每次迁出的非支配个体数
+
+    # 11. 修复算子参数
+    REPAIR_REMOVE = 3             # o7 每次从两条路径中移出并重新插入的任务数
+    REGRET_K = 2                  # regret-k 插入的 k
+    REPAIR_SAT_WEIGHT = 1.0       # 插入代价中 1 单位满意度折合的距离 (km)
+
+    # 12. 停止准则 (ITER_MAX 之外)
+    TIME_LIMIT = None             # 墙钟时间预算 (秒)，None 表示不限
+    STALL_ITERS = 0               # HV 连续多少代提升不足 STALL_TOL 即停止，0 表示不启用
+    STALL_TOL = 1e-4              # HV 停滞判据的最小提升量
+
+    # 13. 运行统计
+    INSTRUMENT = False            # 是否记录算子耗时/接受率与各阶段耗时 (见 solver.instrumentation)
+
+    # 14. 评价缓存 (按条目数限制容量，0 表示关闭该级缓存)
+    # 批量调度引擎的单次开销主要是固定的数组调用次数，缓存查询本身的开销往往与节省相当，
+    # 默认关闭；评价代价较高 (如带等待的长路径、外部调度模型) 时再开启，命中率见 ALNSMO.cache_stats()
+    ROUTE_CACHE_SIZE = 0          # 路径级：路径哈希 -> (距离, 满意度, 到达时刻)，建议 50000
+    SOLUTION_CACHE_SIZE = 0       # 解级：解哈希 -> 目标值与路径级缓存数组，建议 5000
+
+    # 15. 检查点
+    CHECKPOINT_INTERVAL = 50      # 每隔多少代写一次检查点 (仅在 solve 指定 checkpoint 路径时)
+
+    # 16. 批量实验参数
+    EXPERIMENT_WORKERS = None     # 同时运行的 (算例, 种子) 作业数，None 表示 CPU 核数
+    JOB_TIME_LIMIT = None         # 每个作业的墙钟时间预算 (秒)，None 表示只按 ITER_MAX 停止
+
+    # 17. 初始解 (巨型路径 + Prins split，见 operators.split)
+    # 目标函数不惩罚载重/电量超限，可行的 split 初始解反而劣于轮流分配 (最终 HV 更低)，默认关闭
+    INIT_SPLIT = False            # True 时用巨型路径 + split；False 时按下标轮流分配给每站 2 架无人机
+    SPLIT_MAX_LEN = 20            # 单条路径的最大客户数 L (DP 为 O(n * L)；满意度项使子段代价为 O(n * L^2))
+    SPLIT_SAT_WEIGHT = 2.0        # 满意度折合距离 (km) 的上限：初始种群各个体与 o8 每次调用在 [0, 上限] 间均匀取值
+
+    # 18. 分解模式 (见 solver.decomposition)
+    DECOMP_CLUSTER_SIZE = 200     # 每簇最多客户数
+    DECOMP_WORKERS = None         # 并行求解子问题的进程数，None 表示 CPU 核数
+    DECOMP_BOUNDARY_RATIO = 1.2   # 到次近 Depot 的距离不超过最近距离的该倍数时视为边界客户
+    DECOMP_REPAIR_ROUNDS = 20     # 边界修复的轮数
+
+    # 19. 在线重优化 (见 solver.online)
+    ONLINE_SLA = 2.0              # 从订单到达到发布新前沿的时延上限 (秒)
+    ONLINE_ITERS = 50             # 每次重规划的最大迭代次数
+    ONLINE_POP_SIZE = 20          # 重规划的种群规模
+    ONLINE_BATCH_WINDOW = 0.05    # 收到订单后再等待多久 (秒)，把期间到达的订单合为一批
+
+    # 20. 常驻求解服务 (见 src/service.py)
+    SERVICE_HOST = '127.0.0.1'    # 只监听本机
+    SERVICE_PORT = 8765
+    SERVICE_WORKERS = None        # 常驻工作进程数，None 表示 CPU 核数
+    SERVICE_CACHE_SIZE = 8        # 每个工作进程缓存的实例数 (LRU，按算例名与种子)
+    SERVICE_JOB_RETENTION = 100   # 最多保留多少个已结束作业的状态与结果，更早结束的先删除
+    SERVICE_JOB_TTL = 3600.0      # 已结束作业的保留时长 (秒)，None 表示只按数量清理
+
+    # 21. 批量变异 (见 solver.offspring.mutate_batch 与 operators.batch)
+    BATCH_MUTATION = True         # 整个种群一次抽样，o1/o2/o3/o6 在填充数组上批量执行；False 时逐个体选择算子并变异
+
+    # 22. 前沿质量指标 (见 src/metrics.py)
+    METRICS_REF_POINT = (1.1, 1.1)       # 按实例归一化后的 HV 参考点
+    METRICS_BATCH_ELEMENTS = 4_000_000   # 每批向量化计算的 运行数 x 前沿点数 x 参考前沿点数 上限 (控制峰值内存)
+
 # 实例化，方便其他模块直接 import
 config = GlobalConfig()
\ No newline at end of file
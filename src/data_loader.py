@@ -1,54 +1,253 @@
+import os
+import hashlib
 import random
 import numpy as np
 from .models import Customer, Depot
 from .config import config
+from .distance import DistanceMatrix
+from .problem import ProblemInstance
+
+CACHE_VERSION = 1   # 解析/缩放逻辑变化时递增，使旧缓存失效
 
 class DataLoader:
-    def __init__(self):
+    def __init__(self, data_dir=None, cache_dir=None):
         self.config = config
+        self.data_dir = data_dir or config.DATA_DIR
+        self.cache_dir = cache_dir if cache_dir is not None else config.CACHE_DIR
+
+    def load_instance(self, instance_name, path=None, seed=None):
+        """
+        加载 Homberger 算例并按 6:3:1 比例生成异构任务 [cite: 581-582]
+        找到算例文件 (path 或 DATA_DIR/<instance_name>.txt) 时解析真实数据，
+        否则退化为随机生成的模拟数据
+        """
+        path = path or self.find_instance_file(instance_name)
+        if path is None:
+            return self.generate_instance(instance_name, seed)
+        problem = self.load_problem(instance_name, path, seed)
+        return problem.customers, problem.depots[0] if len(problem.depots) == 1 else problem.depots
+
+    def load_or_generate(self, instance_name, path=None, seed=None):
+        """
+        返回 ProblemInstance：找到算例文件时经 load_problem (命中缓存时直接读取距离矩阵，不重新计算)，
+        否则由 generate_instance 生成模拟数据；求解器通过 ALNSMO(..., problem=...) 复用，避免重复构建实例
+        """
+        path = path or self.find_instance_file(instance_name)
+        if path is None:
+            return ProblemInstance(*self.generate_instance(instance_name, seed))
+        return self.load_problem(instance_name, path, seed)
+
+    def find_instance_file(self, instance_name):
+        for ext in ('.txt', '.TXT', ''):
+            candidate = os.path.join(self.data_dir, instance_name + ext)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def load_problem(self, instance_name, path=None, seed=None):
+        """
+        解析算例并返回 ProblemInstance (含距离矩阵)
+        解析与缩放结果按 (文件哈希, 种子, n, d) 缓存为 .npz，距离矩阵单独存为 .npy
+        (大实例以内存映射方式打开)；重复加载时跳过解析、类型分配与距离计算
+        """
+        path = path or self.find_instance_file(instance_name)
+        if path is None:
+            raise FileNotFoundError(f"找不到算例文件: {instance_name}")
+        seed = 0 if seed is None else seed
+        n, d = parse_instance_name(instance_name)
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()[:16]
+        key = f"{instance_name}_{digest}_s{seed}_n{n}_d{d}_v{CACHE_VERSION}"
+
+        if self.cache_dir:
+            cached = self.read_cache(key)
+            if cached is not None:
+                return cached
+
+        customers, depots = self.build_instance(raw.decode('utf-8', errors='replace'), n, d, seed)
+        problem = ProblemInstance(customers, depots)
+        if self.cache_dir:
+            self.write_cache(key, problem)
+        return problem
+
+    def build_instance(self, text, n, d, seed):
+        """
+        由 Homberger/Solomon 文本构建客户与配送站
+        坐标缩放到 [0, COORD_SCALE]，时间缩放到 [0, TIME_HORIZON] (以仓库关闭时间为全程)，
+        需求量按最大需求缩放到无人机最大载重以内；任务类型用种子随机数精确按 6:3:1 分配
+        """
+        rows = parse_homberger(text)
+        depot_row, rows = rows[0], rows[1:]
+        n = len(rows) if n is None else min(n, len(rows))
+        d = 1 if d is None else d
+        rng = np.random.default_rng(seed)
+
+        coords = np.array([[r[1], r[2]] for r in [depot_row] + rows], dtype=np.float64)
+        origin = coords.min(axis=0)
+        span = max((coords.max(axis=0) - origin).max(), 1e-9)
+        scale_xy = lambda x, y: ((x - origin[0]) / span * config.COORD_SCALE,
+                                 (y - origin[1]) / span * config.COORD_SCALE)
+        horizon = depot_row[5] if depot_row[5] > 0 else max(r[5] for r in rows)
+        scale_t = config.TIME_HORIZON / horizon
+        max_demand = max(max(r[3] for r in rows[:n]), 1e-9)
+
+        # 6:3:1 精确配比后随机打乱
+        n_d = int(round(n * config.PROB_DELIVERY))
+        n_p = int(round(n * config.PROB_PICKUP))
+        types = [config.D_TYPE_CODE] * n_d + [config.P_TYPE_CODE] * n_p + \
+                [config.PD_TYPE_CODE] * (n - n_d - n_p)
+        types = [types[k] for k in rng.permutation(n)]
 
-    def load_instance(self, instance_name):
-        """加载 Homberger 算例并按 6:3:1 比例生成异构任务 [cite: 581-582]"""
-        # 复现逻辑：模拟读取文本数据并缩放坐标
+        customers = []
+        for i, r in enumerate(rows[:n]):
+            x, y = scale_xy(r[1], r[2])
+            w_a, w_b = r[4] * scale_t, r[5] * scale_t
+            # 计算柔性时间窗容忍边界 [cite: 583]
+            w_e = w_a - config.ETA * (w_b - w_a)
+            w_l = w_b + config.ETA * (w_b - w_a)
+            weight = r[3] / max_demand * config.MAX_PAYLOAD
+            customers.append(Customer(int(r[0]), x, y, types[i], weight, w_a, w_b, w_e, w_l))
+
+        # 第一个配送站取文件中的仓库，其余从未选用的节点中按种子抽取
+        depots = [Depot(0, *scale_xy(depot_row[1], depot_row[2]))]
+        spare = rows[n:]
+        extra = rng.choice(len(spare), size=min(d - 1, len(spare)), replace=False) if d > 1 and spare else []
+        for k, idx in enumerate(extra):
+            depots.append(Depot(k + 1, *scale_xy(spare[idx][1], spare[idx][2])))
+        while len(depots) < d:
+            depots.append(Depot(len(depots), *rng.uniform(0, config.COORD_SCALE, 2)))
+        return customers, depots
+
+    # --- 二进制缓存 ---
+    def cache_paths(self, key):
+        return os.path.join(self.cache_dir, key + '.npz'), os.path.join(self.cache_dir, key + '.dist.npy')
+
+    def write_cache(self, key, problem):
+        """列式数据写入 .npz、距离矩阵写入 .npy；先写临时文件再原子替换"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        npz_path, dist_path = self.cache_paths(key)
+        cs, ds = problem.customers, problem.depots
+        tmp_dist = dist_path + '.tmp.npy'
+        np.save(tmp_dist, np.asarray(problem.dist.matrix))
+        os.replace(tmp_dist, dist_path)
+        tmp_npz = npz_path + '.tmp.npz'
+        np.savez(
+            tmp_npz,
+            customer_id=np.array([c.id for c in cs], dtype=np.int64),
+            customer_xy=np.array([[c.x, c.y] for c in cs], dtype=np.float64).reshape(-1, 2),
+            demand_type=np.array([c.demand_type for c in cs], dtype='U2'),
+            weight=np.array([c.weight for c in cs], dtype=np.float64),
+            windows=np.array([[c.w_a, c.w_b, c.w_e, c.w_l] for c in cs], dtype=np.float64).reshape(-1, 4),
+            depot_id=np.array([p.id for p in ds], dtype=np.int64),
+            depot_xy=np.array([[p.x, p.y] for p in ds], dtype=np.float64),
+            metric=np.array(problem.dist.metric),
+        )
+        os.replace(tmp_npz, npz_path)
+
+    def read_cache(self, key):
+        npz_path, dist_path = self.cache_paths(key)
+        if not (os.path.isfile(npz_path) and os.path.isfile(dist_path)):
+            return None
+        with np.load(npz_path) as data:
+            customers = [
+                Customer(int(cid), xy[0], xy[1], str(t), w, *win)
+                for cid, xy, t, w, win in zip(data['customer_id'], data['customer_xy'].tolist(),
+                                               data['demand_type'], data['weight'].tolist(),
+                                               data['windows'].tolist())
+            ]
+            depots = [Depot(int(pid), xy[0], xy[1])
+                      for pid, xy in zip(data['depot_id'], data['depot_xy'].tolist())]
+            metric = str(data['metric'])
+        mmap_mode = 'r' if len(customers) + len(depots) >= config.DIST_MMAP_THRESHOLD else None
+        matrix = np.load(dist_path, mmap_mode=mmap_mode)
+        depot_rows = {p.id: k for k, p in enumerate(depots)}
+        customer_rows = {c.id: len(depots) + i for i, c in enumerate(customers)}
+        problem = ProblemInstance(customers, depots, metric,
+                                  dist=DistanceMatrix(matrix, customer_rows, depot_rows, metric))
+        return problem
+
+    def generate_instance(self, instance_name, seed=None):
+        """无算例文件时的模拟数据：随机坐标与时间窗 (seed 给定时可复现)"""
+        rng = random.Random(seed) if seed is not None else random
         customers = []
         # 假设读取了 n 个点
         n = int(instance_name.split('n')[1].split('m')[0])
         for i in range(1, n + 1):
             # 缩放坐标与时间窗 [cite: 581]
-            x, y = random.uniform(0, 20), random.uniform(0, 20)
-            w_a, w_b = random.uniform(0, 10), random.uniform(10, 20)
-            
-            # 按照比例分配任务类型 
-            rand = random.random()
+            x, y = rng.uniform(0, 20), rng.uniform(0, 20)
+            w_a, w_b = rng.uniform(0, 10), rng.uniform(10, 20)
+
+            # 按照比例分配任务类型
+            rand = rng.random()
             if rand < self.config.PROB_DELIVERY:
                 d_type = self.config.D_TYPE_CODE
             elif rand < self.config.PROB_DELIVERY + self.config.PROB_PICKUP:
                 d_type = self.config.P_TYPE_CODE
             else:
                 d_type = self.config.PD_TYPE_CODE
-            
+
             # 计算柔性时间窗容忍边界 [cite: 583]
             w_e = w_a - self.config.ETA * (w_b - w_a)
             w_l = w_b + self.config.ETA * (w_b - w_a)
-            
-            customers.append(Customer(i, x, y, d_type, random.uniform(0, 3), w_a, w_b, w_e, w_l))
-        
+
+            customers.append(Customer(i, x, y, d_type, rng.uniform(0, 3), w_a, w_b, w_e, w_l))
+
         depot = Depot(0, 10, 10) # 中心配送站
         return customers, depot
 
     def load_real_world_data(self, nodes=40):
-        """模拟长沙市 40 个任务点的数据 [cite: 737-739, 1107-1108]"""
+        """
+        模拟长沙市 40 个任务点的数据 [cite: 737-739, 1107-1108]
+        坐标为经纬度，构建 ALNSMO 时需使用 metric='haversine'
+        """
         customers = []
         # 长沙实景：8:00 am - 11:00 am (换算为 0-3h) [cite: 739]
         for i in range(nodes):
             x, y = random.uniform(112.90, 113.02), random.uniform(28.14, 28.22)
             w_a = random.uniform(0, 2.5) # 8:00 开始
             w_b = w_a + random.uniform(0.33, 0.67) # 20-40分钟宽度 [cite: 739]
-            
+
             w_e = w_a - self.config.ETA * (w_b - w_a)
             w_l = w_b + self.config.ETA * (w_b - w_a)
-            
+
             customers.append(Customer(i, x, y, 'D', random.uniform(0, 3), w_a, w_b, w_e, w_l))
-        
+
         depots = [Depot(0, 112.94, 28.17), Depot(1, 112.98, 28.17)] # 2个配送中心 [cite: 740]
-        return customers, depots
\ No newline at end of file
+        return customers, depots
+
+
+def parse_instance_name(instance_name):
+    """从 n20m2d2 形式的名称中解析客户数 n 与配送站数 d (缺失时返回 None)"""
+    n = d = None
+    name = os.path.basename(instance_name)
+    try:
+        n = int(name.split('n')[1].split('m')[0])
+    except (IndexError, ValueError):
+        pass
+    if 'd' in name:
+        try:
+            d = int(name.rsplit('d', 1)[1].split('_')[0])
+        except ValueError:
+            pass
+    return n, d
+
+
+def parse_homberger(text):
+    """
+    解析 Homberger/Solomon 文本格式：
+    CUST NO. XCOORD. YCOORD. DEMAND READY_TIME DUE_DATE SERVICE_TIME，第一行为仓库
+    """
+    rows = []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) != 7:
+            continue
+        try:
+            rows.append([float(v) for v in parts])
+        except ValueError:
+            continue
+    if not rows:
+        raise ValueError("算例文件中没有找到客户数据行")
+    return rows
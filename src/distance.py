@@ -0,0 +1,118 @@
+import numpy as np
+from .config import config
+
+EARTH_RADIUS_KM = 6371.0088  # 地球平均半径 (km)，用于经纬度坐标的 haversine 距离
+
+
+class DistanceMatrix:
+    """
+    实例级距离矩阵：每个问题只构建一次，按整数节点编号查表
+    节点编号约定：先 Depot (0..m-1)，后客户 (m..m+n-1)
+    """
+    def __init__(self, matrix, customer_rows, depot_rows, metric, drone=None):
+        self.matrix = matrix                # (N, N) 距离矩阵 (km)
+        self.customer_rows = customer_rows  # Customer.id -> 行号
+        self.depot_rows = depot_rows        # Depot.id -> 行号
+        self.metric = metric
+        self.num_nodes = matrix.shape[0]
+        # 论文公式 (25) 中与载荷无关的部分: t = d * (W0 + W_payload) * alpha / P
+        # alpha / P 对所有点对都相同，因此只需保存一个标量因子
+        self.self_weight = drone.self_weight if drone else config.DRONE_SELF_WEIGHT
+        self.time_factor = (drone.energy_coeff / drone.output_power) if drone else \
+            config.ENERGY_COEFF_ALPHA / config.OUTPUT_POWER
+
+    @classmethod
+    def from_nodes(cls, customers, depots, metric=None, drone=None, mmap_path=None):
+        """
+        向量化构建所有 Depot 与客户之间的距离
+        metric: 'euclidean' (平面坐标) 或 'haversine' (x=经度, y=纬度)
+        mmap_path: 给定时以 float32 内存映射文件存储，适用于 1000+ 节点的实例
+        """
+        depots = depots if isinstance(depots, list) else [depots]
+        metric = metric or config.DISTANCE_METRIC
+        nodes = list(depots) + list(customers)
+        x = np.array([p.x for p in nodes], dtype=np.float64)
+        y = np.array([p.y for p in nodes], dtype=np.float64)
+
+        n = len(nodes)
+        if mmap_path is not None:
+            matrix = np.lib.format.open_memmap(mmap_path, mode='w+', dtype=np.float32, shape=(n, n))
+        else:
+            matrix = np.empty((n, n), dtype=np.float64)
+
+        # 分块逐行计算，避免大实例时一次性生成多个 (N, N) 临时数组
+        block = max(1, config.DIST_BLOCK_SIZE)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            matrix[start:stop] = pairwise_distance(x[start:stop], y[start:stop], x, y, metric)
+        if mmap_path is not None:
+            matrix.flush()
+
+        depot_rows = {d.id: k for k, d in enumerate(depots)}
+        customer_rows = {c.id: len(depots) + i for i, c in enumerate(customers)}
+        return cls(matrix, customer_rows, depot_rows, metric, drone)
+
+    @classmethod
+    def load(cls, mmap_path, customers, depots, metric=None, drone=None):
+        """以只读内存映射方式重新打开已写出的距离矩阵文件"""
+        depots = depots if isinstance(depots, list) else [depots]
+        matrix = np.load(mmap_path, mmap_mode='r')
+        depot_rows = {d.id: k for k, d in enumerate(depots)}
+        customer_rows = {c.id: len(depots) + i for i, c in enumerate(customers)}
+        return cls(matrix, customer_rows, depot_rows, metric or config.DISTANCE_METRIC, drone)
+
+    def extend(self, x, y, customers):
+        """
+        追加新客户 (在线新订单) 后的距离矩阵：原有节点编号与距离不变，新客户依次编号在末尾
+        x, y 为追加后全部节点的坐标；只计算新增的行与列，O(N * k)
+        """
+        old = self.num_nodes
+        n = len(x)
+        matrix = np.empty((n, n), dtype=np.float64)
+        matrix[:old, :old] = self.matrix
+        rows = pairwise_distance(x[old:], y[old:], x, y, self.metric)
+        matrix[old:] = rows
+        matrix[:old, old:] = rows[:, :old].T
+        customer_rows = dict(self.customer_rows)
+        for i, c in enumerate(customers):
+            if c.id in customer_rows:
+                raise ValueError(f"客户编号重复: {c.id}")
+            customer_rows[c.id] = old + i
+        ext = DistanceMatrix.__new__(DistanceMatrix)
+        ext.matrix, ext.customer_rows, ext.depot_rows = matrix, customer_rows, self.depot_rows
+        ext.metric, ext.num_nodes = self.metric, n
+        ext.self_weight, ext.time_factor = self.self_weight, self.time_factor
+        return ext
+
+    def rows(self, route):
+        """将 Customer 对象序列转换为节点编号数组"""
+        return np.fromiter((self.customer_rows[c.id] for c in route), dtype=np.int32, count=len(route))
+
+    def depot_row(self, depot):
+        return self.depot_rows[depot.id]
+
+    def distance(self, i, j):
+        return self.matrix[i, j]
+
+    def path_length(self, rows):
+        """按节点编号序列累加相邻两点距离"""
+        if len(rows) < 2:
+            return 0.0
+        return float(self.matrix[rows[:-1], rows[1:]].sum())
+
+    def travel_time(self, i, j, current_payload):
+        """查表版 Drone.get_travel_time，支持数组参数的向量化调用"""
+        return self.matrix[i, j] * (self.self_weight + current_payload) * self.time_factor
+
+
+def pairwise_distance(x1, y1, x2, y2, metric='euclidean'):
+    """计算两组坐标之间的距离矩阵 (len(x1), len(x2))"""
+    if metric == 'euclidean':
+        return np.hypot(x1[:, None] - x2[None, :], y1[:, None] - y2[None, :])
+    if metric == 'haversine':
+        lon1, lat1 = np.radians(x1)[:, None], np.radians(y1)[:, None]
+        lon2, lat2 = np.radians(x2)[None, :], np.radians(y2)[None, :]
+        a = np.sin((lat2 - lat1) / 2) ** 2 + \
+            np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    raise ValueError(f"未知的距离度量: {metric}")
@@ -0,0 +1,232 @@
+"""
+Pareto 前沿质量指标 (离线分析多组运行结果)
+所有指标在按实例归一化的目标空间中计算，两个目标均为越小越好：
+    u = f1 / cost_bound,  v = 1 - |f2| / sat_bound      (与 ParetoArchive 的 HV 归一化方式一致)
+cost_bound / sat_bound 由实例本身推出 (见 instance_bounds)，不再使用 HV_COST_BOUND / HV_SAT_BOUND 的固定估计
+
+批量计算：一批前沿填充为 (R, K, 2) 数组 (mask 标记有效点)，各指标对 R 个运行一次向量化完成：
+    hypervolume  以 METRICS_REF_POINT 为参考点的超体积
+    igd / igd_plus  参考前沿各点到前沿的平均 (IGD+ 只计劣于参考点的分量) 距离
+    spread       Deb 的 Δ 分布性指标 (端点取参考前沿的两个极端点)
+    coverage     C(A, B)：B 中被 A 弱支配的点所占比例
+evaluate_results 流式读取结果文件 (JSONL，每行一个运行)，同一问题 (算例, 种子) 的全部运行合并为参考前沿
+"""
+import json
+import numpy as np
+from .config import config
+from .data_loader import DataLoader
+
+
+def instance_bounds(problem):
+    """
+    由实例推出的归一化上界 (cost_bound, sat_bound)
+    cost_bound: 每个客户各派一架无人机从最近的 Depot 往返时的 f1 (可达的最差成本量级)
+    sat_bound:  客户数 (每个客户的满意度至多为 1)
+    """
+    d = np.asarray(problem.dist.matrix[problem.depot_nodes][:, problem.customer_nodes], dtype=np.float64)
+    star = 2.0 * d.min(axis=0).sum() if problem.num_customers else 0.0
+    cost_bound = (config.SIGMA * star + config.RHO * problem.num_customers) / 100.0
+    return max(cost_bound, 1e-12), max(float(problem.num_customers), 1.0)
+
+
+class InstanceBounds:
+    """按 (算例, 种子) 缓存 instance_bounds；算例与任务类型都由种子决定，与求解时 DataLoader 的加载方式一致"""
+    def __init__(self, loader=None):
+        self.loader = loader or DataLoader()
+        self.bounds = {}
+
+    def __call__(self, instance, seed):
+        key = (instance, seed)
+        if key not in self.bounds:
+            self.bounds[key] = instance_bounds(self.loader.load_or_generate(instance, seed=seed))
+        return self.bounds[key]
+
+
+# --- 单个前沿的预处理 ---
+def objectives(record):
+    """结果记录中的目标矩阵 (k, 2)：基准结果的 archive 或求解服务的 front"""
+    members = record.get('archive', record.get('front')) or []
+    return np.array([m['obj'][:2] for m in members], dtype=np.float64).reshape(-1, 2)
+
+
+def nondominated(F):
+    """二维最小化前沿的非支配点 (去重)，按 f1 升序 (f2 随之严格降序)"""
+    if len(F) == 0:
+        return F.reshape(0, 2)
+    F = F[np.lexsort((F[:, 1], F[:, 0]))]
+    best = np.minimum.accumulate(F[:, 1])
+    keep = np.ones(len(F), dtype=bool)
+    keep[1:] = F[1:, 1] < best[:-1]
+    return F[keep]
+
+
+def normalize(F, bounds):
+    """原始目标 (f1, f2) -> 归一化的 (u, v)"""
+    cost_bound, sat_bound = bounds
+    return np.column_stack((F[:, 0] / cost_bound, 1.0 - np.abs(F[:, 1]) / sat_bound))
+
+
+def pad_fronts(fronts):
+    """若干 (k_r, 2) 前沿 -> (R, K, 2) 数组 (填充为 NaN) 与 (R, K) 有效标记"""
+    lengths = np.fromiter((len(F) for F in fronts), dtype=np.int64, count=len(fronts))
+    width = max(int(lengths.max(initial=0)), 1)
+    mask = np.arange(width)[None, :] < lengths[:, None]
+    P = np.full((len(fronts), width, 2), np.nan)
+    if lengths.sum():
+        P[mask] = np.concatenate(fronts)
+    return P, mask
+
+
+# --- 批量指标 (各前沿已经 nondominated 处理并归一化，P/Q 为 pad_fronts 的结果) ---
+def hypervolume(P, mask, ref_point=None):
+    """各前沿的超体积 (R,)；超出参考点的点不计入"""
+    ref = ref_point or config.METRICS_REF_POINT
+    U = np.where(mask, np.minimum(P[..., 0], ref[0]), ref[0])
+    V = np.where(mask, np.minimum(P[..., 1], ref[1]), ref[1])
+    order = np.argsort(U, axis=1, kind='stable')
+    U = np.take_along_axis(U, order, axis=1)
+    V = np.minimum.accumulate(np.take_along_axis(V, order, axis=1), axis=1)
+    width = np.diff(U, axis=1, append=ref[0])
+    return (width * (ref[1] - V)).sum(axis=1)
+
+
+def _pairwise(P, Q):
+    """(R, M, K, 2)：参考前沿点 Q[:, m] 与前沿点 P[:, k] 之差 P - Q"""
+    return P[:, None, :, :] - Q[:, :, None, :]
+
+
+def _mean_min(D, mask, ref_mask):
+    """参考前沿各点到前沿最近点距离的均值；前沿或参考前沿为空时为 NaN"""
+    D = np.where(mask[:, None, :], D, np.inf).min(axis=2)
+    count = ref_mask.sum(axis=1)
+    total = np.where(ref_mask, D, 0.0).sum(axis=1)
+    return np.divide(total, count, out=np.full(len(D), np.nan), where=(count > 0) & mask.any(axis=1))
+
+
+def igd(P, mask, Q, ref_mask):
+    """反世代距离：参考前沿各点到前沿最近点的欧氏距离的均值 (R,)，空前沿为 NaN"""
+    return _mean_min(np.linalg.norm(_pairwise(P, Q), axis=-1), mask, ref_mask)
+
+
+def igd_plus(P, mask, Q, ref_mask):
+    """IGD+：距离只计前沿点劣于参考点的分量 max(p - q, 0)，与 Pareto 支配关系一致"""
+    return _mean_min(np.linalg.norm(np.maximum(_pairwise(P, Q), 0.0), axis=-1), mask, ref_mask)
+
+
+def spread(P, mask, Q, ref_mask):
+    """
+    Deb 的 Δ 分布性指标 (R,)，越小越均匀：
+        Δ = (d_f + d_l + Σ|d_i - d̄|) / (d_f + d_l + (n - 1) d̄)
+    d_i 为按 f1 排序后相邻点的距离，d_f / d_l 为两端点到参考前沿极端点的距离；空前沿为 NaN
+    """
+    rows = np.arange(len(P))
+    n = mask.sum(axis=1)
+    first, last = P[:, 0], P[rows, np.maximum(n - 1, 0)]
+    m = ref_mask.sum(axis=1)
+    extreme_first, extreme_last = Q[:, 0], Q[rows, np.maximum(m - 1, 0)]
+    d_f = np.linalg.norm(first - extreme_first, axis=1)
+    d_l = np.linalg.norm(last - extreme_last, axis=1)
+
+    gaps = np.linalg.norm(np.diff(P, axis=1), axis=-1)
+    gap_mask = mask[:, 1:]
+    gaps = np.where(gap_mask, gaps, 0.0)
+    d_mean = np.divide(gaps.sum(axis=1), n - 1, out=np.zeros(len(P)), where=n > 1)
+    deviation = np.where(gap_mask, np.abs(gaps - d_mean[:, None]), 0.0).sum(axis=1)
+    num = d_f + d_l + deviation
+    den = d_f + d_l + np.maximum(n - 1, 0) * d_mean
+    out = np.divide(num, den, out=np.zeros(len(P)), where=den > 0)
+    out[(n == 0) | (m == 0)] = np.nan
+    return out
+
+
+def coverage(A, a_mask, B, b_mask):
+    """C-metric (R,)：C(A_r, B_r) = B_r 中被 A_r 某点弱支配的点的比例"""
+    covered = (A[:, None, :, :] <= B[:, :, None, :]).all(axis=-1)
+    covered = (covered & a_mask[:, None, :]).any(axis=2)
+    count = b_mask.sum(axis=1)
+    return np.divide((covered & b_mask).sum(axis=1), count, out=np.full(len(A), np.nan), where=count > 0)
+
+
+def coverage_matrix(fronts):
+    """一组前沿两两之间的 C-metric 矩阵 C[i, j] = C(fronts[i], fronts[j]) (对角线为 1)"""
+    P, mask = pad_fronts(fronts)
+    R = len(fronts)
+    C = np.empty((R, R))
+    for i in range(R):
+        C[i] = coverage(np.broadcast_to(P[i], P.shape), np.broadcast_to(mask[i], mask.shape), P, mask)
+    return C
+
+
+def front_metrics(fronts, references, ref_point=None):
+    """
+    对一批 (已归一化的非支配) 前沿与各自的参考前沿一次计算全部指标，返回 {指标名: (R,) 数组}
+    c_ref = C(前沿, 参考前沿)：参考前沿中被该前沿达到的比例；c_by_ref = C(参考前沿, 前沿)
+    """
+    P, mask = pad_fronts(fronts)
+    Q, ref_mask = pad_fronts(references)
+    return {
+        'hv': hypervolume(P, mask, ref_point),
+        'igd': igd(P, mask, Q, ref_mask),
+        'igd_plus': igd_plus(P, mask, Q, ref_mask),
+        'spread': spread(P, mask, Q, ref_mask),
+        'c_ref': coverage(P, mask, Q, ref_mask),
+        'c_by_ref': coverage(Q, ref_mask, P, mask),
+    }
+
+
+# --- 流式处理结果文件 ---
+def iter_records(path):
+    """逐行读取 JSONL 结果文件，任意时刻只有一条记录在内存中 (跳过空行与不完整的末行)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def reference_fronts(paths):
+    """第一遍扫描：按 (算例, 种子) 合并全部文件中的运行，得到原始目标空间中的参考前沿"""
+    refs = {}
+    for path in paths:
+        for rec in iter_records(path):
+            key = (rec['instance'], rec.get('seed'))
+            F = objectives(rec)
+            refs[key] = nondominated(np.concatenate((refs[key], F)) if key in refs else F)
+    return refs
+
+
+def evaluate_results(paths, bounds=None, ref_point=None, batch_elements=None):
+    """
+    流式计算若干结果文件中每个运行的指标，逐个产出
+        {'file', 'instance', 'seed', 'front_size', 'hv', 'igd', 'igd_plus', 'spread', 'c_ref', 'c_by_ref'}
+    两遍扫描：第一遍只保留各问题的合并参考前沿 (目标值)，第二遍把运行攒成批次向量化计算，
+    批次按填充后的 R x K x M 元素数不超过 batch_elements 划分，内存占用与结果文件大小无关
+    bounds: (算例, 种子) -> (cost_bound, sat_bound)，默认由 InstanceBounds 加载实例推出
+    """
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    bounds = bounds or InstanceBounds()
+    budget = batch_elements or config.METRICS_BATCH_ELEMENTS
+    refs = {key: normalize(F, bounds(*key)) for key, F in reference_fronts(paths).items()}
+
+    batch, widest, deepest = [], 0, 0
+    for path in paths:
+        for rec in iter_records(path):
+            key = (rec['instance'], rec.get('seed'))
+            F = normalize(nondominated(objectives(rec)), bounds(*key))
+            widest, deepest = max(widest, len(F), 1), max(deepest, len(refs[key]), 1)
+            batch.append(({'file': path, 'instance': key[0], 'seed': key[1], 'front_size': len(F)}, F, refs[key]))
+            if len(batch) * widest * deepest >= budget:
+                yield from _flush(batch, ref_point)
+                batch, widest, deepest = [], 0, 0
+    if batch:
+        yield from _flush(batch, ref_point)
+
+
+def _flush(batch, ref_point):
+    values = front_metrics([F for _, F, _ in batch], [Q for _, _, Q in batch], ref_point)
+    for r, (row, _, _) in enumerate(batch):
+        row.update({name: float(v[r]) for name, v in values.items()})
+        yield row
@@ -58,11 +58,136 @@ class Depot:
 # src/models.py 文件的末尾添加
 
 class Individual:
-    """对应论文中的染色体/解个体 """
-    def __init__(self, routes):
-        self.routes = routes  # 二维列表：[[node1, node2], [node3]]
+    """
+    对应论文中的染色体/解个体
+    紧凑整数编码：所有路径首尾相接成一条 int32 巨型路径 tour，
+    offsets[k]:offsets[k+1] 为第 k 架无人机的路径，route_depots[k] 为其所属 Depot 编号
+    评价缓存：route_dist / route_active / route_sat 为各路径的闭环距离、活跃标志与满意度，arrival 与 tour 对齐；
+    dirty 记录尚未重新评价的路径下标 (None 表示整个个体未评价)
+    wait 与 tour 对齐，wait[i] 为到达第 i 个节点前在上一停靠点 (或仓库) 完成服务后的等待时长；
+    None 表示不等待 (由 LS-wait 设置，算子改动的路径等待清零)
+    route_hash 为各路径的滚动哈希 (评价缓存的键，见 solver.eval_cache)，与评价缓存一同继承
+    """
+    __slots__ = ('tour', 'offsets', 'route_depots', 'route_dist', 'route_active', 'route_sat', 'arrival', 'wait',
+                 'route_hash', 'dirty',
+                 'total_dist', 'total_sat', 'num_active', 'obj', 'rank', 'crowding_distance')
+
+    def __init__(self, tour, offsets, route_depots):
+        self.tour = tour
+        self.offsets = offsets
+        self.route_depots = route_depots
+        self.route_dist = None
+        self.route_active = None
+        self.route_sat = None
+        self.arrival = None
+        self.wait = None
+        self.route_hash = None
+        self.dirty = None
+        self.total_dist = 0.0
+        self.total_sat = 0.0
+        self.num_active = 0
         self.obj = [0.0, 0.0] # [f1, f2]
         self.rank = 0
         self.crowding_distance = 0
-        self.domination_count = 0
-        self.dominated_solutions = []
\ No newline at end of file
+
+    @classmethod
+    def from_routes(cls, routes, route_depots):
+        """由若干节点编号序列构建个体"""
+        lengths = np.fromiter((len(r) for r in routes), dtype=np.int32, count=len(routes))
+        offsets = np.zeros(len(routes) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+        tour = np.concatenate([np.asarray(r, dtype=np.int32) for r in routes]) if routes else \
+            np.empty(0, dtype=np.int32)
+        return cls(tour.astype(np.int32, copy=False), offsets, np.asarray(route_depots, dtype=np.int32))
+
+    @property
+    def num_routes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def routes(self):
+        """各路径的只读视图列表 (不复制数据)"""
+        return [self.route(k) for k in range(self.num_routes)]
+
+    def route(self, k):
+        return self.tour[self.offsets[k]:self.offsets[k + 1]]
+
+    def route_lengths(self):
+        return np.diff(self.offsets)
+
+    def route_arrival(self, k):
+        return self.arrival[self.offsets[k]:self.offsets[k + 1]]
+
+    def route_wait(self, k):
+        """第 k 条路径各节点前的等待时长 (未设置等待时为 None)"""
+        return None if self.wait is None else self.wait[self.offsets[k]:self.offsets[k + 1]]
+
+
+    def copy(self):
+        """一次缓冲区拷贝完成复制，替代 copy.deepcopy(routes)"""
+        ind = Individual(self.tour.copy(), self.offsets.copy(), self.route_depots.copy())
+        if self.route_dist is not None:
+            ind.route_dist = self.route_dist.copy()
+            ind.route_active = self.route_active.copy()
+            ind.route_sat = self.route_sat.copy()
+            ind.arrival = self.arrival.copy()
+            ind.dirty = list(self.dirty)
+            ind.total_dist, ind.total_sat, ind.num_active = self.total_dist, self.total_sat, self.num_active
+        if self.wait is not None:
+            ind.wait = self.wait.copy()
+        if self.route_hash is not None:
+            ind.route_hash = self.route_hash.copy()
+        ind.obj = list(self.obj)
+        return ind
+
+    def compact(self):
+        """只含路径编码、等待时长与目标值的副本 (档案存储用)；评价缓存为空，再次评价时整体推算"""
+        ind = Individual(self.tour.copy(), self.offsets.copy(), self.route_depots.copy())
+        if self.wait is not None:
+            ind.wait = self.wait.copy()
+        ind.obj = list(self.obj)
+        ind.rank, ind.crowding_distance = self.rank, self.crowding_distance
+        return ind
+
+    def replace_routes(self, changes):
+        """
+        返回替换了部分路径的新个体 (原个体不变)
+        changes: {路径下标: 新节点编号序列}
+        未改动路径的评价缓存原样继承，被改动的路径记入 dirty，等待增量评价
+        """
+        lengths = self.route_lengths()
+        cached = self.route_dist is not None
+        waited = self.wait is not None
+        pieces, arrivals, waits = [], [], []
+        start = 0
+        for k in sorted(changes):
+            lo, hi = self.offsets[start], self.offsets[k]
+            new_route = np.asarray(changes[k], dtype=np.int32)
+            pieces += [self.tour[lo:hi], new_route]
+            if cached:
+                arrivals += [self.arrival[lo:hi], np.zeros(len(new_route))]
+            if waited:
+                waits += [self.wait[lo:hi], np.zeros(len(new_route))]
+            lengths[k] = len(new_route)
+            start = k + 1
+        pieces.append(self.tour[self.offsets[start]:])
+        offsets = np.zeros(len(self.offsets), dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+
+        ind = Individual(np.concatenate(pieces), offsets, self.route_depots)
+        if waited:
+            waits.append(self.wait[self.offsets[start]:])
+            ind.wait = np.concatenate(waits)
+        if cached:
+            arrivals.append(self.arrival[self.offsets[start]:])
+            ind.arrival = np.concatenate(arrivals)
+            ind.route_dist = self.route_dist.copy()
+            ind.route_active = self.route_active.copy()
+            ind.route_sat = self.route_sat.copy()
+            ind.dirty = sorted(set(self.dirty) | set(changes))
+            if self.route_hash is not None:
+                ind.route_hash = self.route_hash.copy()
+                ind.route_hash[list(changes)] = 0
+            ind.total_dist, ind.total_sat, ind.num_active = self.total_dist, self.total_sat, self.num_active
+            ind.obj = list(self.obj)
+        return ind
@@ -0,0 +1,74 @@
+import numpy as np
+from .config import config
+
+
+class NeighborLists:
+    """
+    实例级粒度邻居表 (granular neighbour lists)，每个实例只构建一次
+    by_distance[i]: 距节点 i 最近的 k 个客户
+    by_time[i]:     紧接 i 之后访问时时间窗最契合的 k 个客户
+                    (空载飞行时间 + 等待时间 + 超出容忍窗的迟到量 最小)
+    距离矩阵已包含全部点对距离，因此直接对其行分块做 argpartition 选出前 k 个，
+    不再另建 KD 树；分块保证 1000+ 节点的内存映射矩阵也只需常数级临时内存
+    """
+    def __init__(self, problem, k=None):
+        self.k = min(k or config.NEIGHBOR_K, max(problem.num_customers - 1, 1))
+        customers = problem.customer_nodes
+        n_nodes = problem.num_nodes
+        self.by_distance = np.zeros((n_nodes, self.k), dtype=np.int32)
+        self.by_time = np.zeros((n_nodes, self.k), dtype=np.int32)
+        self._combined = None
+        if problem.num_customers == 0:
+            return
+
+        dist = problem.dist
+        empty_time = dist.self_weight * dist.time_factor
+        w_a, w_l = problem.w_a[customers], problem.w_l[customers]
+        block = max(1, config.DIST_BLOCK_SIZE)
+        for start in range(0, n_nodes, block):
+            stop = min(start + block, n_nodes)
+            d = np.array(dist.matrix[start:stop][:, customers], dtype=np.float64)
+            # 排除自身
+            own = np.arange(start, stop)
+            is_self = customers[None, :] == own[:, None]
+            d[is_self] = np.inf
+
+            self.by_distance[start:stop] = customers[smallest_k(d, self.k)]
+
+            # 从 i 出发 (最早在 w_a[i] 完成服务) 到达 j 的时间与 j 的时间窗之差
+            depart = problem.w_a[start:stop, None] + problem.drone.service_time
+            arrive = depart + d * empty_time
+            wait = np.maximum(w_a[None, :] - arrive, 0.0)
+            late = np.maximum(arrive - w_l[None, :], 0.0)
+            score = d * empty_time + wait + late
+            score[is_self] = np.inf
+            self.by_time[start:stop] = customers[smallest_k(score, self.k)]
+
+    def candidates(self, node):
+        """节点的全部候选邻居 (距离邻居与时间窗邻居，可能有重复)"""
+        return self.combined[node]
+
+    @property
+    def combined(self):
+        if self._combined is None:
+            self._combined = np.concatenate((self.by_distance, self.by_time), axis=1)
+        return self._combined
+
+
+def smallest_k(values, k):
+    """每行最小的 k 个元素的列下标，按取值升序排列"""
+    idx = np.argpartition(values, k - 1, axis=1)[:, :k] if k < values.shape[1] else \
+        np.tile(np.arange(values.shape[1]), (values.shape[0], 1))
+    order = np.argsort(np.take_along_axis(values, idx, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def neighbor_slots(route, neighbors):
+    """
+    route 中与 neighbors 相邻的插入位置 (紧邻其前或其后)
+    返回去重后的插入下标数组，route 中没有任何邻居时返回空数组
+    """
+    pos = np.flatnonzero(np.isin(route, neighbors))
+    if len(pos) == 0:
+        return pos
+    return np.unique(np.concatenate((pos, pos + 1)))
@@ -9,11 +9,16 @@ from .destroy_repair import (
     time_window_greedy_o5,
     optimize_position_o6
 )
+from .insertion import regret_insertion_o7, regret_insert, RouteProfile
+from .split import segment_costs, split_tour, split_pair_o8, split_individual, giant_tour
+from .batch import batch_swap, batch_relocate, batch_transfer
 
 # 导入局部搜索算子 (APLS 核心策略)
 from .local_search import (
     ls_vnd,
-    ls_wait_adjustment
+    ls_wait_adjustment,
+    wait_schedule,
+    apls_main
 )
 
 # 定义导出列表，方便 solver 模块调用
@@ -25,8 +30,25 @@ __all__ = [
     'reduce_drones_o4',
     'time_window_greedy_o5',
     'optimize_position_o6',
+    'regret_insertion_o7',
+    'regret_insert',
+    'RouteProfile',
+
+    # 巨型路径划分 (初始解与解码器)
+    'segment_costs',
+    'split_tour',
+    'split_pair_o8',
+    'split_individual',
+    'giant_tour',
+
+    # 批量算子 (填充路径数组上的 o1/o6/o2)
+    'batch_swap',
+    'batch_relocate',
+    'batch_transfer',
     
     # 局部搜索策略 [cite: 541, 1360]
     'ls_vnd',
-    'ls_wait_adjustment'
+    'ls_wait_adjustment',
+    'wait_schedule',
+    'apls_main'
 ]
\ No newline at end of file
@@ -0,0 +1,96 @@
+import numpy as np
+
+# 批量算子作用于 schedule.pad_routes 得到的 (B, W) 填充路径数组，每行一条路径，lengths[b] 为第 b 行的有效长度；
+# 填充值 PAD 为 Depot 0 的编号，不会出现在客户的粒度邻居表中，因此邻居匹配时自然落空
+# 随机数由调用方一次性抽取后按列传入 (取值 [0, 1))，逐行语义与 destroy_repair 中的同名算子一致
+PAD = 0
+
+
+def pick(mask, u):
+    """每行在 mask 为 True 的列中按 u 均匀选取一列，整行为 False 时返回 -1"""
+    count = mask.sum(axis=1)
+    k = np.minimum((u * count).astype(np.int64), np.maximum(count - 1, 0))
+    idx = np.argmax(np.cumsum(mask, axis=1) > k[:, None], axis=1)
+    return np.where(count > 0, idx, -1)
+
+
+def batch_slots(problem, R, lengths, tasks, u):
+    """
+    choose_slot 的批量版：为 tasks[b] 在第 b 行中选插入位置 (0..lengths[b])
+    在紧邻任一粒度邻居前后的位置中均匀选取，该行没有邻居时在全部位置中均匀选取
+    """
+    B, W = R.shape
+    candidates = problem.neighbors.combined[tasks]
+    hit = (R[:, :, None] == candidates[:, None, :]).any(axis=2)
+    slots = np.zeros((B, W + 1), dtype=bool)
+    slots[:, :W] |= hit
+    slots[:, 1:] |= hit
+    idx = pick(slots, u)
+    fallback = np.minimum((u * (lengths + 1)).astype(np.int64), lengths)
+    return np.where(idx >= 0, idx, fallback)
+
+
+def batch_remove(R, lengths, pos):
+    """删除各行 pos 处的节点 (要求各行非空)，返回 (新数组, 被删节点)"""
+    B, W = R.shape
+    col = np.arange(W)[None, :]
+    src = np.minimum(col + (col >= pos[:, None]), W - 1)
+    out = np.take_along_axis(R, src, axis=1)
+    out[col >= (lengths - 1)[:, None]] = PAD
+    return out, R[np.arange(B), pos]
+
+
+def batch_insert(R, lengths, pos, tasks):
+    """在各行 pos 处插入 tasks[b]，返回宽度加 1 的新数组"""
+    B, W = R.shape
+    col = np.arange(W + 1)[None, :]
+    src = np.clip(col - (col > pos[:, None]), 0, W - 1)
+    out = np.take_along_axis(R, src, axis=1)
+    out[np.arange(B), pos] = tasks
+    out[col > lengths[:, None]] = PAD
+    return out
+
+
+def batch_swap(R, lengths, u):
+    """o1 批量版：各行随机交换两个位置，长度不足 2 的行不变；原地修改 R"""
+    rows = np.flatnonzero(lengths >= 2)
+    L = lengths[rows]
+    i = (u[rows, 0] * L).astype(np.int64)
+    j = (u[rows, 1] * (L - 1)).astype(np.int64)
+    j += j >= i
+    R[rows, i], R[rows, j] = R[rows, j], R[rows, i]
+    return R
+
+
+def batch_relocate(problem, R, lengths, u):
+    """o6 批量版：各行随机取出一个任务，再插回其粒度邻居前后；长度不足 2 的行不变"""
+    rows = np.flatnonzero(lengths >= 2)
+    out = np.full((len(R), R.shape[1] + 1), PAD, dtype=np.int32)
+    out[:, :-1] = R
+    if len(rows):
+        L = lengths[rows]
+        pos = (u[rows, 0] * L).astype(np.int64)
+        rest, tasks = batch_remove(R[rows], L, pos)
+        slot = batch_slots(problem, rest, L - 1, tasks, u[rows, 1])
+        out[rows] = batch_insert(rest, L - 1, slot, tasks)
+    return out
+
+
+def batch_transfer(problem, R_i, lengths_i, R_j, lengths_j, u):
+    """
+    o2/o3 批量版：从第 b 行 R_i 随机移出一个任务，插入 R_j 第 b 行中该任务的粒度邻居前后
+    R_i 为空的行不变；返回 (新 R_i, 新 R_j, 新 lengths_i, 新 lengths_j)
+    """
+    rows = np.flatnonzero(lengths_i >= 1)
+    new_i = R_i.copy()
+    new_j = np.full((len(R_j), R_j.shape[1] + 1), PAD, dtype=np.int32)
+    new_j[:, :-1] = R_j
+    lengths_i, lengths_j = lengths_i.copy(), lengths_j.copy()
+    if len(rows):
+        pos = (u[rows, 0] * lengths_i[rows]).astype(np.int64)
+        new_i[rows], tasks = batch_remove(R_i[rows], lengths_i[rows], pos)
+        slot = batch_slots(problem, R_j[rows], lengths_j[rows], tasks, u[rows, 1])
+        new_j[rows] = batch_insert(R_j[rows], lengths_j[rows], slot, tasks)
+        lengths_i[rows] -= 1
+        lengths_j[rows] += 1
+    return new_i, new_j, lengths_i, lengths_j
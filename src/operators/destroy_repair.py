@@ -1,49 +1,61 @@
 import random
-import copy
-from ..config import config
+import numpy as np
+from ..neighbors import neighbor_slots
 
-def reorder_task_o1(route):
+# 所有算子直接作用于节点编号数组 (np.int32)，返回新数组，不修改输入
+# problem 为 ProblemInstance，需要节点属性的算子通过编号查列
+# 双路径算子另接收 depots=(depot_i, depot_j)，即两条路径所属 Depot 编号 (不需要时忽略)
+
+def reorder_task_o1(route, problem=None):
     """o1: 单架无人机任务重排 - 随机交换两个任务点"""
     if len(route) < 2: return route
-    new_route = copy.copy(route)
+    new_route = route.copy()
     idx1, idx2 = random.sample(range(len(new_route)), 2)
-    new_route[idx1], new_route[idx2] = new_route[idx2], new_route[idx1]
+    new_route[[idx1, idx2]] = new_route[[idx2, idx1]]
     return new_route
 
-def transfer_task_o2(route_i, route_j):
+def transfer_task_o2(route_i, route_j, problem=None, depots=None):
     """o2: 同站任务转移 - 从 i 移一个任务到 j"""
     if len(route_i) == 0: return route_i, route_j
-    new_i, new_j = copy.copy(route_i), copy.copy(route_j)
-    
+
     # 随机取出一个任务
-    task = new_i.pop(random.randrange(len(new_i)))
-    # 随机插入到另一条路径
-    new_j.insert(random.randrange(len(new_j) + 1), task)
+    pos = random.randrange(len(route_i))
+    task = route_i[pos]
+    new_i = np.delete(route_i, pos)
+    # 插入到 j 中该任务某个邻居的前后，j 中没有邻居时随机插入
+    new_j = np.insert(route_j, choose_slot(route_j, task, problem), task)
     return new_i, new_j
 
-def migrate_task_o3(route_i, route_j):
+def migrate_task_o3(route_i, route_j, problem=None, depots=None):
     """o3: 跨站任务迁移 - 逻辑同 o2，但在 solver 中会跨 Depot 选择路径"""
-    return transfer_task_o2(route_i, route_j)
+    return transfer_task_o2(route_i, route_j, problem)
 
-def reduce_drones_o4(route_i, route_j):
+def reduce_drones_o4(route_i, route_j, problem=None, depots=None):
     """o4: 减少活跃飞机数 - 将 i 的所有任务并入 j，清空 i"""
-    new_j = route_j + route_i
-    new_i = []
+    new_j = np.concatenate((route_j, route_i))
+    new_i = route_i[:0]
     return new_i, new_j
 
-def time_window_greedy_o5(route):
+def time_window_greedy_o5(route, problem):
     """o5: 基于时间窗重排 - 按期望截止时间 w_b 排序以提升满意度 f2"""
     if len(route) < 2: return route
     # 排序可能会破坏 PD 任务的先后顺序，实际复现中需谨慎
-    return sorted(route, key=lambda x: x.w_b)
+    return route[np.argsort(problem.w_b[route], kind='stable')]
 
-def optimize_position_o6(route):
+def optimize_position_o6(route, problem=None):
     """o6: 任务位置优化 - 针对 PD 或 P 任务寻找更近的插入点"""
     if len(route) < 2: return route
-    new_route = copy.copy(route)
-    idx = random.randrange(len(new_route))
-    task = new_route.pop(idx)
-    
-    # 寻找一个随机新位置插入 (实际论文中会根据距离矩阵插入)
-    new_route.insert(random.randrange(len(new_route) + 1), task)
-    return new_route
\ No newline at end of file
+    idx = random.randrange(len(route))
+    task = route[idx]
+    new_route = np.delete(route, idx)
+
+    # 根据粒度邻居表，只在距离/时间窗邻居的前后插入
+    return np.insert(new_route, choose_slot(new_route, task, problem), task)
+
+def choose_slot(route, task, problem=None):
+    """在 route 中为 task 选择插入位置：优先随机选取邻居相邻的位置，否则完全随机"""
+    if problem is not None and len(route) > 0:
+        slots = neighbor_slots(route, problem.neighbors.candidates(task))
+        if len(slots):
+            return int(slots[random.randrange(len(slots))])
+    return random.randrange(len(route) + 1)
@@ -0,0 +1,171 @@
+import random
+import numpy as np
+from ..config import config
+from ..problem import DEMAND_D, DEMAND_P
+from ..schedule import calculate_satisfaction
+from .destroy_repair import transfer_task_o2
+
+# 载重/电量不可行位置与松弛不足位置的惩罚值 (保证总能选出一个位置，但只在别无选择时使用)
+INFEASIBLE_PENALTY = 1e9
+SLACK_PENALTY = 1e6
+
+
+class RouteProfile:
+    """
+    单条路径的前缀/后缀数组，用于 O(1) 评估在任一位置插入一个任务的代价与可行性
+    路径写作 depot -> v_1 .. v_L -> depot，共 L+1 段；插入位置 p (0..L) 表示拆开第 p 段
+    所有数组长度均为 L+1，按插入位置 p 下标：
+        start / end     第 p 段的起点与终点节点
+        leg             第 p 段距离；leg_load 第 p 段上的载荷
+        depart          离开第 p 段起点的时刻；arrive 到达第 p 段终点的时刻
+        dist_before     第 p 段之前的累计距离；dist_after 第 p 段之后的累计距离
+        load_before     第 0..p 段的最大载荷；load_after 第 p..L 段的最大载荷
+        slack_before    位置 p 之前各客户的最小前向时间窗松弛 (不超出期望窗口 w_b 可推迟的时间)
+        slack_after     位置 p 之后各客户的最小前向时间窗松弛
+        energy          整条路径的总能耗 (标量)
+    """
+    __slots__ = ('start', 'end', 'leg', 'leg_load', 'depart', 'arrive', 'dist_before',
+                 'dist_after', 'load_before', 'load_after', 'slack_before', 'slack_after', 'energy')
+
+    def __init__(self, problem, depot, route):
+        drone = problem.drone
+        route = np.asarray(route, dtype=np.int64)
+        L = len(route)
+        nodes = np.concatenate(([depot], route, [depot]))
+        self.start, self.end = nodes[:-1], nodes[1:]
+        self.leg = np.asarray(problem.dist.matrix[self.start, self.end], dtype=np.float64)
+
+        # 载荷：出发时携带全部 D/PD 包裹，D 卸货、P 装货、PD 一卸一装 (与 simulate_batch 一致)
+        weight = problem.weight[route]
+        demand = problem.demand_type[route]
+        dropped = np.where(demand != DEMAND_P, weight, 0.0)
+        picked = np.where(demand != DEMAND_D, weight, 0.0)
+        self.leg_load = np.empty(L + 1)
+        self.leg_load[0] = dropped.sum()
+        np.cumsum(picked - dropped, out=self.leg_load[1:])
+        self.leg_load[1:] += self.leg_load[0]
+
+        leg_energy = self.leg * (drone.self_weight + self.leg_load) * drone.energy_coeff
+        leg_time = leg_energy / drone.output_power
+        leg_time[1:] += drone.service_time
+        self.arrive = np.cumsum(leg_time)
+        self.depart = np.empty(L + 1)
+        self.depart[0] = 0.0
+        self.depart[1:] = self.arrive[:-1] + drone.service_time
+        self.energy = leg_energy.sum()
+
+        cum = np.concatenate(([0.0], np.cumsum(self.leg)))
+        self.dist_before = cum[:-1]
+        self.dist_after = cum[-1] - cum[1:]
+        self.load_before = np.maximum.accumulate(self.leg_load)
+        self.load_after = np.maximum.accumulate(self.leg_load[::-1])[::-1]
+
+        slack = np.maximum(problem.w_b[route] - self.arrive[:L], 0.0)
+        self.slack_before = np.empty(L + 1)
+        self.slack_before[0] = np.inf
+        np.minimum.accumulate(slack, out=self.slack_before[1:])
+        self.slack_after = np.empty(L + 1)
+        self.slack_after[L] = np.inf
+        self.slack_after[:L] = np.minimum.accumulate(slack[::-1])[::-1]
+
+    def insertion_costs(self, problem, task):
+        """
+        task 插入每个位置 p 的代价 (长度 L+1 的数组)，每个位置 O(1)：
+            代价 = 绕行距离 - REPAIR_SAT_WEIGHT * task 自身满意度
+        载重/电量超限的位置加 INFEASIBLE_PENALTY；推迟量超过前后客户时间窗松弛的位置加 SLACK_PENALTY
+        插入 D/PD 任务使之前各段载荷增加 w，插入 P/PD 任务使之后各段载荷增加 w，
+        两者对时间与能耗的影响分别等于 w 乘以 dist_before / dist_after
+        PD 任务在同一节点完成取送，不存在跨节点的先取后送顺序约束
+        """
+        drone = problem.drone
+        matrix = problem.dist.matrix
+        tf = drone.energy_coeff / drone.output_power
+        w = problem.weight[task]
+        demand = problem.demand_type[task]
+        drop = w if demand != DEMAND_P else 0.0
+        pick = w if demand != DEMAND_D else 0.0
+
+        leg_in = np.asarray(matrix[self.start, task], dtype=np.float64)
+        leg_out = np.asarray(matrix[task, self.end], dtype=np.float64)
+        base = drone.self_weight + self.leg_load
+        load_in, load_out = base + drop, base + pick
+
+        prefix_shift = tf * drop * self.dist_before
+        arrival = self.depart + prefix_shift + tf * load_in * leg_in
+        delay = arrival + drone.service_time + tf * load_out * leg_out - self.arrive
+        suffix_shift = delay + tf * pick * self.dist_after
+        energy = self.energy + drone.energy_coeff * (
+            load_in * leg_in + load_out * leg_out - base * self.leg
+            + drop * self.dist_before + pick * self.dist_after)
+
+        feasible = (self.load_before + drop <= drone.max_payload + 1e-9) & \
+                   (self.load_after + pick <= drone.max_payload + 1e-9) & \
+                   (energy <= drone.battery_capacity + 1e-9)
+        on_time = (prefix_shift <= self.slack_before) & (suffix_shift <= self.slack_after)
+
+        cost = leg_in + leg_out - self.leg
+        cost -= config.REPAIR_SAT_WEIGHT * calculate_satisfaction(problem, task, arrival)
+        cost += np.where(feasible, 0.0, INFEASIBLE_PENALTY) + np.where(on_time, 0.0, SLACK_PENALTY)
+        return cost
+
+
+def regret_insert(problem, routes, depots, tasks, k=None, locked=None):
+    """
+    regret-k 插入：反复为每个待插入任务求其在各路径中的最优插入代价，
+    选择 (第 k 优 - 最优) 后悔值最大的任务插入其最优位置，仅重建被插入路径的前缀/后缀数组
+    路径数少于 k 时取最差路径的代价；只有一条路径时退化为最便宜插入
+    locked[r] 给定时第 r 条路径的前 locked[r] 个节点之前不可插入 (已执行的冻结前缀)
+    返回新的路径列表 (int32)，不修改输入
+    """
+    k = k or config.REGRET_K
+    routes = [np.asarray(r, dtype=np.int32) for r in routes]
+    profiles = [RouteProfile(problem, depots[i], r) for i, r in enumerate(routes)]
+
+    def costs(task, r):
+        c = profiles[r].insertion_costs(problem, task)
+        if locked is not None:
+            c[:locked[r]] = np.inf
+        return c
+
+    # 代价表 table[t][r] 跨轮复用：插入只改变一条路径，下一轮只需重算该路径对应的一列
+    pending = list(tasks)
+    table = [[costs(task, r) for r in range(len(routes))] for task in pending]
+    while pending:
+        best = None
+        for t_idx, row in enumerate(table):
+            route_best = np.array([c.min() for c in row])
+            order = np.argsort(route_best, kind='stable')
+            regret = route_best[order[min(k, len(order)) - 1]] - route_best[order[0]]
+            r = int(order[0])
+            key = (regret, -route_best[r])
+            if best is None or key > best[0]:
+                best = (key, t_idx, r, int(np.argmin(row[r])))
+        _, t_idx, r, pos = best
+        task = pending.pop(t_idx)
+        table.pop(t_idx)
+        routes[r] = np.insert(routes[r], pos, task).astype(np.int32)
+        profiles[r] = RouteProfile(problem, depots[r], routes[r])
+        for t, row in zip(pending, table):
+            row[r] = costs(t, r)
+    return routes
+
+
+def regret_insertion_o7(route_i, route_j, problem=None, depots=None):
+    """
+    o7: 破坏-修复 - 从两条路径中随机移出 REPAIR_REMOVE 个任务，
+    再以 regret-k 最便宜插入 (逐位置 O(1) 代价/可行性评估) 重新插回两条路径
+    depots 为两条路径所属 Depot 编号；未提供 problem 时退化为 o2
+    """
+    if problem is None or depots is None:
+        return transfer_task_o2(route_i, route_j, problem)
+    n_i = len(route_i)
+    total = n_i + len(route_j)
+    if total == 0:
+        return route_i, route_j
+
+    removed = set(random.sample(range(total), min(config.REPAIR_REMOVE, total)))
+    keep_i = [p for p in range(n_i) if p not in removed]
+    keep_j = [p - n_i for p in range(n_i, total) if p not in removed]
+    tasks = [route_i[p] if p < n_i else route_j[p - n_i] for p in sorted(removed)]
+    new_i, new_j = regret_insert(problem, [route_i[keep_i], route_j[keep_j]], depots, tasks)
+    return new_i, new_j
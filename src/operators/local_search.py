@@ -1,76 +1,148 @@
-import copy
-from ..config import config
-from ..utils import calculate_distance
+import numpy as np
+from ..neighbors import neighbor_slots
+from ..schedule import pad_routes, simulate_route
 
-def ls_vnd(route, drone_model):
+def ls_vnd(route, problem, depot=None, cache=None):
     """
     实现局部搜索算子 LS-VND (变邻域下降搜索) [cite: 551, 1362]
-    包含基础算子 o1-o5 以及特定算子 o7 (距离瓶颈) 和 o8 (满意度瓶颈) [cite: 552, 1363]
+    实现特定算子 o7 (距离瓶颈)：把路径中最长一段飞行的终点重新插入绕行增量最小的位置 [cite: 552, 1363]
+    route: 节点编号数组；depot: 该路径所属 Depot 的节点编号 (路径起点)
+    cache: 可选 EvaluationCache；新旧路径均已缓存且新路径被旧路径支配时直接放弃该移动
     """
-    new_route = copy.deepcopy(route)
-    if len(new_route) < 2:
-        return new_route
+    if len(route) < 2:
+        return route
 
     # 1. 实现 o7: 调整路径中飞行时间最长(距离最远)的任务节点 [cite: 552-553, 1364]
-    max_dist = -1
-    bottleneck_idx = -1
-    for i in range(len(new_route)):
-        # 计算前一个点到当前点的距离
-        prev_node = config.DEPOT_OBJ if i == 0 else new_route[i-1] # 需在具体逻辑中定义起始点
-        dist = calculate_distance(prev_node, new_route[i])
-        if dist > max_dist:
-            max_dist = dist
-            bottleneck_idx = i
-    
-    if bottleneck_idx != -1:
-        node = new_route.pop(bottleneck_idx)
-        new_route.insert(0, node) # 简单尝试移动到起始位置以缩短后续链条
+    # 查表：一次取出 (起点 -> 客户1 -> ... -> 客户n) 的全部边长
+    matrix = problem.dist.matrix
+    if depot is not None:
+        legs = matrix[np.concatenate(([depot], route[:-1])), route]
+    else:
+        legs = np.concatenate(([0.0], matrix[route[:-1], route[1:]]))
+    bottleneck_idx = int(np.argmax(legs))
+
+    node = route[bottleneck_idx]
+    rest = np.delete(route, bottleneck_idx)
+    # 只评估 node 的粒度邻居前后的插入位置 (没有邻居时评估全部位置)，取绕行增量最小者
+    slots = neighbor_slots(rest, problem.neighbors.candidates(node))
+    if len(slots) == 0:
+        slots = np.arange(len(rest) + 1)
+    home = depot if depot is not None else rest[0]
+    ends = np.concatenate(([home], rest, [home]))
+    before, after = ends[slots], ends[slots + 1]
+    detour = matrix[before, node] + matrix[node, after] - matrix[before, after]
+    new_route = np.insert(rest, int(slots[np.argmin(detour)]), node)
+    if cache is not None and depot is not None and dominated_by_cached(cache, depot, route, new_route):
+        return route
 
-    # 2. 实现 o8: 满意度瓶颈调整 [cite: 554, 1365]
-    # 找到到达时间与期望时间偏差最大的节点，尝试改变其位置
-    # (此逻辑需要配合 solver 中的时间推算结果，此处预留结构)
-    
     return new_route
 
-def ls_wait_adjustment(route, drone_model):
+def dominated_by_cached(cache, depot, route, new_route):
+    """按路径级缓存判断 new_route 是否被 route 支配 (距离不更短且满意度不更高)；任一未缓存时返回 False"""
+    padded, lengths = pad_routes([route, new_route])
+    old_key, new_key = cache.route_keys(padded, lengths, [depot, depot])
+    old, new = cache.routes.get(old_key), cache.routes.get(new_key)
+    if old is None or new is None:
+        return False
+    return new[0] >= old[0] and new[1] <= old[1]
+
+
+def wait_schedule(problem, routes, arrival, mask):
+    """
+    批量 LS-wait 核心：在 (B, L) 填充矩阵上为每条路径计算使满意度最优的等待时长，逐路径 O(L)
+    arrival 为当前 (已含已有等待的) 到达时刻；返回与 routes 同形状的新增等待时长
+    1. 反向一遍：每个节点在不损失满意度的前提下可被推迟的量 tol
+           a <= w_b:  w_b - a    (早到或在期望窗口内，推迟到 w_b 为止不降低满意度)
+           a >= w_l:  inf        (满意度已为 0)
+           其余:      0          (处于迟到下降段)
+       后缀最小值 F_k = min_{j>=k} tol_j 即位置 k 的前向松弛 (推迟第 k 个及之后全部节点的最大量)
+    2. 正向一遍：节点 k 早于 w_a 时需要的推迟量为 w_a - a_k，受 F_k 限制；
+       由于 F 沿路径单调不减，累计推迟量 D_k = max(D_{k-1}, min(need_k, F_k)) 即前缀最大值，
+       在第 k 个节点前插入的等待为 D_k - D_{k-1}
+    满意度按公式 (2) 分段线性：推迟只会让早到节点上升、窗口内节点不变，因此结果总满意度不减
+    """
+    t = np.where(mask, arrival, 0.0)
+    w_a, w_b, w_l = problem.w_a[routes], problem.w_b[routes], problem.w_l[routes]
+    tol = np.where(t <= w_b, w_b - t, np.where(t >= w_l, np.inf, 0.0))
+    tol = np.where(mask, tol, np.inf)
+    slack = np.minimum.accumulate(tol[:, ::-1], axis=1)[:, ::-1]
+    need = np.where(mask, w_a - t, 0.0)
+    delay = np.maximum.accumulate(np.maximum(np.minimum(need, slack), 0.0), axis=1)
+    waits = np.diff(delay, axis=1, prepend=0.0)
+    return np.where(mask, waits, 0.0)
+
+
+def ls_wait_adjustment(route, problem, depot=None, arrival=None):
     """
     实现 LS-wait: 等待时间精修 [cite: 558, 1179, 1366]
     通过增加前置节点的等待时长，延后后续节点的到达时间，
     使其尽可能重新落入期望窗范围内。 [cite: 574, 1367-1368]
+    返回与 route 对齐的等待时长数组 (wait[k] 为飞往第 k 个节点前的等待)，见 wait_schedule
+    arrival 未给出时按 depot 推算 (不含等待)
     """
-    if len(route) < 2:
-        return route
-        
-    adjusted_route = copy.deepcopy(route)
-    
-    # 论文逻辑：如果调整 j1 的等待时间 t_wait 能让 j2 重新落入 [w_a, w_b]
-    # 遍历路径中的节点对 (j1, j2) [cite: 556, 574]
-    for i in range(len(adjusted_route) - 1):
-        j1 = adjusted_route[i]
-        j2 = adjusted_route[i+1]
-        
-        # 假设 j2 当前到达时间晚于期望窗口 (arrival_j2 > w_b_j2)
-        # 但如果是因为 j1 出发太早导致的，则可以通过增加 j1 的等待时间来微调
-        # 注意：此策略在论文图中 (Fig. 5) 重点展示了通过等待优化满意度的冲突 [cite: 570]
-        
-        # 伪代码逻辑：
-        # if j2.arrival_time > j2.w_b:
-        #     potential_wait = j1.w_b - j1.arrival_time
-        #     if potential_wait > 0:
-        #         j1.wait_time += potential_wait
-    
-    return adjusted_route
+    route = np.asarray(route)
+    if len(route) == 0:
+        return np.zeros(0)
+    if arrival is None:
+        arrival = simulate_route(problem, depot, route).row(0, len(route))
+    return wait_schedule(problem, route[None, :], np.asarray(arrival)[None, :],
+                         np.ones((1, len(route)), dtype=bool))[0]
 
-def apls_main(pareto_front, drone_model):
+
+def apls_main(pareto_front, problem, cache=None):
     """
     Adaptive Pareto Local Search (APLS) 主函数 [cite: 541, 1118]
     只针对非重复的 Pareto Front 进行局部搜索，提高效率 [cite: 542]
+    pareto_front 为 Individual 列表 (例如档案成员)，返回新的个体列表，原个体不变；
+    没有评价缓存的成员 (EpsilonArchive 的紧凑副本) 先复制并整体评价
+    cache: 可选 EvaluationCache，LS-VND 候选的评价与剪枝均先查缓存
     """
-    new_pf = []
+    # 延迟导入：solver 包依赖 operators 包
+    from ..solver.evaluation import evaluate_population
+
+    seen, front = set(), []
     for pe in pareto_front:
-        # 1. 尝试使用 LS-VND 优化物理路径 [cite: 544]
-        pe_prime = ls_vnd(pe, drone_model)
-        # 2. 尝试使用 LS-wait 优化时间分配 [cite: 549]
-        pe_final = ls_wait_adjustment(pe_prime, drone_model)
-        new_pf.append(pe_final)
-    return new_pf
\ No newline at end of file
+        key = tuple(pe.obj)
+        if key not in seen:
+            seen.add(key)
+            front.append(pe if pe.route_dist is not None else pe.copy())
+    evaluate_population(problem, [pe for pe in front if pe.route_dist is None], cache)
+
+    # 1. 尝试使用 LS-VND 优化物理路径 [cite: 544]；全部候选一次批量评价，未被原解支配才保留
+    candidates = []
+    for pe in front:
+        changes = {}
+        for k in range(pe.num_routes):
+            route = pe.route(k)
+            new_route = ls_vnd(route, problem, pe.route_depots[k], cache)
+            if not np.array_equal(new_route, route):
+                changes[k] = new_route
+        candidates.append(pe.replace_routes(changes) if changes else pe)
+    evaluate_population(problem, [c for c in candidates if c.dirty is None or c.dirty], cache)
+    new_pf = []
+    for pe, cand in zip(front, candidates):
+        dominated = all(a <= b for a, b in zip(pe.obj, cand.obj)) and pe.obj != cand.obj
+        new_pf.append(pe if dominated else cand)
+
+    # 2. 尝试使用 LS-wait 优化时间分配 [cite: 549]：所有个体的所有路径拼成一个批次，O(总长度)
+    routes = [(ind, k) for ind in new_pf for k in range(ind.num_routes)]
+    padded, lengths = pad_routes([ind.route(k) for ind, k in routes])
+    arrival = pad_routes([ind.route_arrival(k) for ind, k in routes], np.float64)[0]
+    mask = np.arange(padded.shape[1])[None, :] < lengths[:, None]
+    extra = wait_schedule(problem, padded, arrival, mask)
+    b = 0
+    for i, ind in enumerate(new_pf):
+        block, lens = extra[b:b + ind.num_routes], lengths[b:b + ind.num_routes]
+        b += ind.num_routes
+        changed = [k for k in range(ind.num_routes) if block[k].any()]
+        if not changed:
+            continue
+        waited = ind.copy()
+        if waited.wait is None:
+            waited.wait = np.zeros(len(waited.tour))
+        for k in changed:
+            waited.wait[waited.offsets[k]:waited.offsets[k + 1]] += block[k, :lens[k]]
+        waited.dirty = changed
+        new_pf[i] = waited
+    evaluate_population(problem, [ind for ind in new_pf if ind.dirty is None or ind.dirty], cache)
+    return new_pf
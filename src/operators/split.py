@@ -0,0 +1,176 @@
+import random
+import numpy as np
+from ..config import config
+from ..models import Individual
+from ..problem import DEMAND_D, DEMAND_P
+from ..schedule import calculate_satisfaction
+from .insertion import INFEASIBLE_PENALTY
+
+
+def segment_costs(problem, tour, sat_weight=0.0, max_len=None, depots=None, mask=None, constrained=True):
+    """
+    巨型路径 tour 上全部候选子段的最优所属 Depot 与代价 (Prins split 的弧权)
+    子段 (s, l) 为 tour[s:s+l] 组成的一条路径，l = 1..L；返回 (cost, depot) 两个 (n, L) 数组，
+    越界的子段代价为 inf
+    代价 = SIGMA * 闭环距离 + RHO (每条路径计一架活跃无人机) - sat_weight * 路径满意度
+    距离、能耗与最大载荷由巨型路径上的前缀和 O(1) 得到 (与 simulate_batch 同一载荷/能耗模型)：
+        第 q 段载荷 = 出发载荷 Dtot + net[q] - net[s]，net 为净装卸量的前缀和
+        内部各段能耗之和 = alpha * ((W0 + Dtot - net[s]) * 段长之和 + sum(段长 * net))
+    满意度需要子段内每个客户的到达时刻：出发载荷 Dtot 随子段终点变化，前面客户的到达时刻也随之改变，
+    且满意度对到达时刻是分段线性的，无法用前缀和合并，因此 sat_weight > 0 时每个子段 O(L)，
+    总计 O(n * L^2) 时间与 (n * L, L) 的临时数组；sat_weight = 0 时为 O(n * L)
+    载重或电量不可行的子段不可选；单客户子段总是可选 (不可行时加 INFEASIBLE_PENALTY)，保证划分存在；
+    constrained 为 False 时不检查载重与电量 (与 set_objectives 的目标一致)
+    depots: 候选 Depot 节点编号 (默认全部 Depot)
+    mask: 可选 (n, L) 布尔数组，只计算其为 True 的子段 (其余为 inf)，满意度项的开销随之按子段数缩减
+    """
+    drone = problem.drone
+    tour = np.asarray(tour, dtype=np.int64)
+    n = len(tour)
+    L = min(max_len or config.SPLIT_MAX_LEN, n)
+    matrix = problem.dist.matrix
+
+    weight = problem.weight[tour]
+    demand = problem.demand_type[tour]
+    dropped = np.where(demand != DEMAND_P, weight, 0.0)
+    picked = np.where(demand != DEMAND_D, weight, 0.0)
+    drop_prefix = np.concatenate(([0.0], np.cumsum(dropped)))
+    net = np.concatenate(([0.0], np.cumsum(picked - dropped)))     # net[k]: 服务前 k 个客户后的净装载变化
+    inner = np.zeros(n)
+    inner[1:] = matrix[tour[:-1], tour[1:]]                         # inner[k]: tour[k-1] -> tour[k]
+    along = np.cumsum(inner)
+    moment = np.cumsum(inner * net[:n])
+
+    s = np.arange(n)[:, None]
+    span = np.arange(1, L + 1)[None, :]
+    valid = s + span <= n
+    if mask is not None:
+        valid &= mask
+    e = np.minimum(s + span - 1, n - 1)                             # 子段最后一个客户的位置
+    load0 = drop_prefix[e + 1] - drop_prefix[s]                     # 出发载荷 Dtot
+    base = drone.self_weight + load0 - net[s]
+    inner_dist = along[e] - along[s]
+    inner_moment = moment[e] - moment[s]
+    rise = net[np.minimum(s + span, n)] - net[s]
+    max_load = load0 + np.maximum(np.maximum.accumulate(rise, axis=1), 0.0)
+    load_ok = max_load <= drone.max_payload + 1e-9
+
+    if sat_weight:
+        rows, cols = np.nonzero(valid)                              # 只对有效子段逐客户推算到达时刻
+        pos = np.minimum(rows[:, None] + np.arange(L), n - 1)      # (K, L)：子段内第 j 个客户的位置
+        in_segment = np.arange(L)[None, :] <= cols[:, None]
+        partial_dist = along[pos] - along[rows][:, None]
+        partial_moment = moment[pos] - moment[rows][:, None]
+        service = drone.service_time * np.arange(L)
+
+    best_cost = np.full((n, L), np.inf)
+    best_depot = np.zeros((n, L), dtype=np.int32)
+    for d in (problem.depot_nodes if depots is None else depots):
+        first = np.asarray(matrix[d, tour], dtype=np.float64)[:, None]
+        back = np.asarray(matrix[tour, d], dtype=np.float64)[e]
+        energy = drone.energy_coeff * (first * (drone.self_weight + load0) + base * inner_dist + inner_moment
+                                       + back * (base + net[e + 1]))
+        cost = config.SIGMA * (first + inner_dist + back) + config.RHO
+        if sat_weight:
+            to_node = drone.energy_coeff * (first[rows] * (drone.self_weight + load0[rows, cols])[:, None]
+                                            + base[rows, cols][:, None] * partial_dist + partial_moment)
+            arrival = to_node / drone.output_power + service
+            sat = np.where(in_segment, calculate_satisfaction(problem, tour[pos], arrival), 0.0)
+            cost[rows, cols] -= sat_weight * sat.sum(axis=1)
+        if constrained:
+            feasible = load_ok & (energy <= drone.battery_capacity + 1e-9)
+            cost = np.where(feasible, cost, np.where(span == 1, cost + INFEASIBLE_PENALTY, np.inf))
+        cost[~valid] = np.inf
+        better = cost < best_cost
+        best_cost[better] = cost[better]
+        best_depot[better] = d
+    return best_cost, best_depot
+
+
+def split_tour(problem, tour, sat_weight=0.0, max_len=None):
+    """
+    Prins split：把巨型路径最优地划分为若干条无人机路径 (不改变客户先后顺序)
+    在以位置 0..n 为节点、子段为弧的无环图上求最短路，O(n * L) 次松弛；
+    路径条数 (活跃无人机数) 与各路径所属 Depot 均由 DP 决定
+    返回 (routes, route_depots)
+    """
+    tour = np.asarray(tour, dtype=np.int32)
+    n = len(tour)
+    if n == 0:
+        return [], []
+    cost, depot = segment_costs(problem, tour, sat_weight, max_len)
+    L = cost.shape[1]
+    value = np.full(n + 1, np.inf)
+    value[0] = 0.0
+    pred = np.zeros(n + 1, dtype=np.int64)
+    for s in range(n):
+        hi = min(L, n - s)
+        cand = value[s] + cost[s, :hi]
+        better = cand < value[s + 1:s + 1 + hi]
+        if better.any():
+            value[s + 1:s + 1 + hi][better] = cand[better]
+            pred[s + 1:s + 1 + hi][better] = s
+
+    routes, route_depots = [], []
+    end = n
+    while end > 0:
+        start = pred[end]
+        routes.append(tour[start:end])
+        route_depots.append(int(depot[start, end - start - 1]))
+        end = start
+    return routes[::-1], route_depots[::-1]
+
+
+def split_pair_o8(route_i, route_j, problem=None, depots=None):
+    """
+    o8: 双路径 split - 两条路径首尾相接为一段巨型路径，按 segment_costs 的子段代价重选切分点
+    前一段归 depot_i、后一段归 depot_j (路径条数与所属 Depot 不变，任一段可为空)；
+    满意度权重每次在 [0, SPLIT_SAT_WEIGHT] 间随机取值，使搜索在两个目标之间都能利用 split 的代价
+    子段代价与目标函数一致、不检查载重与电量：搜索中的路径大多超载，带约束时几乎没有可选的切分点
+    只需以 0 开始与以 n 结束的子段，满意度项为 O(n^2)
+    """
+    tour = np.concatenate((route_i, route_j))
+    n = len(tour)
+    if n == 0 or problem is None or depots is None:
+        return route_i, route_j
+    sat_weight = config.SPLIT_SAT_WEIGHT * random.random()
+    starts = np.arange(n)
+    head_mask = np.zeros((n, n), dtype=bool)
+    head_mask[0] = True
+    tail_mask = np.zeros((n, n), dtype=bool)
+    tail_mask[starts, n - 1 - starts] = True
+    head, _ = segment_costs(problem, tour, sat_weight, n, [depots[0]], head_mask, constrained=False)
+    tail, _ = segment_costs(problem, tour, sat_weight, n, [depots[1]], tail_mask, constrained=False)
+    # total[c]: 前 c 个客户归 i、其余归 j 的代价 (空路径不计)
+    total = np.concatenate(([0.0], head[0])) + np.concatenate((tail[starts, n - 1 - starts], [0.0]))
+    c = int(np.argmin(total))
+    return tour[:c], tour[c:]
+
+
+def split_individual(problem, tour, sat_weight=0.0, max_len=None):
+    """
+    解码器：巨型路径 -> 个体
+    个体的 tour 本身就是全部路径首尾相接的巨型路径，算子可直接用它重新划分 (保持客户顺序，重选路径与 Depot)
+    除 DP 选出的路径外，每个 Depot 另保留一条空路径，供算子在该站启用新的无人机
+    """
+    routes, route_depots = split_tour(problem, tour, sat_weight, max_len)
+    routes += [[] for _ in range(problem.num_depots)]
+    route_depots += problem.depot_nodes.tolist()
+    return Individual.from_routes(routes, route_depots)
+
+
+def giant_tour(problem, kind, rng=np.random):
+    """
+    随机巨型路径 (初始解)：
+        'time'   按期望时间窗中点排序并加随机扰动，偏向满意度
+        'sweep'  以随机 Depot 为中心按极角扫描，起始角随机，偏向距离
+    """
+    nodes = problem.customer_nodes
+    if kind == 'time':
+        centre = (problem.w_a[nodes] + problem.w_b[nodes]) / 2
+        key = centre + rng.normal(0.0, 1.0, len(nodes)) * rng.random() * centre.std()
+    else:
+        d = rng.randint(problem.num_depots)
+        angle = np.arctan2(problem.y[nodes] - problem.y[d], problem.x[nodes] - problem.x[d])
+        key = (angle - rng.uniform(-np.pi, np.pi)) % (2 * np.pi)
+    return nodes[np.argsort(key, kind='stable')]
@@ -0,0 +1,84 @@
+import numpy as np
+from .config import config
+from .models import Drone
+from .distance import DistanceMatrix
+from .neighbors import NeighborLists
+
+# 任务类型的整数编码 (列式存储用)
+DEMAND_DEPOT = -1
+DEMAND_D = 0
+DEMAND_P = 1
+DEMAND_PD = 2
+
+DEMAND_CODES = {
+    config.D_TYPE_CODE: DEMAND_D,
+    config.P_TYPE_CODE: DEMAND_P,
+    config.PD_TYPE_CODE: DEMAND_PD,
+}
+
+
+class ProblemInstance:
+    """
+    问题实例：将 Depot 与客户属性按列 (struct-of-arrays) 存储
+    节点编号与 DistanceMatrix 一致：先 Depot (0..m-1)，后客户 (m..m+n-1)
+    解的编码只保存节点编号，所有属性均通过编号查列
+    """
+    def __init__(self, customers, depots, metric=None, drone=None, mmap_path=None, dist=None):
+        self.customers = list(customers)
+        self.depots = depots if isinstance(depots, list) else [depots]
+        self.drone = drone or Drone()
+        self.num_depots = len(self.depots)
+        self.num_customers = len(self.customers)
+        self.num_nodes = self.num_depots + self.num_customers
+
+        m = self.num_depots
+        nodes = self.depots + self.customers
+        self.x = np.array([p.x for p in nodes], dtype=np.float64)
+        self.y = np.array([p.y for p in nodes], dtype=np.float64)
+
+        # Depot 行填充中性值：无重量、无时间窗限制
+        self.weight = np.zeros(self.num_nodes, dtype=np.float64)
+        self.w_a = np.zeros(self.num_nodes, dtype=np.float64)
+        self.w_b = np.full(self.num_nodes, np.inf)
+        self.w_e = np.zeros(self.num_nodes, dtype=np.float64)
+        self.w_l = np.full(self.num_nodes, np.inf)
+        self.demand_type = np.full(self.num_nodes, DEMAND_DEPOT, dtype=np.int8)
+        for i, c in enumerate(self.customers):
+            k = m + i
+            self.weight[k] = c.weight
+            self.w_a[k], self.w_b[k], self.w_e[k], self.w_l[k] = c.w_a, c.w_b, c.w_e, c.w_l
+            self.demand_type[k] = DEMAND_CODES[c.demand_type]
+
+        self.depot_nodes = np.arange(m, dtype=np.int32)
+        self.customer_nodes = np.arange(m, self.num_nodes, dtype=np.int32)
+        self.dist = dist if dist is not None else DistanceMatrix.from_nodes(
+            self.customers, self.depots, metric, self.drone, mmap_path)
+        self._neighbors = None
+
+    @property
+    def neighbors(self):
+        """粒度邻居表，首次访问时构建"""
+        if self._neighbors is None:
+            self._neighbors = NeighborLists(self)
+        return self._neighbors
+
+    def extend(self, customers):
+        """
+        追加新客户后的问题实例 (原实例不变)：原有节点编号保持不变，已有的解可直接沿用；
+        距离矩阵只补算新增行列，邻居表在新实例上重新构建
+        """
+        customers = list(customers)
+        x = np.concatenate((self.x, [c.x for c in customers]))
+        y = np.concatenate((self.y, [c.y for c in customers]))
+        dist = self.dist.extend(x, y, customers)
+        return ProblemInstance(self.customers + customers, self.depots, dist.metric, self.drone, dist=dist)
+
+    def customer(self, node):
+        """节点编号 -> Customer 对象 (仅用于输出/可视化)"""
+        return self.customers[node - self.num_depots]
+
+    def depot(self, node):
+        return self.depots[node]
+
+    def node_of(self, customer):
+        return self.dist.customer_rows[customer.id]
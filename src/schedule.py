@@ -0,0 +1,113 @@
+import numpy as np
+from .problem import DEMAND_D, DEMAND_P
+
+
+class ScheduleBatch:
+    """
+    一批路径的调度结果 (全部为数组，不写回任何 Customer 对象)
+    二维数组形状为 (B, L)，L 为本批最长路径长度，mask 标记有效位置
+    """
+    __slots__ = ('mask', 'arrival', 'departure', 'load', 'energy', 'satisfaction',
+                 'distance', 'route_satisfaction', 'total_energy', 'max_load', 'return_time')
+
+    def row(self, b, length):
+        """取出第 b 条路径的到达时间 (长度 length)"""
+        return self.arrival[b, :length]
+
+    def feasible(self, drone):
+        """载重与电池约束是否满足 (逐路径布尔数组)"""
+        return (self.max_load <= drone.max_payload + 1e-9) & \
+               (self.total_energy <= drone.battery_capacity + 1e-9)
+
+
+def calculate_satisfaction(problem, nodes, arrival_time):
+    """
+    Customer.calculate_satisfaction 的向量化版本 (公式 (2))，按节点编号查时间窗列
+    分段线性满意度等价于 clip(min(左斜坡, 右斜坡), 0, 1)；
+    fmin 忽略零宽容忍区间在端点处产生的 0/0；两侧均为 0/0 时到达时刻恰在退化窗口内，取 1
+    """
+    t = np.asarray(arrival_time, dtype=np.float64)
+    w_e = problem.w_e[nodes]
+    w_l = problem.w_l[nodes]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        early = (t - w_e) / (problem.w_a[nodes] - w_e)
+        late = (w_l - t) / (w_l - problem.w_b[nodes])
+    return np.nan_to_num(np.clip(np.fmin(early, late), 0.0, 1.0), nan=1.0)
+
+
+def pad_routes(routes, dtype=np.int32):
+    """将若干节点编号序列 (或与之等长的数值序列) 填充为 (B, L) 矩阵与长度数组"""
+    lengths = np.fromiter((len(r) for r in routes), dtype=np.int64, count=len(routes))
+    width = int(lengths.max()) if len(routes) else 0
+    padded = np.zeros((len(routes), max(width, 1)), dtype=dtype)
+    for b, r in enumerate(routes):
+        padded[b, :len(r)] = r
+    return padded, lengths
+
+
+def simulate_batch(problem, routes, lengths, depots, waits=None):
+    """
+    批量推算路径调度，全部计算在 (B, L) 数组上完成，无逐节点 Python 循环
+    t=0 从仓库出发，携带全部 D/PD 包裹；D 点卸货，P 点装货，PD 点一卸一装。
+    每段飞行时间与能耗按公式 (25) 随当前载荷变化：
+        能耗 e = d * (W0 + W_payload) * alpha，飞行时间 t = e / P
+    离开客户前加服务时间 t0，最后一个客户之后返回所属仓库
+    routes: (B, L) 节点编号矩阵；lengths: 各路径实际长度；depots: 各路径所属 Depot 编号
+    waits: 可选 (B, L) 等待时长，waits[b, k] 为飞往第 k 个节点前在上一停靠点的等待 (落地等待，不耗电)
+    """
+    drone = problem.drone
+    B, L = routes.shape
+    rows = np.arange(B)
+    lengths = np.asarray(lengths)
+    depots = np.asarray(depots, dtype=np.int64)
+    mask = np.arange(L)[None, :] < lengths[:, None]
+
+    # 多留一列并以所属仓库填充：第 len 列即返程，其后为仓库到仓库 (距离与重量均为 0)
+    nodes = np.empty((B, L + 1), dtype=np.int64)
+    nodes[:, :L] = np.where(mask, routes, depots[:, None])
+    nodes[:, L] = depots
+    demand = problem.demand_type[nodes]
+    weight = problem.weight[nodes]
+    dropped = np.where(demand != DEMAND_P, weight, 0.0)
+    picked = np.where(demand != DEMAND_D, weight, 0.0)
+
+    # 第 k 段 (进入第 k 个节点) 的载荷 = 出发载荷 - 之前已卸 + 之前已装
+    load = np.empty((B, L + 1))
+    load[:, 0] = np.cumsum(dropped, axis=1)[:, -1]     # 顺序累加，理由见下方 route_satisfaction 处
+    np.cumsum(picked[:, :-1] - dropped[:, :-1], axis=1, out=load[:, 1:])
+    load[:, 1:] += load[:, :1]
+
+    num_nodes = problem.dist.num_nodes
+    prev = np.empty((B, L + 1), dtype=np.int64)
+    prev[:, 0] = depots
+    prev[:, 1:] = nodes[:, :-1]
+    legs = np.take(problem.dist.matrix.reshape(-1), prev * num_nodes + nodes)
+    leg_energy = legs * (drone.self_weight + load) * drone.energy_coeff
+    leg_time = leg_energy / drone.output_power
+    leg_time[:, 1:] += drone.service_time
+    if waits is not None:
+        leg_time[:, :L] += np.where(mask, waits, 0.0)
+    clock = np.cumsum(leg_time, axis=1)
+
+    out = ScheduleBatch()
+    out.mask = mask
+    out.load = load[:, :L]
+    out.arrival = clock[:, :L]
+    out.departure = out.arrival + drone.service_time
+    out.energy = np.cumsum(leg_energy[:, :L], axis=1)
+    out.satisfaction = np.where(mask, calculate_satisfaction(problem, nodes[:, :L], out.arrival), 0.0)
+    # 逐行顺序累加 (cumsum) 而非 sum 的成对求和：填充的尾部 0 不改变结果，
+    # 同一路径无论与哪些路径同批推算都得到逐位相同的值 (评价缓存与并行可复现性依赖这一点)
+    out.route_satisfaction = np.cumsum(out.satisfaction, axis=1)[:, -1]
+    out.distance = np.cumsum(legs, axis=1)[:, -1]
+    out.total_energy = np.cumsum(leg_energy, axis=1)[:, -1]
+    out.max_load = np.where(lengths > 0, load.max(axis=1), 0.0)
+    out.return_time = np.where(lengths > 0, clock[rows, lengths], 0.0)
+    return out
+
+
+def simulate_route(problem, depot, route, wait=None):
+    """单条路径的调度 (B=1 的批量调用)"""
+    padded, lengths = pad_routes([route])
+    waits = None if wait is None else pad_routes([wait], np.float64)[0]
+    return simulate_batch(problem, padded, lengths, np.array([depot]), waits)
@@ -0,0 +1,266 @@
+"""
+常驻求解服务：进程池常驻、各工作进程缓存已加载的实例，通过本机 HTTP JSON 接口接收求解作业
+
+    POST   /jobs          提交作业 {"instance": "n20m2d2", "seed": 0, "iterations": 200,
+                                    "time_limit": 30, "pop_size": 50, "wait": false}
+                          返回 {"id": ...}；wait 为 true 时阻塞至作业结束并直接返回结果
+    GET    /jobs          全部作业的状态
+    GET    /jobs/<id>     作业状态与结果 (Pareto 前沿、hv_trajectory、迭代次数、耗时)
+    DELETE /jobs/<id>     取消作业：排队中的直接撤销，运行中的在下一代结束时停止并返回当前前沿
+    GET    /health        服务状态
+"""
+import json
+import time
+import uuid
+import random
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+from .config import config
+from .data_loader import DataLoader
+from .solver.alnsmo import ALNSMO
+from .solver.eval_cache import LRUCache
+
+# 工作进程内按 (算例名, 种子) 缓存的 ProblemInstance (含距离矩阵与邻居表)
+_INSTANCES = LRUCache(0)
+
+
+def init_service_worker(capacity):
+    _INSTANCES.capacity = capacity
+
+
+def load_problem_instance(instance, seed):
+    """从 LRU 缓存取实例，未命中时加载 (有算例文件时经 DataLoader 的磁盘缓存) 并预建邻居表"""
+    key = (instance, seed)
+    problem = _INSTANCES.get(key)
+    if problem is None:
+        problem = DataLoader().load_or_generate(instance, seed=seed)
+        problem.neighbors
+        _INSTANCES.put(key, problem)
+    return problem
+
+
+def run_job(spec, cancel, started):
+    """
+    工作进程：求解一个作业，逐代检查取消标志 cancel (multiprocessing.Event)
+    开始执行时置位 started：已进入执行器调用队列但尚未执行的作业 Future.running() 也为真，不能据此区分排队与运行
+    与岛屿模型的 run_island 一样直接驱动 start()/step()，停止准则为迭代次数、时间预算与取消
+    """
+    started.set()
+    t0 = time.perf_counter()
+    seed = spec.get('seed', 0)
+    if cancel.is_set():     # 排队期间已被取消 (Future 已无法撤销)
+        return {'instance': spec['instance'], 'seed': seed, 'iterations': 0, 'stop_reason': 'cancelled',
+                'hypervolume': 0.0, 'hv_trajectory': [], 'front': [], 'timings': {'load': 0.0, 'solve': 0.0}}
+    problem = load_problem_instance(spec['instance'], seed)
+    random.seed(seed)
+    np.random.seed(seed)
+    solver = ALNSMO(problem.customers, problem.depots, problem=problem, n_workers=1)
+    if spec.get('pop_size'):
+        solver.pop_size = int(spec['pop_size'])
+    iterations = int(spec.get('iterations') or config.ITER_MAX)
+    time_limit = spec.get('time_limit')
+    deadline = t0 + time_limit if time_limit is not None else None
+    t1 = time.perf_counter()
+
+    solver.start()
+    stop_reason = 'iterations'
+    while solver.iteration < iterations:
+        if cancel.is_set():
+            stop_reason = 'cancelled'
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            stop_reason = 'time'
+            break
+        solver.step()
+    return {
+        'instance': spec['instance'],
+        'seed': seed,
+        'iterations': solver.iteration,
+        'stop_reason': stop_reason,
+        'hypervolume': solver.archive.hypervolume,
+        'hv_trajectory': solver.hv_trajectory,
+        'front': [
+            {'obj': list(ind.obj), 'routes': [r.tolist() for r in ind.routes],
+             'depots': ind.route_depots.tolist()}
+            for ind in solver.archive
+        ],
+        'timings': {'load': t1 - t0, 'solve': time.perf_counter() - t1},
+    }
+
+
+def _ping():
+    return True
+
+
+class SolverService:
+    """
+    作业管理：进程池常驻 (启动时预热全部工作进程)，作业并发运行，超出进程数的作业排队
+    取消通过 Manager 的 Event 通知工作进程；状态: queued / running / done / cancelled / failed
+    已结束的作业 (含结果中的前沿) 最多保留 retention 个，且结束超过 ttl 秒后删除，提交新作业时清理
+    """
+    def __init__(self, workers=None, cache_size=None, retention=None, ttl=None):
+        self.workers = workers or config.SERVICE_WORKERS or mp.cpu_count()
+        cache_size = cache_size if cache_size is not None else config.SERVICE_CACHE_SIZE
+        self.manager = mp.Manager()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_service_worker,
+                                        initargs=(cache_size,))
+        for future in [self.pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        self.retention = retention if retention is not None else config.SERVICE_JOB_RETENTION
+        self.ttl = ttl if ttl is not None else config.SERVICE_JOB_TTL
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def submit(self, spec):
+        if 'instance' not in spec:
+            raise ValueError("缺少 instance 字段")
+        job_id = uuid.uuid4().hex[:12]
+        cancel, started = self.manager.Event(), self.manager.Event()
+        job = {'spec': spec, 'cancel': cancel, 'started': started, 'submitted': time.time(), 'finished': None}
+        future = self.pool.submit(run_job, spec, cancel, started)
+        job['future'] = future
+        with self.lock:
+            self.prune()
+            self.jobs[job_id] = job
+        future.add_done_callback(lambda _: job.update(finished=time.time()))
+        return job_id
+
+    def prune(self):
+        """删除超出保留数量或超过 ttl 的已结束作业 (调用方持有 self.lock)"""
+        now = time.time()
+        finished = sorted((job['finished'], job_id) for job_id, job in self.jobs.items()
+                          if job['finished'] is not None)
+        excess = len(finished) - self.retention
+        for k, (end, job_id) in enumerate(finished):
+            if k < excess or (self.ttl is not None and now - end > self.ttl):
+                del self.jobs[job_id]
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        future = job['future']
+        info = {'id': job_id, 'spec': job['spec'], 'submitted': job['submitted']}
+        if future.cancelled():
+            info['status'] = 'cancelled'
+        elif not future.done():
+            info['status'] = 'running' if job['started'].is_set() else 'queued'
+        elif future.exception() is not None:
+            info['status'] = 'failed'
+            info['error'] = repr(future.exception())
+        else:
+            result = future.result()
+            info['status'] = 'cancelled' if result['stop_reason'] == 'cancelled' else 'done'
+            info['result'] = result
+        return info
+
+    def wait(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        try:
+            job['future'].result()
+        except (CancelledError, Exception):
+            pass
+        return self.status(job_id)
+
+    def cancel(self, job_id):
+        """撤销排队中的作业，或通知运行中的作业停止；返回是否存在该作业"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        if not job['future'].cancel():
+            job['cancel'].set()
+        return True
+
+    def list(self):
+        with self.lock:
+            ids = list(self.jobs)
+        return [{k: v for k, v in self.status(i).items() if k != 'result'} for i in ids]
+
+    def shutdown(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if not job['future'].cancel():
+                job['cancel'].set()
+        self.pool.shutdown(wait=True)
+        self.manager.shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_id(self):
+        parts = self.path.strip('/').split('/')
+        return parts[1] if len(parts) == 2 and parts[0] == 'jobs' else None
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self._reply(200, {'status': 'ok', 'workers': self.service.workers,
+                              'uptime': time.time() - self.service.started})
+        elif self.path.rstrip('/') == '/jobs':
+            self._reply(200, self.service.list())
+        elif self._job_id():
+            info = self.service.status(self._job_id())
+            self._reply(200, info) if info else self._reply(404, {'error': '作业不存在'})
+        else:
+            self._reply(404, {'error': '未知路径'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            self._reply(404, {'error': '未知路径'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length) or b'{}')
+            job_id = self.service.submit(spec)
+        except (ValueError, TypeError) as exc:
+            self._reply(400, {'error': str(exc)})
+            return
+        if spec.get('wait'):
+            self._reply(200, self.service.wait(job_id))
+        else:
+            self._reply(202, {'id': job_id})
+
+    def do_DELETE(self):
+        job_id = self._job_id()
+        if job_id and self.service.cancel(job_id):
+            self._reply(202, {'id': job_id, 'cancelling': True})
+        else:
+            self._reply(404, {'error': '作业不存在'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=None, port=None, workers=None, cache_size=None):
+    """启动服务并阻塞，Ctrl+C 退出 (只监听本机地址)"""
+    host = host or config.SERVICE_HOST
+    port = port if port is not None else config.SERVICE_PORT
+    service = SolverService(workers, cache_size)
+    handler = type('Handler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"求解服务已启动: http://{host}:{server.server_address[1]} ({service.workers} 个工作进程)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
@@ -2,18 +2,33 @@
 
 # 从核心算法模块导入 ALNSMO 类
 from .alnsmo import ALNSMO
+from .archive import ParetoArchive, EpsilonArchive
+from .island import IslandALNSMO
+from .decomposition import DecomposedALNSMO
+from .online import OnlineReoptimizer
 
 # 从多目标处理模块导入评价工具
 from .multi_objective import (
     fast_non_dominated_sort,
     calculate_crowding_distance,
-    get_pareto_front
+    get_pareto_front,
+    objective_matrix,
+    nondominated_ranks,
+    crowding_distances
 )
 
 # 定义导出接口，方便 main.py 一键启动
 __all__ = [
     'ALNSMO',
+    'ParetoArchive',
+    'EpsilonArchive',
+    'IslandALNSMO',
+    'DecomposedALNSMO',
+    'OnlineReoptimizer',
     'fast_non_dominated_sort',
     'calculate_crowding_distance',
-    'get_pareto_front'
+    'get_pareto_front',
+    'objective_matrix',
+    'nondominated_ranks',
+    'crowding_distances'
 ]
\ No newline at end of file
@@ -1,113 +1,275 @@
+import os
+import time
 import random
 import numpy as np
-import copy
+from concurrent.futures import ProcessPoolExecutor
 from ..config import config
-from .multi_objective import fast_non_dominated_sort, calculate_crowding_distance
+from .multi_objective import (
+    objective_matrix, nondominated_ranks, crowding_distances
+)
+from .archive import new_archive
+from .instrumentation import Instrumentation
+from .eval_cache import EvaluationCache
+from .checkpoint import save_checkpoint, load_checkpoint
 from ..models import Individual
-from ..utils import calculate_hv, calculate_total_costs, calculate_total_satisfaction
+from ..problem import ProblemInstance
+from .evaluation import evaluate_individual, evaluate_population
+from .offspring import select_operator, mutate, breed, breed_chunk, init_worker
 from ..operators import (
     reorder_task_o1, transfer_task_o2, migrate_task_o3,
-    reduce_drones_o4, time_window_greedy_o5, optimize_position_o6
+    reduce_drones_o4, time_window_greedy_o5, optimize_position_o6,
+    regret_insertion_o7, split_pair_o8, giant_tour, split_individual
 )
 
 class ALNSMO:
-    def __init__(self, customers, depots):
+    def __init__(self, customers, depots, metric=None, mmap_path=None, n_workers=None, problem=None,
+                 instrument=None):
         self.customers = customers
         self.depots = depots if isinstance(depots, list) else [depots]
+        # 实例级列式数据与距离矩阵，只构建一次；长沙实景 (经纬度) 数据需传入 metric='haversine'
+        # 已构建好的 ProblemInstance 可通过 problem 直接复用
+        self.problem = problem or ProblemInstance(self.customers, self.depots, metric, mmap_path=mmap_path)
+        self.dist = self.problem.dist
+        self.problem.neighbors   # 预先构建粒度邻居表，随实例一并发送给工作进程
         self.operators = [
             reorder_task_o1, transfer_task_o2, migrate_task_o3,
-            reduce_drones_o4, time_window_greedy_o5, optimize_position_o6
+            reduce_drones_o4, time_window_greedy_o5, optimize_position_o6,
+            regret_insertion_o7, split_pair_o8
         ]
         self.weights = np.ones(len(self.operators))
         self.scores = np.zeros(len(self.operators))
         self.usage_count = np.zeros(len(self.operators))
-        self.archive = []
+        self.archive = new_archive()
+        self.pop_size = config.POP_SIZE
+        # 并行子代生成的进程数 (1 为串行)；进程池只在 solve 期间存在
+        self.n_workers = n_workers if n_workers is not None else config.N_WORKERS
+        self.executor = None
+        self.population = []
+        self.hv_trajectory = []
+        self.iteration = 0
+        self.stop_reason = None
+        # 路径级/解级评价缓存 (容量为 0 时关闭)
+        self.cache_sizes = (config.ROUTE_CACHE_SIZE, config.SOLUTION_CACHE_SIZE)
+        self.cache = EvaluationCache(*self.cache_sizes) if any(self.cache_sizes) else None
+        # 运行统计 (算子耗时/接受率、各阶段耗时、评价吞吐)，关闭时几乎无开销
+        self.instrumentation = Instrumentation(
+            [op.__name__ for op in self.operators],
+            enabled=instrument if instrument is not None else config.INSTRUMENT)
+        self.archive.instrument = self.instrumentation if self.instrumentation.enabled else None
 
     def initialize_population(self):
+        """
+        初始种群：默认把打乱的客户按下标轮流分配给每站 2 架无人机
+        config.INIT_SPLIT 为 True 时改用随机巨型路径 + Prins split (见 operators.split)，
+        路径条数、所属 Depot 与载重/电量可行性由 DP 决定；各个体的满意度权重在 [0, SPLIT_SAT_WEIGHT] 间均匀分布，
+        巨型路径交替按时间窗与极角扫描生成，使初始前沿覆盖两个目标
+        (目标函数不惩罚超限，可行的初始解在最终 HV 上反而不占优，因此不作为默认)
+        """
         population = []
-        for _ in range(config.POP_SIZE):
-            shuffled_tasks = copy.copy(self.customers)
+        for p in range(self.pop_size):
+            if config.INIT_SPLIT:
+                tour = giant_tour(self.problem, 'time' if p % 2 else 'sweep')
+                sat_weight = config.SPLIT_SAT_WEIGHT * p / max(self.pop_size - 1, 1)
+                population.append(split_individual(self.problem, tour, sat_weight))
+                continue
+            shuffled_tasks = self.problem.customer_nodes.tolist()
             random.shuffle(shuffled_tasks)
             num_drones = len(self.depots) * 2 
             routes = [[] for _ in range(num_drones)]
             for idx, task in enumerate(shuffled_tasks):
                 routes[idx % num_drones].append(task)
-            ind = Individual(routes)
-            self.evaluate(ind)
+            # 第 k 架无人机隶属于 Depot k % m (每个配送站 2 架)
+            ind = Individual.from_routes(routes, [k % len(self.depots) for k in range(num_drones)])
             population.append(ind)
+        self.evaluate_initial(population)
         return population
 
+    def evaluate_initial(self, population):
+        """批量评价初始 (或热启动) 种群，计入运行统计的 evaluate 段与评价次数"""
+        with self.instrumentation.section('evaluate'):
+            evaluate_population(self.problem, population, self.cache)
+        if self.instrumentation.enabled:
+            self.instrumentation.evaluations += len(population)
+
     def evaluate(self, ind):
         """
-        【关键修复 1】目标函数缩放
-        f1 (成本) 通常在 100-500 之间，f2 (满意度) 在 0-1 之间。
-        必须将 f1 除以一个缩放因子（如 100），使其量级与 f2 匹配。
+        【关键修复 1】目标函数缩放，见 evaluation.set_objectives
+        个体带有路径级缓存时只重新评价被算子改动的路径 (增量评价)
         """
-        raw_cost = calculate_total_costs(ind.routes)
-        ind.obj[0] = raw_cost / 100.0  # 缩放到 1-5 左右
-        ind.obj[1] = -calculate_total_satisfaction(ind.routes) # 范围约 -1 到 0
-
-    def update_archive(self, population):
-        combined = self.archive + population
-        fronts = fast_non_dominated_sort(combined)
-        if fronts:
-            new_archive = []
-            seen_objs = set()
-            for ind in fronts[0]:
-                # 稍微降低去重的精度，有助于在图上形成连贯的曲线
-                obj_tuple = (round(ind.obj[0], 2), round(ind.obj[1], 2))
-                if obj_tuple not in seen_objs:
-                    new_archive.append(ind)
-                    seen_objs.add(obj_tuple)
-            # 增加档案容量，确保有足够的点画出曲线
-            self.archive = new_archive[:500]
+        evaluate_individual(self.problem, ind, self.cache)
+
+    def update_archive(self, individuals):
+        """将新个体逐个插入增量式 Pareto 档案，开销与新个体数量成正比"""
+        with self.instrumentation.section('update_archive'):
+            return self.archive.update(individuals)
 
     def select_operator(self):
-        prob = self.weights / sum(self.weights)
-        return np.random.choice(len(self.operators), p=prob)
-
-    def solve(self):
-        population = self.initialize_population()
-        self.archive = [] 
-        hv_trajectory = []
-
-        for i in range(config.ITER_MAX):
-            offspring = []
-            for ind in population:
-                op_idx = self.select_operator()
-                self.usage_count[op_idx] += 1
-                
-                new_routes = copy.deepcopy(ind.routes)
-                d_idx = random.randrange(len(new_routes))
-                
-                if op_idx in [1, 2, 3] and len(new_routes) > 1:
-                    idx_j = random.choice([j for j in range(len(new_routes)) if j != d_idx])
-                    new_routes[d_idx], new_routes[idx_j] = self.operators[op_idx](new_routes[d_idx], new_routes[idx_j])
-                else:
-                    new_routes[d_idx] = self.operators[op_idx](new_routes[d_idx])
-                
-                new_ind = Individual(new_routes)
-                self.evaluate(new_ind)
-                
-                # 【关键修复 2】多目标接受准则
-                # 不能只比较 obj[0]。如果新解在任一维度变好，或者满足概率阈值，就接受。
-                # 这样可以强迫算法去探索“成本虽高但满意度更好”的区域。
-                if new_ind.obj[0] < ind.obj[0] or new_ind.obj[1] < ind.obj[1] or random.random() < 0.2:
-                    offspring.append(new_ind)
-                    self.scores[op_idx] += config.THETA1
-                else:
-                    offspring.append(ind)
-            
-            population = self.elitism_selection(population + offspring)
-            self.update_archive(population)
-            
-            # 使用档案计算 HV
-            hv_trajectory.append(calculate_hv(self.archive))
-            
-            if i % 10 == 0:
-                self.update_weights()
-                
-        return self.archive, hv_trajectory
+        return select_operator(self.weights)
+
+    def mutate(self, ind, op_idx):
+        return mutate(self.problem, self.operators, ind, op_idx)
+
+    def solve(self, time_limit=None, stall_iters=None, stall_tol=None, callback=None,
+              checkpoint=None, resume=False, population=None, iter_max=None):
+        """
+        运行至停止准则满足，返回 (档案成员列表, hv_trajectory)
+        time_limit: 墙钟时间预算 (秒)；stall_iters/stall_tol: HV 停滞判据 (见 iter_solve)
+        callback(iteration, hypervolume, front): 每当档案 HV 提升时调用一次
+        checkpoint/resume: 检查点路径与是否从中恢复；population/iter_max: 热启动种群与迭代上限 (见 iter_solve)
+        """
+        for snapshot in self.iter_solve(time_limit, stall_iters, stall_tol, checkpoint, resume,
+                                        population, iter_max):
+            if callback is not None:
+                callback(*snapshot)
+        return list(self.archive), self.hv_trajectory
+
+    def iter_solve(self, time_limit=None, stall_iters=None, stall_tol=None, checkpoint=None, resume=False,
+                   population=None, iter_max=None):
+        """
+        随时可中断的求解：生成器，每当档案 HV 提升时产出快照 (iteration, hypervolume, front)
+        front 为当时档案成员的列表副本；调用方可在截止时间直接取最近一次快照并关闭生成器
+        停止准则 (先满足者生效，原因记录在 self.stop_reason)：
+            'iterations'  迭代次数达到 iter_max (默认 config.ITER_MAX)
+            'time'        已用时间达到 time_limit 秒 (默认 config.TIME_LIMIT，None 表示不限)
+            'stagnation'  最近 stall_iters 代 HV 提升不足 stall_tol (默认 config.STALL_ITERS/STALL_TOL)
+            'interrupted' 调用方提前关闭了生成器
+        checkpoint 给定时每 config.CHECKPOINT_INTERVAL 代及结束时原子写入检查点；
+        resume=True 且检查点存在时从中恢复而不重新初始化，后续迭代与未中断的运行逐位一致
+        population 给定时以这些个体热启动 (不随机初始化)，见 start
+        """
+        iter_max = iter_max if iter_max is not None else config.ITER_MAX
+        time_limit = time_limit if time_limit is not None else config.TIME_LIMIT
+        stall_iters = stall_iters if stall_iters is not None else config.STALL_ITERS
+        stall_tol = stall_tol if stall_tol is not None else config.STALL_TOL
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+        # 计时从初始化开始，初始种群的评价也计入 evaluate
+        self.instrumentation.start()
+        if resume and checkpoint is not None and os.path.exists(checkpoint):
+            load_checkpoint(self, checkpoint)
+        else:
+            self.start(population)
+        self.stop_reason = None
+        if self.n_workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.n_workers, initializer=init_worker,
+                initargs=(self.problem, self.operators, self.cache_sizes if self.cache is not None else None))
+        try:
+            best_hv = self.archive.hypervolume
+            yield self.iteration, best_hv, list(self.archive)
+            while True:
+                if self.iteration >= iter_max:
+                    self.stop_reason = 'iterations'
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self.stop_reason = 'time'
+                    break
+                if self.stagnated(stall_iters, stall_tol):
+                    self.stop_reason = 'stagnation'
+                    break
+                self.step()
+                if checkpoint is not None and self.iteration % config.CHECKPOINT_INTERVAL == 0:
+                    save_checkpoint(self, checkpoint)
+                if self.archive.hypervolume > best_hv:
+                    best_hv = self.archive.hypervolume
+                    yield self.iteration, best_hv, list(self.archive)
+            if checkpoint is not None:
+                save_checkpoint(self, checkpoint)
+        except GeneratorExit:
+            self.stop_reason = 'interrupted'
+            raise
+        finally:
+            self.instrumentation.stop()
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+    def stagnated(self, stall_iters, stall_tol):
+        """最近 stall_iters 代的 HV 提升是否不足 stall_tol (stall_iters 为空或 0 时不启用)"""
+        if not stall_iters or len(self.hv_trajectory) <= stall_iters:
+            return False
+        return self.hv_trajectory[-1] - self.hv_trajectory[-1 - stall_iters] < stall_tol
+
+    def start(self, population=None):
+        """
+        初始化种群、档案与 HV 轨迹，之后可逐代调用 step()
+        population 给定时 (如在线重优化的上一版前沿) 直接作为初始种群，未评价的个体在此评价
+        """
+        if population is None:
+            population = self.initialize_population()
+        else:
+            population = list(population)
+            self.evaluate_initial(population)
+        self.population = population
+        self.archive = new_archive()
+        self.archive.instrument = self.instrumentation if self.instrumentation.enabled else None
+        self.update_archive(self.population)
+        self.hv_trajectory = []
+        self.iteration = 0
+
+    def step(self):
+        """执行一代：生成子代 -> 精英选择 -> 更新档案与 HV -> (每 10 代) 更新算子权重"""
+        offspring, new_individuals = self.generate_offspring(self.population)
+        with self.instrumentation.section('elitism_selection'):
+            self.population = self.elitism_selection(self.population + offspring)
+        self.update_archive(new_individuals)
+
+        # 档案增量维护 HV (计时见 ParetoArchive.instrument)，与 calculate_hv 的取值方式一致 (保留 4 位小数)
+        self.hv_trajectory.append(round(self.archive.hypervolume, 4))
+        self.instrumentation.iterations += 1
+
+        if self.iteration % 10 == 0:
+            self.update_weights()
+        self.iteration += 1
+
+    def emigrants(self, k):
+        """从档案中沿前沿均匀抽取至多 k 个非支配个体用于迁移"""
+        if len(self.archive) <= k:
+            return list(self.archive)
+        idx = np.linspace(0, len(self.archive) - 1, k).round().astype(int)
+        return [self.archive[i] for i in np.unique(idx)]
+
+    def immigrate(self, migrants):
+        """接收其他岛的个体：并入档案，并与当前种群一起做精英选择"""
+        if not migrants:
+            return
+        self.update_archive(migrants)
+        self.population = self.elitism_selection(self.population + list(migrants))
+
+    def generate_offspring(self, population):
+        """
+        生成一代子代，返回 (offspring, 新个体列表)
+        串行模式直接在主进程中处理；并行模式把种群按顺序切成 n_workers 段分发到进程池，
+        每段使用由主随机流派生的独立种子，结果按原顺序合并，
+        算子使用次数与得分在主进程中汇总，保证自适应权重更新与串行模式一致
+        """
+        if self.executor is None:
+            results = [breed(self.problem, self.operators, population, self.weights,
+                             self.instrumentation.new_breed_stats(), self.cache)]
+        else:
+            chunks = [c.tolist() for c in np.array_split(np.arange(len(population)), self.n_workers) if len(c)]
+            seeds = np.random.randint(0, 2**31 - 1, size=len(chunks))
+            instrument = self.instrumentation.enabled
+            futures = [self.executor.submit(breed_chunk, [population[k] for k in idx], self.weights,
+                                            int(seed), instrument)
+                       for idx, seed in zip(chunks, seeds)]
+            results = [f.result() for f in futures]
+
+        offspring, new_individuals = [], []
+        children = [child for res in results for child in res[0]]
+        for ind, child in zip(population, children):
+            offspring.append(child if child is not None else ind)
+            if child is not None:
+                new_individuals.append(child)
+        for _, usage, scores, stats in results:
+            self.usage_count += usage
+            self.scores += scores
+            self.instrumentation.record_breed(stats)
+        return offspring, new_individuals
+
+    def cache_stats(self):
+        """主进程评价缓存的命中统计 (并行模式下各工作进程的缓存不计入)"""
+        return self.cache.stats() if self.cache is not None else {}
 
     def update_weights(self):
         for j in range(len(self.operators)):
@@ -118,18 +280,19 @@ class ALNSMO:
         self.usage_count.fill(0)
 
     def elitism_selection(self, combined_pop):
+        """
+        按 (层级升序, 拥挤距离降序) 保留 pop_size (默认 config.POP_SIZE) 个个体
+        层级与拥挤距离在目标矩阵上一次性向量化计算
+        """
+        F = objective_matrix(combined_pop)
+        ranks = nondominated_ranks(F)
+        distance = crowding_distances(F, ranks)
+        # 排序：层级优先，同层内拥挤度降序（让稀疏区域的点优先保留）
+        keep = np.lexsort((-distance, ranks))[:self.pop_size]
         new_pop = []
-        fronts = fast_non_dominated_sort(combined_pop)
-        for front in fronts:
-            if not front: continue
-            calculate_crowding_distance(front)
-            # 排序：拥挤度降序（让稀疏区域的点优先保留）
-            front.sort(key=lambda x: x.crowding_distance, reverse=True)
-        
-            if len(new_pop) + len(front) <= config.POP_SIZE:
-                new_pop.extend(front)
-            else:
-                needed = config.POP_SIZE - len(new_pop)
-                new_pop.extend(front[:needed])
-                break
-        return new_pop
\ No newline at end of file
+        for idx in keep.tolist():
+            ind = combined_pop[idx]
+            ind.rank = int(ranks[idx])
+            ind.crowding_distance = float(distance[idx])
+            new_pop.append(ind)
+        return new_pop
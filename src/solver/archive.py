@@ -0,0 +1,186 @@
+from bisect import bisect_left, bisect_right
+import math
+import numpy as np
+from ..config import config
+
+
+class ParetoArchive:
+    """
+    增量式双目标 Pareto 档案
+    成员按 f1 升序保存 (非支配前沿上 f2 随之严格降序)，插入时二分定位，
+    顺带删除被新点支配的连续一段；超体积 (HV) 随插入/删除增量维护，
+    超出容量时删除 HV 贡献最小的成员。
+    HV 的归一化方式与 utils.calculate_hv 一致 (f1 / 成本上界, 1 - |f2| / 满意度上界)
+    """
+    def __init__(self, capacity=None, ref_point=(1.1, 1.1)):
+        self.capacity = capacity if capacity is not None else config.ARCHIVE_CAPACITY
+        self.ref_point = ref_point
+        self.f1 = []       # 原始目标 obj[0]，升序
+        self.f2 = []       # 原始目标 obj[1]，严格降序
+        self.members = []
+        self.hypervolume = 0.0
+        self.instrument = None     # 设为 Instrumentation 时 HV 的增量维护与贡献计算计入其 hypervolume 段
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __getitem__(self, idx):
+        return self.members[idx]
+
+    # --- 归一化与 HV 分块 ---
+    def _u(self, f1):
+        return min(f1 / config.HV_COST_BOUND, self.ref_point[0])
+
+    def _v(self, f2):
+        return min(1.0 - abs(f2) / config.HV_SAT_BOUND, self.ref_point[1])
+
+    def _term(self, i):
+        """第 i 个点到下一个点 (或参考点) 之间的矩形条带面积；HV = 各条带之和"""
+        u_next = self._u(self.f1[i + 1]) if i + 1 < len(self.f1) else self.ref_point[0]
+        return (u_next - self._u(self.f1[i])) * (self.ref_point[1] - self._v(self.f2[i]))
+
+    def _terms(self, lo, hi):
+        if self.instrument is not None:
+            with self.instrument.section('hypervolume'):
+                return sum(self._term(i) for i in range(max(lo, 0), min(hi, len(self.f1))))
+        return sum(self._term(i) for i in range(max(lo, 0), min(hi, len(self.f1))))
+
+    # --- 插入与删除 ---
+    def dominated(self, obj):
+        """obj 是否被档案中某成员弱支配 (含完全相同)"""
+        j = bisect_right(self.f1, obj[0]) - 1
+        return j >= 0 and self.f2[j] <= obj[1]
+
+    def add(self, ind):
+        """插入个体，返回是否被档案接收"""
+        a, b = ind.obj[0], ind.obj[1]
+        if self.dominated(ind.obj):
+            return False
+
+        i = bisect_left(self.f1, a)
+        # 被新点支配的成员：从 i 开始连续且 f2 >= b 的一段
+        j = i
+        while j < len(self.f2) and self.f2[j] >= b:
+            j += 1
+
+        self.hypervolume -= self._terms(i - 1, j)
+        del self.f1[i:j], self.f2[i:j], self.members[i:j]
+        self.f1.insert(i, a)
+        self.f2.insert(i, b)
+        self.members.insert(i, ind)
+        self.hypervolume += self._terms(i - 1, i + 1)
+
+        if len(self.members) > self.capacity:
+            self._remove(self._least_contributor())
+        return True
+
+    def update(self, population):
+        """批量插入，返回被接收的个数"""
+        return sum(self.add(ind) for ind in population)
+
+    def _remove(self, i):
+        self.hypervolume -= self._terms(i - 1, i + 1)
+        del self.f1[i], self.f2[i], self.members[i]
+        self.hypervolume += self._terms(i - 1, i)
+
+    def contributions(self):
+        """各成员独占的 HV 贡献 (向量化)"""
+        r1, r2 = self.ref_point
+        u = np.minimum(np.asarray(self.f1) / config.HV_COST_BOUND, r1)
+        v = np.minimum(1.0 - np.abs(np.asarray(self.f2)) / config.HV_SAT_BOUND, r2)
+        u_next = np.append(u[1:], r1)
+        v_prev = np.insert(v[:-1], 0, r2)
+        return (u_next - u) * (v_prev - v)
+
+    def _least_contributor(self):
+        if self.instrument is not None:
+            with self.instrument.section('hypervolume'):
+                return int(np.argmin(self.contributions()))
+        return int(np.argmin(self.contributions()))
+
+    def restore(self, members, f1, f2, hypervolume):
+        """从检查点恢复：成员已按 f1 升序，HV 取保存时的值 (保证恢复后逐位一致)"""
+        self.members, self.f1, self.f2 = list(members), list(f1), list(f2)
+        self.hypervolume = hypervolume
+
+    def recompute_hypervolume(self):
+        """从头重算 HV，用于消除长时间增量累加的浮点误差"""
+        self.hypervolume = self._terms(0, len(self.f1))
+        return self.hypervolume
+
+
+class EpsilonArchive(ParetoArchive):
+    """
+    epsilon-box 档案 (Laumanns 等的 epsilon 支配)：目标空间按 epsilon = (e1, e2) 划分为网格，
+    box = (floor(f1 / e1), floor(f2 / e2))，每个非支配 box 至多保留一个成员：
+        新点的 box 被已有 box 支配 -> 拒绝
+        与已有成员同 box -> 支配之或互不支配但更靠近 box 左下角时替换，否则拒绝
+        否则删除被新 box 支配的成员 (按 f1 有序时为连续一段) 后插入
+    两个目标范围有限时成员数不超过 min(f1 跨度 / e1, f2 跨度 / e2) + 1，与运行时长无关，且沿前沿均匀分布；
+    容量 capacity 仍作为硬上限 (超出时删除 HV 贡献最小者)
+    成员只保存紧凑副本 (Individual.compact：路径编码、等待时长与目标值)，评价缓存在需要时重新推算
+    """
+    def __init__(self, epsilon=None, capacity=None, ref_point=(1.1, 1.1)):
+        super().__init__(capacity, ref_point)
+        self.epsilon = tuple(epsilon or config.ARCHIVE_EPSILON)
+        self.b1 = []       # 各成员的 box 坐标，与 f1/f2/members 对齐 (b1 严格升序，b2 严格降序)
+        self.b2 = []
+
+    def box(self, obj):
+        return math.floor(obj[0] / self.epsilon[0]), math.floor(obj[1] / self.epsilon[1])
+
+    def _corner_distance(self, obj, box):
+        return math.hypot(obj[0] / self.epsilon[0] - box[0], obj[1] / self.epsilon[1] - box[1])
+
+    def add(self, ind):
+        """插入个体 (以紧凑副本保存)，返回是否被档案接收"""
+        a, b = ind.obj[0], ind.obj[1]
+        B1, B2 = self.box(ind.obj)
+        j = bisect_right(self.b1, B1) - 1
+        if j >= 0 and self.b2[j] <= B2:
+            if (self.b1[j], self.b2[j]) != (B1, B2):
+                return False
+            f1, f2 = self.f1[j], self.f2[j]
+            if f1 <= a and f2 <= b:
+                return False
+            if not (a <= f1 and b <= f2) and \
+                    self._corner_distance(ind.obj, (B1, B2)) >= self._corner_distance((f1, f2), (B1, B2)):
+                return False
+            self._remove(j)
+
+        i = bisect_left(self.b1, B1)
+        k = i
+        while k < len(self.b2) and self.b2[k] >= B2:
+            k += 1
+        self.hypervolume -= self._terms(i - 1, k)
+        del self.f1[i:k], self.f2[i:k], self.members[i:k], self.b1[i:k], self.b2[i:k]
+        self.f1.insert(i, a)
+        self.f2.insert(i, b)
+        self.b1.insert(i, B1)
+        self.b2.insert(i, B2)
+        self.members.insert(i, ind.compact())
+        self.hypervolume += self._terms(i - 1, i + 1)
+
+        if len(self.members) > self.capacity:
+            self._remove(self._least_contributor())
+        return True
+
+    def _remove(self, i):
+        super()._remove(i)
+        del self.b1[i], self.b2[i]
+
+    def restore(self, members, f1, f2, hypervolume):
+        super().restore([ind.compact() for ind in members], f1, f2, hypervolume)
+        boxes = [self.box(obj) for obj in zip(self.f1, self.f2)]
+        self.b1 = [box[0] for box in boxes]
+        self.b2 = [box[1] for box in boxes]
+
+
+def new_archive():
+    """按 config.ARCHIVE_MODE 创建求解器的档案：'hv' (HV 贡献截断) 或 'epsilon' (epsilon-box)"""
+    if config.ARCHIVE_MODE == 'epsilon':
+        return EpsilonArchive(config.ARCHIVE_EPSILON, config.ARCHIVE_CAPACITY)
+    return ParetoArchive(config.ARCHIVE_CAPACITY)
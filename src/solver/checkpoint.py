@@ -0,0 +1,120 @@
+import os
+import random
+import numpy as np
+from ..models import Individual
+from .evaluation import evaluate_population
+
+CHECKPOINT_VERSION = 1
+
+
+def pack_individuals(individuals, prefix):
+    """
+    一组个体压缩为整数/浮点数组：全部 tour 首尾相接，按个体与路径两级偏移切分
+    只保存路径编码、目标值与等待时长；评价缓存在恢复时重新推算
+    """
+    n_routes = np.fromiter((ind.num_routes for ind in individuals), dtype=np.int64, count=len(individuals))
+    route_start = np.zeros(len(individuals) + 1, dtype=np.int64)
+    np.cumsum(n_routes, out=route_start[1:])
+    lengths = [ind.route_lengths() for ind in individuals]
+    empty = np.empty(0, dtype=np.int32)
+    return {
+        prefix + 'tour': np.concatenate([ind.tour for ind in individuals]) if individuals else empty,
+        prefix + 'route_lengths': np.concatenate(lengths).astype(np.int64) if individuals else empty,
+        prefix + 'route_depots': np.concatenate([ind.route_depots for ind in individuals]) if individuals else empty,
+        prefix + 'route_start': route_start,
+        prefix + 'obj': np.array([ind.obj for ind in individuals], dtype=np.float64).reshape(-1, 2),
+        prefix + 'rank': np.array([ind.rank for ind in individuals], dtype=np.int64),
+        prefix + 'crowding': np.array([ind.crowding_distance for ind in individuals], dtype=np.float64),
+        prefix + 'has_wait': np.array([ind.wait is not None for ind in individuals], dtype=bool),
+        prefix + 'wait': np.concatenate([ind.wait if ind.wait is not None else np.zeros(len(ind.tour))
+                                         for ind in individuals]) if individuals else np.empty(0),
+    }
+
+
+def unpack_individuals(data, prefix, problem):
+    """pack_individuals 的逆操作；重新评价并核对目标值 (调度引擎逐位确定，应完全一致)"""
+    tour = data[prefix + 'tour']
+    lengths = data[prefix + 'route_lengths']
+    depots = data[prefix + 'route_depots']
+    route_start = data[prefix + 'route_start']
+    wait, has_wait = data[prefix + 'wait'], data[prefix + 'has_wait']
+    ends = np.concatenate(([0], np.cumsum(lengths)))
+    individuals = []
+    for i in range(len(route_start) - 1):
+        lo, hi = route_start[i], route_start[i + 1]
+        a, b = ends[lo], ends[hi]
+        offsets = (ends[lo:hi + 1] - a).astype(np.int32)
+        ind = Individual(tour[a:b].astype(np.int32), offsets, depots[lo:hi].astype(np.int32))
+        if has_wait[i]:
+            ind.wait = wait[a:b].astype(np.float64)
+        ind.rank = int(data[prefix + 'rank'][i])
+        ind.crowding_distance = float(data[prefix + 'crowding'][i])
+        individuals.append(ind)
+    evaluate_population(problem, individuals)
+    saved = data[prefix + 'obj']
+    for ind, obj in zip(individuals, saved):
+        if ind.obj != obj.tolist():
+            raise ValueError(f"检查点中的目标值与重新评价结果不一致: {obj.tolist()} != {ind.obj}")
+    return individuals
+
+
+def save_checkpoint(solver, path):
+    """
+    把 ALNSMO 的运行状态写入 .npz：种群与档案 (整数路径数组 + 目标值)、算子权重/得分/使用次数、
+    迭代次数、hv_trajectory，以及 random 与 np.random 的随机状态
+    先写同目录临时文件再 os.replace，任何时刻中断都不会留下损坏的检查点
+    """
+    py_version, py_state, py_gauss = random.getstate()
+    np_state = np.random.get_state()
+    archive = solver.archive
+    arrays = {
+        'version': np.array(CHECKPOINT_VERSION),
+        'num_nodes': np.array(solver.problem.num_nodes),
+        'iteration': np.array(solver.iteration),
+        'hv_trajectory': np.array(solver.hv_trajectory, dtype=np.float64),
+        'weights': solver.weights,
+        'scores': solver.scores,
+        'usage_count': solver.usage_count,
+        'archive_hv': np.array(archive.hypervolume),
+        'archive_f1': np.array(archive.f1, dtype=np.float64),
+        'archive_f2': np.array(archive.f2, dtype=np.float64),
+        'py_version': np.array(py_version),
+        'py_state': np.array(py_state, dtype=np.int64),
+        'py_gauss': np.array(np.nan if py_gauss is None else py_gauss),
+        'np_keys': np_state[1],
+        'np_pos': np.array(np_state[2]),
+        'np_has_gauss': np.array(np_state[3]),
+        'np_gauss': np.array(np_state[4]),
+    }
+    arrays.update(pack_individuals(solver.population, 'pop_'))
+    arrays.update(pack_individuals(list(archive), 'arc_'))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(solver, path):
+    """从检查点恢复 solver 的运行状态 (solver 需由同一实例构建)，之后继续迭代与未中断的运行逐位一致"""
+    with np.load(path) as data:
+        if int(data['version']) != CHECKPOINT_VERSION:
+            raise ValueError(f"不支持的检查点版本: {int(data['version'])}")
+        if int(data['num_nodes']) != solver.problem.num_nodes:
+            raise ValueError("检查点与当前问题实例的节点数不一致")
+        solver.population = unpack_individuals(data, 'pop_', solver.problem)
+        members = unpack_individuals(data, 'arc_', solver.problem)
+        solver.archive.restore(members, data['archive_f1'].tolist(), data['archive_f2'].tolist(),
+                               float(data['archive_hv']))
+        solver.iteration = int(data['iteration'])
+        solver.hv_trajectory = data['hv_trajectory'].tolist()
+        solver.weights = data['weights'].copy()
+        solver.scores = data['scores'].copy()
+        solver.usage_count = data['usage_count'].copy()
+
+        py_gauss = float(data['py_gauss'])
+        random.setstate((int(data['py_version']), tuple(int(v) for v in data['py_state']),
+                         None if np.isnan(py_gauss) else py_gauss))
+        np.random.set_state(('MT19937', data['np_keys'], int(data['np_pos']),
+                             int(data['np_has_gauss']), float(data['np_gauss'])))
@@ -0,0 +1,219 @@
+import os
+import time
+import heapq
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ..config import config
+from ..models import Individual
+from ..problem import ProblemInstance
+from ..operators.destroy_repair import choose_slot
+from .alnsmo import ALNSMO
+from .archive import ParetoArchive
+from .evaluation import evaluate_population
+
+
+def cluster_customers(problem, cluster_size=None):
+    """
+    按 Depot 与时间窗划分客户：每个客户归入最近的 Depot，
+    同一 Depot 的客户按期望时间窗中点排序后等分为若干簇，每簇不超过 cluster_size 个
+    返回 [(depot 节点编号, 客户节点编号数组), ...]
+    """
+    cluster_size = cluster_size or config.DECOMP_CLUSTER_SIZE
+    nodes = problem.customer_nodes
+    nearest = np.argmin(np.asarray(problem.dist.matrix[np.ix_(problem.depot_nodes, nodes)]), axis=0)
+    centre = (problem.w_a + problem.w_b) / 2
+    clusters = []
+    for d in problem.depot_nodes:
+        members = nodes[nearest == d]
+        if len(members) == 0:
+            continue
+        members = members[np.argsort(centre[members], kind='stable')]
+        parts = -(-len(members) // cluster_size)
+        clusters += [(int(d), part) for part in np.array_split(members, parts)]
+    return clusters
+
+
+def solve_cluster(customers, depot, node_map, metric, seed, iterations, time_limit):
+    """
+    工作进程：在一个簇 (单个 Depot + 部分客户) 上独立运行 ALNSMO
+    子问题中 Depot 为节点 0、客户依次为 1..k；node_map 把子问题节点编号映射回全局编号
+    返回 (前沿 [(全局路径列表, 全局 Depot 数组, obj)], hv_trajectory, 耗时)
+    """
+    t0 = time.perf_counter()
+    random.seed(seed)
+    np.random.seed(seed)
+    solver = ALNSMO(customers, [depot], metric=metric, n_workers=1)
+    archive, hv_trajectory = solver.solve(time_limit=time_limit, iter_max=iterations)
+    front = [([node_map[r] for r in ind.routes], node_map[ind.route_depots], list(ind.obj)) for ind in archive]
+    return front, hv_trajectory, time.perf_counter() - t0
+
+
+def merge_fronts(fronts):
+    """
+    合并各簇的 Pareto 前沿 (目标值可加：f1、f2 均为各簇之和)
+    从各簇 f1 最小的成员组合出发，每步让一个簇沿自己的前沿前进一格，
+    总是选择单位 f1 增量换来 f2 改善最多的一步 (边际率最大，按堆选取)：
+    凸的部分恰好走过全部加权和最优组合，非凸处的台阶给出 epsilon 约束下的组合
+    fronts: 每簇的目标值列表 (f1 升序、f2 降序的非支配前沿)
+    返回 [(f1, f2, 各簇所选成员下标元组), ...]，共 sum(len) - C + 1 个互不支配的组合
+    """
+    pos = [0] * len(fronts)
+    f1 = sum(front[0][0] for front in fronts)
+    f2 = sum(front[0][1] for front in fronts)
+    combos = [(f1, f2, tuple(pos))]
+
+    def push(heap, c):
+        front, k = fronts[c], pos[c]
+        if k + 1 < len(front):
+            gain = front[k][1] - front[k + 1][1]
+            cost = front[k + 1][0] - front[k][0]
+            heapq.heappush(heap, (-gain / cost if cost > 0 else -np.inf, c))
+
+    heap = []
+    for c in range(len(fronts)):
+        push(heap, c)
+    while heap:
+        _, c = heapq.heappop(heap)
+        front, k = fronts[c], pos[c]
+        f1 += front[k + 1][0] - front[k][0]
+        f2 += front[k + 1][1] - front[k][1]
+        pos[c] = k + 1
+        combos.append((f1, f2, tuple(pos)))
+        push(heap, c)
+    return combos
+
+
+class _Combination:
+    """合并阶段的轻量占位个体：只有目标值与各簇的成员选择，进入档案后才组装成完整个体"""
+    __slots__ = ('obj', 'choice')
+
+    def __init__(self, f1, f2, choice):
+        self.obj = [f1, f2]
+        self.choice = choice
+
+
+class DecomposedALNSMO:
+    """
+    分解模式 (数千客户、多 Depot 的大规模实例)：
+    1. 按 Depot 与时间窗把客户划分为若干簇 (cluster_customers)
+    2. 每簇作为独立的子 ALNSMO 在进程池中并行求解 (大簇先提交)，互不通信
+    3. 合并各簇前沿 (merge_fronts)，组合进入容量受限的全局档案后组装为完整个体
+    4. 边界修复：对位于两个 Depot 之间的客户，用 migrate_task_o3 尝试迁到另一 Depot 的路径，
+       只接受两个目标都不变差的迁移，全部候选同时并入档案
+    簇间无数据依赖，第 2 步的墙钟时间随进程数近似线性下降
+    """
+    def __init__(self, customers, depots, cluster_size=None, n_workers=None, metric=None, seed=None):
+        self.problem = ProblemInstance(customers, depots, metric)
+        self.metric = metric
+        self.cluster_size = cluster_size or config.DECOMP_CLUSTER_SIZE
+        self.n_workers = n_workers or config.DECOMP_WORKERS or os.cpu_count() or 1
+        self.seed = seed if seed is not None else random.randrange(2**31 - 1)
+        self.clusters = cluster_customers(self.problem, self.cluster_size)
+        self.archive = ParetoArchive(config.ARCHIVE_CAPACITY)
+        self.timings = {}
+
+        # 边界客户：到次近 Depot 的距离不超过最近距离的 DECOMP_BOUNDARY_RATIO 倍
+        to_depot = np.asarray(self.problem.dist.matrix[np.ix_(self.problem.depot_nodes, self.problem.customer_nodes)])
+        order = np.argsort(to_depot, axis=0)
+        m = self.problem.num_depots
+        self.boundary = np.zeros(self.problem.num_nodes, dtype=bool)
+        self.nearest = np.full(self.problem.num_nodes, -1)
+        self.second = np.full(self.problem.num_nodes, -1)
+        self.nearest[m:] = order[0]
+        if m > 1:
+            self.second[m:] = order[1]
+            cols = np.arange(to_depot.shape[1])
+            self.boundary[m:] = to_depot[order[1], cols] <= config.DECOMP_BOUNDARY_RATIO * to_depot[order[0], cols]
+
+    def solve(self, iterations=None, time_limit=None, repair_rounds=None):
+        """
+        iterations / time_limit: 每个子 ALNSMO 的迭代次数 (默认 config.ITER_MAX) 与墙钟预算 (秒)
+        返回 (全局档案列表, 各簇的 hv_trajectory 列表)；各阶段耗时见 self.timings
+        """
+        repair_rounds = repair_rounds if repair_rounds is not None else config.DECOMP_REPAIR_ROUNDS
+        t0 = time.perf_counter()
+        jobs = []
+        for c, (depot, nodes) in enumerate(self.clusters):
+            customers = [self.problem.customer(v) for v in nodes]
+            node_map = np.concatenate(([depot], nodes)).astype(np.int32)
+            jobs.append((customers, self.problem.depot(depot), node_map, self.metric, self.seed + c,
+                         iterations, time_limit))
+        # 大簇先提交，缩短最后一个作业拖尾的时间
+        order = sorted(range(len(jobs)), key=lambda c: -len(self.clusters[c][1]))
+        results = [None] * len(jobs)
+        if self.n_workers == 1 or len(jobs) == 1:
+            for c in order:
+                results[c] = solve_cluster(*jobs[c])
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.n_workers, len(jobs))) as pool:
+                futures = {c: pool.submit(solve_cluster, *jobs[c]) for c in order}
+                for c, future in futures.items():
+                    results[c] = future.result()
+        t1 = time.perf_counter()
+
+        fronts = [res[0] for res in results]
+        archive = ParetoArchive(config.ARCHIVE_CAPACITY)
+        archive.update([_Combination(*combo) for combo in merge_fronts([[obj for _, _, obj in front]
+                                                                          for front in fronts])])
+        population = [self.assemble(fronts, combo.choice) for combo in archive]
+        evaluate_population(self.problem, population)
+        self.archive = ParetoArchive(config.ARCHIVE_CAPACITY)
+        self.archive.update(population)
+        t2 = time.perf_counter()
+
+        random.seed(self.seed)
+        self.repair(population, repair_rounds)
+        t3 = time.perf_counter()
+        self.timings = {'clusters': len(self.clusters), 'subproblems': t1 - t0, 'merge': t2 - t1,
+                        'repair': t3 - t2, 'total': t3 - t0,
+                        'cluster_seconds': [res[2] for res in results]}
+        return list(self.archive), [res[1] for res in results]
+
+    @staticmethod
+    def assemble(fronts, choice):
+        """按各簇的成员选择拼接出全局个体"""
+        routes, depots = [], []
+        for front, k in zip(fronts, choice):
+            routes += front[k][0]
+            depots.append(front[k][1])
+        return Individual.from_routes(routes, np.concatenate(depots))
+
+    def repair(self, population, rounds):
+        """边界修复：每轮为每个个体生成一次跨站迁移，批量评价，Pareto 不变差时替换"""
+        if not self.boundary.any():
+            return
+        for _ in range(rounds):
+            moves = [(i, self.boundary_move(ind)) for i, ind in enumerate(population)]
+            moves = [(i, cand) for i, cand in moves if cand is not None]
+            if not moves:
+                return
+            evaluate_population(self.problem, [cand for _, cand in moves])
+            for i, cand in moves:
+                old = population[i]
+                if cand.obj[0] <= old.obj[0] and cand.obj[1] <= old.obj[1]:
+                    population[i] = cand
+            self.archive.update([cand for _, cand in moves])
+
+    def boundary_move(self, ind):
+        """
+        随机选一个边界客户，把它从所在路径移出，插入另一个候选 Depot 的某条路径
+        (客户当前不在最近 Depot 时迁回最近 Depot，否则迁往次近 Depot)；
+        插入位置与 o2/o3 相同 (choose_slot：优先紧邻其粒度邻居，否则随机)
+        """
+        positions = np.flatnonzero(self.boundary[ind.tour])
+        if len(positions) == 0:
+            return None
+        pos = int(positions[random.randrange(len(positions))])
+        node = ind.tour[pos]
+        k = int(np.searchsorted(ind.offsets, pos, side='right')) - 1
+        depot = ind.route_depots[k]
+        target = self.nearest[node] if depot != self.nearest[node] else self.second[node]
+        partners = np.flatnonzero(ind.route_depots == target)
+        if len(partners) == 0:
+            return None
+        j = int(partners[random.randrange(len(partners))])
+        new_k = np.delete(ind.route(k), pos - ind.offsets[k])
+        route_j = ind.route(j)
+        new_j = np.insert(route_j, choose_slot(route_j, node, self.problem), node)
+        return ind.replace_routes({k: new_k, j: new_j})
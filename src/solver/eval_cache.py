@@ -0,0 +1,116 @@
+from collections import OrderedDict
+import numpy as np
+
+# 多项式滚动哈希的基数 (奇数，按 2^64 取模，即 uint64 自然溢出)
+_ROUTE_BASE = np.uint64(0x9E3779B97F4A7C15)
+_SOLUTION_BASE = np.uint64(0xC2B2AE3D27D4EB4F)
+_DEPOT_MIX = 0xFF51AFD7ED558CCD
+
+
+class LRUCache:
+    """按条目数限制容量的 LRU 缓存，统计命中率"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self.data.clear()
+        self.hits = self.misses = 0
+
+
+class EvaluationCache:
+    """
+    评价结果的两级记忆化缓存，键为廉价的多项式滚动哈希 (2^64 取模)
+    路径级:   (所属 Depot, 长度, 节点序列哈希) -> (闭环距离, 满意度, 到达时刻)
+    解级:     各路径键按位置再做一次滚动哈希 -> 个体的全部评价缓存 (目标值与路径级缓存数组)
+    o5 这类确定性算子与小路径上的交换/移动会反复产生相同路径，命中时跳过调度推算
+    哈希冲突概率约为 2^-64 量级，不做逐节点比对
+    """
+    def __init__(self, route_capacity, solution_capacity):
+        self.routes = LRUCache(route_capacity)
+        self.solutions = LRUCache(solution_capacity)
+        self._route_pow = np.ones(1, dtype=np.uint64)
+        self._solution_pow = np.ones(1, dtype=np.uint64)
+
+    @staticmethod
+    def _powers(table, base, n):
+        if len(table) < n:
+            table = np.empty(max(n, 2 * len(table)), dtype=np.uint64)
+            table[0] = 1
+            with np.errstate(over='ignore'):
+                for i in range(1, len(table)):
+                    table[i] = table[i - 1] * base
+        return table
+
+    def route_keys(self, padded, lengths, depots):
+        """
+        一批填充路径 (B, L) 的路径键，一次向量化计算：sum((node+1) * base^k) mod 2^64，
+        填充位置为 0 不影响哈希；再混入长度与所属 Depot
+        """
+        self._route_pow = self._powers(self._route_pow, _ROUTE_BASE, padded.shape[1])
+        mask = np.arange(padded.shape[1])[None, :] < np.asarray(lengths)[:, None]
+        terms = np.where(mask, padded.astype(np.uint64) + np.uint64(1), np.uint64(0))
+        with np.errstate(over='ignore'):
+            h = (terms * self._route_pow[:padded.shape[1]]).sum(axis=1, dtype=np.uint64)
+        return [(int(d), int(n), int(v)) for d, n, v in zip(depots, lengths, h)]
+
+    def solution_keys(self, route_hashes):
+        """
+        由各个体的路径哈希数组 (uint64) 按位置组合出解的键：sum(h_k * base^(k+1)) mod 2^64
+        所有个体拼接后用 reduceat 一次算完
+        """
+        if not route_hashes:
+            return []
+        counts = np.fromiter((len(h) for h in route_hashes), dtype=np.int64, count=len(route_hashes))
+        self._solution_pow = self._powers(self._solution_pow, _SOLUTION_BASE, int(counts.max()) + 1)
+        flat = np.concatenate(route_hashes)
+        starts = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        position = np.arange(len(flat)) - np.repeat(starts, counts) + 1
+        with np.errstate(over='ignore'):
+            keys = np.add.reduceat(flat * self._solution_pow[position], starts, dtype=np.uint64)
+        return keys.tolist()
+
+    @staticmethod
+    def route_hash(key):
+        """路径键压缩为一个 uint64 (用于解级组合)"""
+        depot, length, h = key
+        return (h ^ ((depot + 1) * _DEPOT_MIX) ^ (length << 32)) & 0xFFFFFFFFFFFFFFFF
+
+    def stats(self):
+        return {
+            'route_entries': len(self.routes),
+            'route_hits': self.routes.hits,
+            'route_misses': self.routes.misses,
+            'route_hit_rate': self.routes.hit_rate(),
+            'solution_entries': len(self.solutions),
+            'solution_hits': self.solutions.hits,
+            'solution_misses': self.solutions.misses,
+            'solution_hit_rate': self.solutions.hit_rate(),
+        }
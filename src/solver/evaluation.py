@@ -0,0 +1,131 @@
+import numpy as np
+from ..config import config
+from ..schedule import pad_routes, simulate_batch
+
+
+def evaluate_population(problem, individuals, cache=None):
+    """
+    批量评价一组个体并写回 obj
+    首次评价的个体需评价全部路径；已有缓存的个体只评价 dirty 中的路径 (算子改动的 1~2 条)。
+    所有待评价路径被收集到一个 (B, L) 填充矩阵中，由调度引擎一次性向量化推算，
+    再写回路径级缓存并汇总各个体的总距离、活跃无人机数和总满意度
+    cache 为 EvaluationCache 时先查解级缓存、再查路径级缓存，只推算未命中的路径 (带等待的个体不走缓存)
+    """
+    jobs = []
+    for ind in individuals:
+        if ind.route_dist is None:
+            num_routes = ind.num_routes
+            ind.route_dist = np.zeros(num_routes)
+            ind.route_active = np.zeros(num_routes, dtype=bool)
+            ind.route_sat = np.zeros(num_routes)
+            ind.arrival = np.zeros(len(ind.tour))
+            ind.total_dist, ind.total_sat, ind.num_active = 0.0, 0.0, 0
+            ind.dirty = list(range(num_routes))
+        jobs.extend((ind, k) for k in ind.dirty)
+
+    keys = [None] * len(jobs)
+    pending = []
+    if cache is not None and jobs:
+        jobs, keys, pending = consult_cache(cache, individuals, jobs)
+
+    if jobs:
+        padded, lengths = pad_routes([ind.route(k) for ind, k in jobs])
+        depots = np.fromiter((ind.route_depots[k] for ind, k in jobs), dtype=np.int64, count=len(jobs))
+        waits = None
+        if any(ind.wait is not None for ind, _ in jobs):
+            waits = np.zeros(padded.shape)
+            for b, (ind, k) in enumerate(jobs):
+                if ind.wait is not None:
+                    waits[b, :lengths[b]] = ind.route_wait(k)
+        result = simulate_batch(problem, padded, lengths, depots, waits)
+        distance = result.distance.tolist()
+        satisfaction = result.route_satisfaction.tolist()
+        for b, (ind, k) in enumerate(jobs):
+            arrival = result.row(b, lengths[b])
+            apply_route(ind, k, distance[b], satisfaction[b], arrival)
+            if keys[b] is not None:
+                cache.routes.put(keys[b], (distance[b], satisfaction[b], arrival.copy()))
+
+    for ind in individuals:
+        if ind.dirty:
+            # 总量由路径级缓存重新求和 (路径数很少)：与差分累加相比结果不依赖评价历史，
+            # 相同的解总是得到逐位相同的目标值
+            ind.total_dist = float(ind.route_dist.sum())
+            ind.total_sat = float(ind.route_sat.sum())
+            ind.num_active = int(ind.route_active.sum())
+        ind.dirty = []
+        set_objectives(ind)
+    for ind, key in pending:
+        cache.solutions.put(key, (ind.total_dist, ind.total_sat, ind.num_active,
+                                  ind.route_dist, ind.route_sat, ind.route_active, ind.arrival))
+
+
+def apply_route(ind, k, distance, satisfaction, arrival):
+    """把第 k 条路径的新评价结果写入个体的路径级缓存"""
+    ind.route_dist[k], ind.route_sat[k], ind.route_active[k] = distance, satisfaction, len(arrival) > 0
+    ind.arrival[ind.offsets[k]:ind.offsets[k + 1]] = arrival
+
+
+def consult_cache(cache, individuals, jobs):
+    """
+    查询评价缓存，返回 (仍需推算的 jobs, 对应的路径键 (不缓存时为 None), 待写入解级缓存的 (个体, 键))
+    1. 为待评价路径 (以及尚无路径哈希的个体的全部路径) 一次性计算滚动哈希
+    2. 解级命中的个体直接复制整套评价缓存，其路径不再推算
+    3. 其余路径逐条查路径级缓存
+    """
+    hash_jobs = []
+    for ind in individuals:
+        if ind.wait is not None or not ind.dirty:
+            continue
+        if ind.route_hash is None:
+            ind.route_hash = np.zeros(ind.num_routes, dtype=np.uint64)
+            hash_jobs.extend((ind, k) for k in range(ind.num_routes))
+        else:
+            hash_jobs.extend((ind, k) for k in ind.dirty)
+    route_key = {}
+    if hash_jobs:
+        padded, lengths = pad_routes([ind.route(k) for ind, k in hash_jobs])
+        depots = [ind.route_depots[k] for ind, k in hash_jobs]
+        for (ind, k), key in zip(hash_jobs, cache.route_keys(padded, lengths, depots)):
+            ind.route_hash[k] = cache.route_hash(key)
+            route_key[id(ind), k] = key
+
+    pending, solved = [], set()
+    lookups = [ind for ind in individuals if ind.wait is None and ind.dirty]
+    for ind, key in zip(lookups, cache.solution_keys([ind.route_hash for ind in lookups])):
+        entry = cache.solutions.get(key)
+        if entry is None:
+            pending.append((ind, key))
+            continue
+        ind.total_dist, ind.total_sat, ind.num_active = entry[:3]
+        ind.route_dist, ind.route_sat, ind.route_active, ind.arrival = (a.copy() for a in entry[3:])
+        solved.add(id(ind))
+
+    remaining, keys = [], []
+    for ind, k in jobs:
+        if id(ind) in solved:
+            continue
+        key = route_key.get((id(ind), k))
+        hit = cache.routes.get(key) if key is not None else None
+        if hit is None:
+            remaining.append((ind, k))
+            keys.append(key)
+        else:
+            apply_route(ind, k, *hit)
+    return remaining, keys, pending
+
+
+def evaluate_individual(problem, ind, cache=None):
+    """评价单个个体 (增量)，见 evaluate_population"""
+    evaluate_population(problem, [ind], cache)
+
+
+def set_objectives(ind):
+    """
+    由缓存的总量计算目标值
+    f1 (成本) 通常在 100-500 之间，f2 (满意度) 在 0-1 之间，
+    f1 除以缩放因子 100 使其量级与 f2 匹配；f2 取负值统一为最小化
+    """
+    raw_cost = config.SIGMA * ind.total_dist + config.RHO * ind.num_active
+    ind.obj[0] = float(raw_cost) / 100.0
+    ind.obj[1] = -float(ind.total_sat)
@@ -0,0 +1,157 @@
+import csv
+import json
+import time
+from contextlib import nullcontext
+import numpy as np
+
+# BreedStats.ops 的列
+OP_CALLS, OP_TIME, OP_ACCEPTED, OP_F1_IMPROVED, OP_F2_IMPROVED, OP_F1_GAIN, OP_F2_GAIN = range(7)
+OP_COLUMNS = ('calls', 'time', 'accepted', 'f1_improved', 'f2_improved', 'f1_gain', 'f2_gain')
+
+# 关闭计时时所有 section 共用的空上下文，开销只有一次属性判断
+_NULL = nullcontext()
+
+
+class BreedStats:
+    """
+    一次 breed 调用 (一段种群) 的算子统计，可跨进程传回主进程后累加
+    ops: (算子数, 7) 数组，列见 OP_COLUMNS；eval_time/evaluations: 批量评价耗时与评价个体数
+    """
+    __slots__ = ('ops', 'eval_time', 'evaluations')
+
+    def __init__(self, n_operators):
+        self.ops = np.zeros((n_operators, len(OP_COLUMNS)))
+        self.eval_time = 0.0
+        self.evaluations = 0
+
+    def record_mutation(self, op_idx, elapsed):
+        self.ops[op_idx, OP_CALLS] += 1
+        self.ops[op_idx, OP_TIME] += elapsed
+
+    def record_mutations(self, op_idx, elapsed):
+        """批量变异：一组调用共用一次计时，耗时按调用次数均摊到各算子"""
+        np.add.at(self.ops[:, OP_CALLS], op_idx, 1)
+        np.add.at(self.ops[:, OP_TIME], op_idx, elapsed / len(op_idx))
+
+    def record_outcome(self, op_idx, parent, child, accepted):
+        """记录接受与否，以及子代相对父代在 f1/f2 上的改进 (两目标均为越小越好)"""
+        d1 = parent.obj[0] - child.obj[0]
+        d2 = parent.obj[1] - child.obj[1]
+        row = self.ops[op_idx]
+        row[OP_ACCEPTED] += accepted
+        row[OP_F1_IMPROVED] += d1 > 0
+        row[OP_F2_IMPROVED] += d2 > 0
+        row[OP_F1_GAIN] += max(d1, 0.0)
+        row[OP_F2_GAIN] += max(d2, 0.0)
+
+
+class Instrumentation:
+    """
+    求解过程的计时与算子统计
+    enabled=False 时 section() 返回共享的空上下文、breed 不收集 BreedStats，几乎没有额外开销
+    统计在整个运行期间累计 (与每 10 代清零一次的 scores/usage_count 无关)
+    sections: evaluate (含初始种群与子进程中的批量评价，为各进程耗时之和), elitism_selection,
+              update_archive (含增量 HV 维护), hypervolume (档案中 HV 的增量维护与贡献计算，是 update_archive 的一部分)
+    """
+    def __init__(self, operator_names, enabled=False):
+        self.enabled = enabled
+        self.operator_names = list(operator_names)
+        self.reset()
+
+    def reset(self):
+        self.ops = np.zeros((len(self.operator_names), len(OP_COLUMNS)))
+        self.section_time = {}
+        self.section_calls = {}
+        self.evaluations = 0
+        self.iterations = 0
+        self.started = None
+        self.wall_time = 0.0
+
+    def start(self):
+        if self.enabled:
+            self.reset()
+            self.started = time.perf_counter()
+
+    def stop(self):
+        if self.enabled and self.started is not None:
+            self.wall_time = time.perf_counter() - self.started
+            self.started = None
+
+    def new_breed_stats(self):
+        """开启时返回新的 BreedStats，否则返回 None (breed 据此跳过统计)"""
+        return BreedStats(len(self.operator_names)) if self.enabled else None
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL
+        return _Section(self, name)
+
+    def add_section(self, name, elapsed, calls=1):
+        self.section_time[name] = self.section_time.get(name, 0.0) + elapsed
+        self.section_calls[name] = self.section_calls.get(name, 0) + calls
+
+    def record_breed(self, stats):
+        if stats is None:
+            return
+        self.ops += stats.ops
+        self.evaluations += stats.evaluations
+        self.add_section('evaluate', stats.eval_time)
+
+    def report(self):
+        """汇总为可 JSON 序列化的字典"""
+        wall = self.wall_time if self.started is None else time.perf_counter() - self.started
+        eval_time = self.section_time.get('evaluate', 0.0)
+        operators = []
+        for name, row in zip(self.operator_names, self.ops):
+            entry = {'name': name}
+            entry.update({col: float(v) for col, v in zip(OP_COLUMNS, row)})
+            entry['calls'] = int(entry['calls'])
+            entry['acceptance_rate'] = entry['accepted'] / entry['calls'] if entry['calls'] else 0.0
+            entry['time_per_call'] = entry['time'] / entry['calls'] if entry['calls'] else 0.0
+            operators.append(entry)
+        return {
+            'iterations': self.iterations,
+            'wall_time': wall,
+            'evaluations': self.evaluations,
+            'evaluations_per_sec': self.evaluations / wall if wall > 0 else 0.0,
+            'evaluations_per_eval_sec': self.evaluations / eval_time if eval_time > 0 else 0.0,
+            'sections': {name: {'calls': self.section_calls[name], 'time': t}
+                         for name, t in self.section_time.items()},
+            'operators': operators,
+        }
+
+    def to_json(self, path, **extra):
+        data = self.report()
+        data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def to_csv(self, path):
+        """每行一个算子或一个计时段：kind, name, 以及各统计列"""
+        data = self.report()
+        fields = ['kind', 'name', *OP_COLUMNS, 'acceptance_rate', 'time_per_call']
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval='')
+            writer.writeheader()
+            for entry in data['operators']:
+                writer.writerow({'kind': 'operator', **entry})
+            for name, sec in data['sections'].items():
+                writer.writerow({'kind': 'section', 'name': name, **sec})
+            writer.writerow({'kind': 'run', 'name': 'evaluations_per_sec',
+                             'calls': data['evaluations'], 'time': data['wall_time']})
+
+
+class _Section:
+    __slots__ = ('owner', 'name', 't0')
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.add_section(self.name, time.perf_counter() - self.t0)
+        return False
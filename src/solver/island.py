@@ -0,0 +1,79 @@
+import random
+import multiprocessing as mp
+import numpy as np
+from ..config import config
+from ..problem import ProblemInstance
+from .alnsmo import ALNSMO
+from .archive import new_archive
+
+
+def run_island(island_id, problem, seed, iterations, interval, n_migrants, conn):
+    """
+    单个岛的进程主函数：独立的 ALNSMO (独立的算子权重)
+    每 interval 代把档案中的非支配个体经管道发给调度进程，并接收邻岛的迁入个体
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    solver = ALNSMO(problem.customers, problem.depots, problem=problem, n_workers=1)
+    solver.start()
+    while solver.iteration < iterations:
+        for _ in range(min(interval, iterations - solver.iteration)):
+            solver.step()
+        if solver.iteration < iterations:
+            conn.send(solver.emigrants(n_migrants))
+            solver.immigrate(conn.recv())
+    conn.send((list(solver.archive), solver.hv_trajectory, solver.weights))
+    conn.close()
+
+
+class IslandALNSMO:
+    """
+    岛屿模型：N 个 ALNSMO 在独立进程中并行演化，每 K 代按环形拓扑迁移一次
+    (岛 i 的非支配个体迁往岛 i+1)，最后合并各岛档案得到全局 Pareto 前沿
+    """
+    def __init__(self, customers, depots, n_islands=None, migration_interval=None,
+                 n_migrants=None, metric=None, seed=None):
+        self.problem = ProblemInstance(customers, depots, metric)
+        self.n_islands = n_islands or config.N_ISLANDS
+        self.migration_interval = migration_interval or config.MIGRATION_INTERVAL
+        self.n_migrants = n_migrants or config.N_MIGRANTS
+        self.seed = seed if seed is not None else random.randrange(2**31 - 1)
+        self.island_weights = []
+
+    def solve(self, iterations=None):
+        """返回 (全局档案列表, 各岛的 hv_trajectory 列表)"""
+        iterations = iterations or config.ITER_MAX
+        ctx = mp.get_context()
+        pipes, procs = [], []
+        for k in range(self.n_islands):
+            parent_conn, child_conn = ctx.Pipe()
+            proc = ctx.Process(target=run_island, args=(
+                k, self.problem, self.seed + k, iterations,
+                self.migration_interval, self.n_migrants, child_conn))
+            proc.start()
+            child_conn.close()
+            pipes.append(parent_conn)
+            procs.append(proc)
+
+        try:
+            # 各岛在第 K, 2K, ... 代 (不含最后一代) 迁移
+            epochs = (iterations - 1) // self.migration_interval
+            for _ in range(epochs):
+                outgoing = [conn.recv() for conn in pipes]
+                for k, conn in enumerate(pipes):
+                    conn.send(outgoing[k - 1])
+
+            results = [conn.recv() for conn in pipes]
+        finally:
+            for proc in procs:
+                proc.join()
+
+        archive = new_archive()
+        hv_trajectories = []
+        self.island_weights = []
+        for members, hv_trajectory, weights in results:
+            archive.update(members)
+            hv_trajectories.append(hv_trajectory)
+            self.island_weights.append(weights)
+        self.archive = archive
+        return list(archive), hv_trajectories
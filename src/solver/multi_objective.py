@@ -1,81 +1,101 @@
+from bisect import bisect_right
 import numpy as np
 
+def objective_matrix(population):
+    """将种群目标值收集为 (N, 2) 矩阵"""
+    return np.array([p.obj for p in population], dtype=np.float64).reshape(-1, 2)
+
+def nondominated_ranks(F):
+    """
+    双目标非支配排序 (Jensen 扫描法)，O(N log N)
+    按 (f1, f2) 字典序排序后依次扫描：每层前沿只需记住当前最小的 f2 (层尾)，
+    各层层尾单调不减，用二分查找找到第一个不支配当前点的层即为其层级。
+    完全相同的点互不支配，归入同一层。
+    返回从 1 开始的层级数组
+    """
+    n = len(F)
+    ranks = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return ranks
+    order = np.lexsort((F[:, 1], F[:, 0]))
+    f1 = F[order, 0].tolist()
+    f2 = F[order, 1].tolist()
+    tails = []
+    prev = None
+    for pos, idx in enumerate(order.tolist()):
+        point = (f1[pos], f2[pos])
+        if point == prev:
+            ranks[idx] = ranks[order[pos - 1]]
+            continue
+        k = bisect_right(tails, point[1])
+        if k == len(tails):
+            tails.append(point[1])
+        else:
+            tails[k] = point[1]
+        ranks[idx] = k + 1
+        prev = point
+    return ranks
+
+def crowding_distances(F, ranks):
+    """
+    向量化拥挤距离：对所有前沿一次性计算
+    每个目标按 (层级, 目标值) 排序，同层相邻点差值除以该层该目标的极差；
+    边界点与不足 3 个点的前沿赋予极大值 1e10
+    """
+    n = len(F)
+    distance = np.zeros(n)
+    if n == 0:
+        return distance
+    small = np.bincount(ranks)[ranks] <= 2
+
+    for m in range(F.shape[1]):
+        order = np.lexsort((F[:, m], ranks))
+        r = ranks[order]
+        v = F[order, m]
+        first = np.r_[True, r[1:] != r[:-1]]
+        last = np.r_[r[1:] != r[:-1], True]
+        # 每层的极差：层尾值 - 层首值
+        start_idx = np.flatnonzero(first)
+        end_idx = np.flatnonzero(last)
+        span = np.repeat(v[end_idx] - v[start_idx], end_idx - start_idx + 1)
+
+        inner = ~(first | last)
+        gap = np.zeros(n)
+        gap[1:-1] = v[2:] - v[:-2]
+        # 如果该维度所有解都一样，跳过，否则会导致除以零
+        valid = inner & (span >= 1e-6)
+        contrib = np.zeros(n)
+        contrib[valid] = gap[valid] / span[valid]
+        contrib[first | last] = 1e10
+        distance[order] += contrib
+
+    distance[small] = 1e10
+    return np.minimum(distance, 1e10)
+
 def fast_non_dominated_sort(population):
     """
     快速非支配排序：将种群划分为不同的层级 (Rank)
+    基于 nondominated_ranks 的 O(N log N) 双目标实现，写回 p.rank
     """
     if not population: return [[]]
-    
-    for p in population:
-        p.domination_count = 0  
-        p.dominated_solutions = []  
-        p.rank = 0
-
-    fronts = [[]]
-    for i, p in enumerate(population):
-        for j, q in enumerate(population):
-            if i == j: continue
-            # 这里的 obj[0] 和 obj[1] 必须都是“越小越好”
-            # 注意：在 ALNSMO.evaluate 中我们已经把满意度取了负值
-            if (p.obj[0] <= q.obj[0] and p.obj[1] <= q.obj[1]) and \
-               (p.obj[0] < q.obj[0] or p.obj[1] < q.obj[1]):
-                p.dominated_solutions.append(q)
-            elif (q.obj[0] <= p.obj[0] and q.obj[1] <= p.obj[1]) and \
-                 (q.obj[0] < p.obj[0] or q.obj[1] < p.obj[1]):
-                p.domination_count += 1
-        
-        if p.domination_count == 0:
-            p.rank = 1
-            fronts[0].append(p)
-
-    curr_idx = 0
-    while len(fronts[curr_idx]) > 0:
-        next_front = []
-        for p in fronts[curr_idx]:
-            for q in p.dominated_solutions:
-                q.domination_count -= 1
-                if q.domination_count == 0:
-                    q.rank = curr_idx + 2
-                    next_front.append(q)
-        curr_idx += 1
-        if not next_front: break
-        fronts.append(next_front)
-    return [f for f in fronts if f]
+    ranks = nondominated_ranks(objective_matrix(population))
+    fronts = [[] for _ in range(int(ranks.max()))]
+    for p, r in zip(population, ranks.tolist()):
+        p.rank = r
+        fronts[r - 1].append(p)
+    return fronts
 
 def calculate_crowding_distance(front):
     """
     【核心修复】归一化拥挤距离计算
     修复点坍缩的关键：确保不同量级的目标函数对多样性的贡献平等。
     """
-    l = len(front)
-    if l <= 2:
-        for p in front: p.crowding_distance = 1e10 # 赋予极大值
-        return
-
-    for p in front: p.crowding_distance = 0
-
-    num_objectives = len(front[0].obj)
-    for m in range(num_objectives):
-        # 1. 按当前维度目标排序
-        front.sort(key=lambda x: x.obj[m])
-        
-        # 2. 边界点必须保留，赋予极大值
-        front[0].crowding_distance = 1e10
-        front[-1].crowding_distance = 1e10
-        
-        # 3. 计算极差进行归一化
-        obj_min = front[0].obj[m]
-        obj_max = front[-1].obj[m]
-        obj_range = obj_max - obj_min
-        
-        # 如果该维度所有解都一样，跳过，否则会导致除以零
-        if obj_range < 1e-6: continue
-        
-        # 4. 累加归一化后的曼哈顿距离
-        for i in range(1, l - 1):
-            distance = (front[i+1].obj[m] - front[i-1].obj[m]) / obj_range
-            front[i].crowding_distance += distance
+    if not front: return
+    F = objective_matrix(front)
+    distance = crowding_distances(F, np.ones(len(front), dtype=np.int64))
+    for p, d in zip(front, distance.tolist()):
+        p.crowding_distance = d
 
 def get_pareto_front(population):
     """提取当前的帕累托前沿"""
-    return [p for p in population if getattr(p, 'rank', 999) == 1]
\ No newline at end of file
+    return [p for p in population if getattr(p, 'rank', 999) == 1]
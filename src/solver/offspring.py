@@ -0,0 +1,202 @@
+import time
+import random
+import numpy as np
+from ..config import config
+from ..operators import (
+    reorder_task_o1, transfer_task_o2, migrate_task_o3, optimize_position_o6,
+    batch_swap, batch_relocate, batch_transfer
+)
+from ..schedule import pad_routes
+from ..operators.batch import pick
+from .evaluation import evaluate_population
+from .instrumentation import BreedStats
+from .eval_cache import EvaluationCache
+
+# 子进程内的只读状态，由 init_worker 在进程启动时设置一次
+_WORKER = {}
+
+# 作用于两条路径的算子下标 (o2, o3, o4, o7, o8)
+PAIR_OPERATORS = (1, 2, 3, 6, 7)
+
+# 可在填充数组上批量执行的算子 (按函数识别；FrozenPrefix 等包装过的算子仍逐个执行)
+BATCH_MOVES = {
+    reorder_task_o1: 'swap',
+    optimize_position_o6: 'relocate',
+    transfer_task_o2: 'transfer',
+    migrate_task_o3: 'transfer',
+}
+
+
+def select_operator(weights):
+    """按自适应权重轮盘赌选择算子"""
+    prob = weights / sum(weights)
+    return np.random.choice(len(weights), p=prob)
+
+
+def partner_routes(ind, d_idx, op_idx):
+    """o2 选同站路径，o3 选跨站路径，o4/o7/o8 不限；无满足条件的路径时退化为任意其他路径"""
+    others = [j for j in range(ind.num_routes) if j != d_idx]
+    depot = ind.route_depots[d_idx]
+    if op_idx == 1:
+        same = [j for j in others if ind.route_depots[j] == depot]
+        return same or others
+    if op_idx == 2:
+        cross = [j for j in others if ind.route_depots[j] != depot]
+        return cross or others
+    return others
+
+
+def mutate(problem, operators, ind, op_idx, d_idx=None, idx_j=None):
+    """对个体的一条 (或两条) 路径应用算子，只重建被改动的路径；d_idx/idx_j 未给定时随机选取"""
+    num_routes = ind.num_routes
+    if d_idx is None:
+        d_idx = random.randrange(num_routes)
+
+    if op_idx in PAIR_OPERATORS and num_routes > 1:
+        if idx_j is None:
+            idx_j = random.choice(partner_routes(ind, d_idx, op_idx))
+        depots = (ind.route_depots[d_idx], ind.route_depots[idx_j])
+        new_i, new_j = operators[op_idx](ind.route(d_idx), ind.route(idx_j), problem, depots)
+        return ind.replace_routes({d_idx: new_i, idx_j: new_j})
+    return ind.replace_routes({d_idx: operators[op_idx](ind.route(d_idx), problem)})
+
+
+def sample_moves(population, weights):
+    """
+    为整个种群一次抽取 (B, 6) 个随机数，向量化地得到每个个体的算子、路径与伙伴路径：
+        op      按自适应权重轮盘赌 (逆 CDF)
+        d       被改动的路径
+        j       伙伴路径，规则同 partner_routes；只有一条路径时为 -1
+        u       其余 3 列：算子内的位置/插入位置，以及接受准则
+    """
+    u = np.random.random((len(population), 6))
+    cdf = np.cumsum(weights)
+    op = np.minimum(np.searchsorted(cdf, u[:, 0] * cdf[-1], side='right'), len(weights) - 1)
+
+    num_routes = np.fromiter((ind.num_routes for ind in population), dtype=np.int64, count=len(population))
+    d = (u[:, 1] * num_routes).astype(np.int64)
+    D, _ = pad_routes([ind.route_depots for ind in population])
+    rows = np.arange(len(population))
+    col = np.arange(D.shape[1])[None, :]
+    others = (col < num_routes[:, None]) & (col != d[:, None])
+    same = D == D[rows, d][:, None]
+    prefer = np.where((op == 1)[:, None], others & same,
+                      np.where((op == 2)[:, None], others & ~same, others))
+    prefer = np.where(prefer.any(axis=1)[:, None], prefer, others)
+    return op, d, pick(prefer, u[:, 2]), u[:, 3:]
+
+
+def mutate_batch(problem, operators, population, weights, stats=None):
+    """
+    批量变异：sample_moves 一次抽取全部随机数，o1/o6/o2/o3 按类型分组后在填充数组上以花式索引一次完成，
+    其余算子 (o4/o5/o7/o8 与包装过的算子) 用预先抽取的路径下标逐个执行
+    双路径算子遇到只有一条路径的个体时不做改动
+    返回 (op, candidates, accept_u)，accept_u 为接受准则使用的随机数
+    """
+    op, d, j, u = sample_moves(population, weights)
+    d, j = d.tolist(), j.tolist()
+    kinds = np.array([BATCH_MOVES.get(f, '') for f in operators])[op]
+    pair = np.isin(op, PAIR_OPERATORS)
+    has_partner = np.array(j) >= 0
+    changes = [None] * len(population)
+
+    for kind in ('swap', 'relocate', 'transfer'):
+        rows = np.flatnonzero((kinds == kind) & (has_partner | ~pair))
+        if not len(rows):
+            continue
+        t0 = time.perf_counter()
+        R, lengths = pad_routes([population[b].route(d[b]) for b in rows])
+        if kind == 'transfer':
+            R_j, lengths_j = pad_routes([population[b].route(j[b]) for b in rows])
+            R, R_j, lengths, lengths_j = batch_transfer(problem, R, lengths, R_j, lengths_j, u[rows])
+            for k, b in enumerate(rows):
+                changes[b] = {d[b]: R[k, :lengths[k]], j[b]: R_j[k, :lengths_j[k]]}
+        else:
+            R = batch_swap(R, lengths, u[rows]) if kind == 'swap' else batch_relocate(problem, R, lengths, u[rows])
+            for k, b in enumerate(rows):
+                changes[b] = {d[b]: R[k, :lengths[k]]}
+        if stats is not None:
+            stats.record_mutations(op[rows], time.perf_counter() - t0)
+
+    candidates = []
+    for b, ind in enumerate(population):
+        if changes[b] is not None:
+            candidates.append(ind.replace_routes(changes[b]))
+        elif pair[b] and j[b] < 0:
+            candidates.append(ind.replace_routes({}))
+        else:
+            t0 = time.perf_counter()
+            candidates.append(mutate(problem, operators, ind, int(op[b]), d[b], j[b]))
+            if stats is not None:
+                stats.record_mutation(int(op[b]), time.perf_counter() - t0)
+    return op, candidates, u[:, 2]
+
+
+def breed(problem, operators, population, weights, stats=None, cache=None):
+    """
+    对一组个体执行：选择算子 -> 变异 -> 批量增量评价 -> 接受准则
+    全部子代先完成变异，再交给调度引擎一次性批量评价；config.BATCH_MUTATION 为真时变异走 mutate_batch
+    stats 为 BreedStats 时记录各算子耗时、接受率与 f1/f2 改进量，以及评价耗时；为 None 时不计时
+    cache 为 EvaluationCache 时评价前先查缓存
+    返回 (children, usage, scores, stats)，children[i] 为被接受的新个体，未接受时为 None
+    """
+    usage = np.zeros(len(operators))
+    scores = np.zeros(len(operators))
+    accept_u = None
+    if config.BATCH_MUTATION:
+        op_choice, candidates, accept_u = mutate_batch(problem, operators, population, weights, stats)
+        usage += np.bincount(op_choice, minlength=len(operators))
+    else:
+        op_choice = []
+        candidates = []
+        for ind in population:
+            op_idx = select_operator(weights)
+            usage[op_idx] += 1
+            op_choice.append(op_idx)
+            if stats is None:
+                candidates.append(mutate(problem, operators, ind, op_idx))
+            else:
+                t0 = time.perf_counter()
+                candidates.append(mutate(problem, operators, ind, op_idx))
+                stats.record_mutation(op_idx, time.perf_counter() - t0)
+
+    if stats is None:
+        evaluate_population(problem, candidates, cache)
+    else:
+        t0 = time.perf_counter()
+        evaluate_population(problem, candidates, cache)
+        stats.eval_time += time.perf_counter() - t0
+        stats.evaluations += len(candidates)
+
+    children = []
+    for b, (ind, new_ind, op_idx) in enumerate(zip(population, candidates, op_choice)):
+        # 【关键修复 2】多目标接受准则
+        # 不能只比较 obj[0]。如果新解在任一维度变好，或者满足概率阈值，就接受。
+        # 这样可以强迫算法去探索“成本虽高但满意度更好”的区域。
+        r = accept_u[b] if accept_u is not None else random.random()
+        if new_ind.obj[0] < ind.obj[0] or new_ind.obj[1] < ind.obj[1] or r < 0.2:
+            children.append(new_ind)
+            scores[op_idx] += config.THETA1
+            accepted = True
+        else:
+            children.append(None)
+            accepted = False
+        if stats is not None:
+            stats.record_outcome(op_idx, ind, new_ind, accepted)
+    return children, usage, scores, stats
+
+
+def init_worker(problem, operators, cache_sizes=None):
+    """进程池初始化：实例数据只随进程启动传输一次；每个工作进程各自维护一份评价缓存"""
+    _WORKER['problem'] = problem
+    _WORKER['operators'] = operators
+    _WORKER['cache'] = EvaluationCache(*cache_sizes) if cache_sizes else None
+
+
+def breed_chunk(population, weights, seed, instrument=False):
+    """子进程任务：以独立种子重置随机流后处理一段种群，保证结果可复现"""
+    random.seed(seed)
+    np.random.seed(seed)
+    operators = _WORKER['operators']
+    stats = BreedStats(len(operators)) if instrument else None
+    return breed(_WORKER['problem'], operators, population, weights, stats, _WORKER['cache'])
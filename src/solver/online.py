@@ -0,0 +1,201 @@
+import time
+import asyncio
+import inspect
+import numpy as np
+from ..config import config
+from ..models import Individual
+from ..operators import regret_insert
+from .alnsmo import ALNSMO
+from .evaluation import evaluate_individual
+
+
+def prefix_length(route, frozen):
+    """路径开头连续的冻结节点个数"""
+    if len(route) == 0:
+        return 0
+    mask = frozen[route]
+    return len(route) if mask.all() else int(np.argmin(mask))
+
+
+class FrozenPrefix:
+    """
+    算子包装：只让算子作用于各路径冻结前缀之后的部分，再把前缀原样接回
+    冻结节点已被执行 (无人机已到达)，不能改动顺序或换到其他路径；
+    frozen 为按节点编号的布尔数组。可 pickle，可随 init_worker 发往工作进程
+    """
+    def __init__(self, operator, frozen):
+        self.operator = operator
+        self.frozen = frozen
+        self.__name__ = operator.__name__
+
+    def __call__(self, route, *args):
+        k = prefix_length(route, self.frozen)
+        if len(args) == 3:      # 双路径算子 (route_i, route_j, problem, depots)
+            route_j, problem, depots = args
+            m = prefix_length(route_j, self.frozen)
+            new_i, new_j = self.operator(route[k:], route_j[m:], problem, depots)
+            return np.concatenate((route[:k], new_i)), np.concatenate((route_j[:m], new_j))
+        return np.concatenate((route[:k], self.operator(route[k:], *args)))
+
+
+def select_plan(front):
+    """从前沿中选出执行方案：两个目标按前沿范围归一化后离理想点最近的拐点"""
+    F = np.array([ind.obj for ind in front], dtype=np.float64)
+    span = F.max(axis=0) - F.min(axis=0)
+    span[span == 0] = 1.0
+    return front[int(np.argmin(np.hypot(*((F - F.min(axis=0)) / span).T)))]
+
+
+def project(member, plan, frozen):
+    """
+    把档案成员投影到执行方案的冻结前缀上：第 k 条路径 = 方案第 k 条路径的冻结前缀 + 成员第 k 条路径中的未冻结节点
+    路径结构 (条数与所属 Depot) 与方案不同的成员无法投影，返回 None
+    """
+    if member is plan:
+        return plan
+    if member.num_routes != plan.num_routes or not np.array_equal(member.route_depots, plan.route_depots):
+        return None
+    routes = []
+    for k in range(plan.num_routes):
+        head = plan.route(k)
+        head = head[:prefix_length(head, frozen)]
+        rest = member.route(k)
+        routes.append(np.concatenate((head, rest[~frozen[rest]])))
+    return Individual.from_routes(routes, plan.route_depots)
+
+
+class OnlineReoptimizer:
+    """
+    在线重优化：订单在无人机执行途中到达时，在上一版前沿的基础上热启动重规划，而不是从随机种群重新求解
+    每次重规划 (replan)：
+    1. 冻结：执行方案中到达时刻不晚于 now 的节点 (各路径的前缀) 此后不再改动
+    2. 扩展实例：新客户追加到节点编号末尾 (ProblemInstance.extend，只补算新增的距离行列)
+    3. 热启动种群：执行方案 + 沿前沿均匀抽取的档案成员 (投影到冻结前缀上)
+    4. 快速修复：regret_insert 把新客户插入每个种子的未冻结部分
+    5. 有界重优化：算子包装为 FrozenPrefix，以小种群运行至多 iterations 代且不超出剩余时间预算
+    冻结只固定已执行节点的顺序与归属；调度模型中出发载荷包含整条路径的 D/PD 包裹，
+    因此插入新的送货任务后，冻结前缀的推算时刻也会随之重算
+    """
+    def __init__(self, problem, front, plan=None, sla=None, iterations=None, pop_size=None):
+        self.problem = problem
+        self.front = list(front)
+        self.plan = plan if plan is not None else select_plan(self.front)
+        self.frozen = np.zeros(problem.num_nodes, dtype=bool)
+        self.sla = sla if sla is not None else config.ONLINE_SLA
+        self.iterations = iterations if iterations is not None else config.ONLINE_ITERS
+        self.pop_size = pop_size or config.ONLINE_POP_SIZE
+        self.history = []
+
+    def freeze(self, now):
+        """执行方案中到达时刻不晚于 now 的节点加入冻结集合 (到达时刻沿路径递增，冻结部分总是前缀)"""
+        if self.plan.arrival is None:     # 紧凑存储的档案成员 (见 EpsilonArchive) 没有评价缓存
+            evaluate_individual(self.problem, self.plan)
+        self.frozen[self.plan.tour[self.plan.arrival <= now]] = True
+
+    def seeds(self, frozen):
+        members = self.front
+        if len(members) > self.pop_size - 1:
+            idx = np.unique(np.linspace(0, len(members) - 1, self.pop_size - 1).round().astype(int))
+            members = [members[i] for i in idx]
+        seeds = [self.plan]
+        for member in members:
+            ind = project(member, self.plan, frozen)
+            if ind is not None and ind is not self.plan:
+                seeds.append(ind)
+        return seeds
+
+    def replan(self, customers, now, budget=None):
+        """
+        并入新订单 customers (Customer 列表，编号不可与已有客户重复) 并重规划，返回新的前沿
+        now: 当前时刻 (与调度时间同单位)；budget: 本次重规划的墙钟预算 (秒)，默认 sla
+        """
+        t0 = time.perf_counter()
+        budget = budget if budget is not None else self.sla
+        self.freeze(now)
+        problem = self.problem.extend(customers) if customers else self.problem
+        frozen = np.zeros(problem.num_nodes, dtype=bool)
+        frozen[:len(self.frozen)] = self.frozen
+        new_nodes = np.arange(self.problem.num_nodes, problem.num_nodes, dtype=np.int32)
+
+        population = []
+        for ind in self.seeds(frozen):
+            routes = ind.routes
+            if len(new_nodes):
+                locked = [prefix_length(r, frozen) for r in routes]
+                routes = regret_insert(problem, routes, ind.route_depots, new_nodes, locked=locked)
+            population.append(Individual.from_routes(routes, ind.route_depots))
+        t1 = time.perf_counter()
+
+        solver = ALNSMO(problem.customers, problem.depots, problem=problem, n_workers=1)
+        solver.pop_size = self.pop_size
+        solver.operators = [FrozenPrefix(op, frozen) for op in solver.operators]
+        # 预留 10% 的预算用于收尾与发布
+        time_limit = max(0.0, 0.9 * budget - (time.perf_counter() - t0))
+        front, _ = solver.solve(time_limit=time_limit, iter_max=self.iterations, population=population)
+        t2 = time.perf_counter()
+
+        self.problem, self.frozen, self.front = problem, frozen, front
+        self.plan = select_plan(front)
+        self.history.append({
+            'now': now,
+            'orders': len(new_nodes),
+            'frozen': int(frozen.sum()),
+            'iterations': solver.iteration,
+            'front_size': len(front),
+            'repair_seconds': t1 - t0,
+            'reopt_seconds': t2 - t1,
+            'seconds': t2 - t0,
+        })
+        return front
+
+    async def run(self, orders, publish, batch_window=None):
+        """
+        asyncio 事件循环：消费订单流，每批订单重规划一次并发布新前沿
+        orders: 异步迭代器，产出 (now, Customer)；publish(front, info) 可以是普通函数或协程
+        收到一个订单后再等待至多 batch_window 秒，把这段时间内到达的订单合为一批；
+        重规划在线程池中运行，期间事件循环继续接收订单。info 中 latency 为首个订单到达至发布的秒数，
+        sla_met 表示是否在 sla 之内
+        """
+        batch_window = batch_window if batch_window is not None else config.ONLINE_BATCH_WINDOW
+        queue = asyncio.Queue()
+        end = object()
+
+        async def pump():
+            async for item in orders:
+                await queue.put(item)
+            await queue.put(end)
+
+        loop = asyncio.get_running_loop()
+        feeder = asyncio.create_task(pump())
+        try:
+            finished = False
+            while not finished:
+                item = await queue.get()
+                if item is end:
+                    break
+                arrived = time.perf_counter()
+                batch = [item]
+                while True:
+                    remaining = arrived + batch_window - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is end:
+                        finished = True
+                        break
+                    batch.append(item)
+
+                now = max(t for t, _ in batch)
+                budget = self.sla - (time.perf_counter() - arrived)
+                front = await loop.run_in_executor(None, self.replan, [c for _, c in batch], now, budget)
+                info = dict(self.history[-1])
+                info['latency'] = time.perf_counter() - arrived
+                info['sla_met'] = info['latency'] <= self.sla
+                result = publish(front, info)
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            feeder.cancel()
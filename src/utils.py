@@ -1,34 +1,37 @@
 import numpy as np
-from .models import Customer, Depot 
+from .config import config
+from .schedule import pad_routes, simulate_batch
 
 def calculate_distance(node1, node2):
     """计算两点之间的欧几里得距离"""
     return np.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
 
-def calculate_total_costs(solution, sigma=0.5, rho=0.5):
-    """计算目标函数 f1: 运输成本"""
+def route_distance(dist, depot, route):
+    """单条路径的闭环飞行距离：仓库 -> 客户1 -> ... -> 客户n -> 仓库"""
+    if len(route) == 0:
+        return 0.0
+    return float(dist.matrix[depot, route[0]] + dist.path_length(route) + dist.matrix[route[-1], depot])
+
+def calculate_total_costs(solution, dist, route_depots, sigma=0.5, rho=0.5):
+    """
+    计算目标函数 f1: 运输成本
+    solution: 节点编号数组的列表；route_depots: 各路径所属 Depot 编号
+    """
     total_distance = 0
     active_drones = 0
-    for drone_route in solution:
+    for drone_route, depot in zip(solution, route_depots):
         if len(drone_route) > 0:
             active_drones += 1
-            # 路径：仓库 -> 客户1 -> ... -> 客户n -> 仓库 (需闭环计算距离)
-            # 假设 solution 里的 drone_route 仅包含 Customer 对象
-            # 实际计算需包含仓库到首尾客户的距离
-            # 这里简化处理，仅计算客户间的连接
-            for i in range(len(drone_route) - 1):
-                total_distance += calculate_distance(drone_route[i], drone_route[i+1])
+            # 路径：仓库 -> 客户1 -> ... -> 客户n -> 仓库 (闭环计算距离)
+            total_distance += route_distance(dist, depot, drone_route)
     return sigma * total_distance + rho * active_drones
 
-def calculate_total_satisfaction(solution):
-    """计算目标函数 f2: 总客户满意度"""
-    total_s = 0
-    for drone_route in solution:
-        for node in drone_route:
-            if isinstance(node, Customer):
-                # 假设节点已带有经过算子更新后的 arrival_time
-                total_s += node.calculate_satisfaction(getattr(node, 'arrival_time', 0))
-    return total_s
+def calculate_total_satisfaction(solution, problem, route_depots):
+    """计算目标函数 f2: 总客户满意度 (到达时间由批量调度引擎推算)"""
+    if len(solution) == 0:
+        return 0.0
+    padded, lengths = pad_routes(solution)
+    return float(simulate_batch(problem, padded, lengths, route_depots).route_satisfaction.sum())
 
 def normalize_objective(value, min_val, max_val):
     """实现公式 (38): 目标值标准化 """
@@ -41,6 +44,7 @@ def calculate_hv(pareto_front, ref_point=[1.1, 1.1]):
     1. 提取 f1, f2 
     2. 归一化并转化为最小化问题
     3. 计算方案集与参考点之间的矩形并集面积
+    求解过程中的 HV 轨迹使用此固定边界；离线比较多组运行结果见 metrics (按实例推出边界，批量计算)
     """
     if not pareto_front:
         return 0.0
@@ -52,8 +56,8 @@ def calculate_hv(pareto_front, ref_point=[1.1, 1.1]):
 
     # 1. 归一化 (使用论文算例的估计边界：成本500, 40个点最大满意度40)
     # 使两个目标都变成越小越好，且范围在 [0, 1]
-    norm_f1 = [c / 500.0 for c in costs]
-    norm_f2 = [1.0 - (s / 40.0) for s in satisfactions]
+    norm_f1 = [c / config.HV_COST_BOUND for c in costs]
+    norm_f2 = [1.0 - (s / config.HV_SAT_BOUND) for s in satisfactions]
     
     # 2. 排序并过滤掉超过参考点的解
     points = sorted(list(set(zip(norm_f1, norm_f2))))